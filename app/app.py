@@ -1,8 +1,18 @@
+import asyncio
+import importlib
+import re
 import reflex as rx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
 from app.components.graph_form import graph_form
 from app.components.graph import graph_page
+from app.services.instrumentation import render_metrics
 from app.states.graph_state import GraphState
 
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 def index() -> rx.Component:
     """The main page of the application."""
@@ -44,7 +54,53 @@ def index() -> rx.Component:
     )
 
 
+async def metrics(request: Request) -> PlainTextResponse:
+    """Per-stage timings and allocations for a Prometheus scraper."""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+async def export(request: Request) -> Response:
+    """Streams a graph or a computed result as a file download.
+
+    ``kind`` is ``graph``, ``result`` or ``batch`` and ``ident`` the graph key
+    or result id; the optional ``name`` query parameter names the file.
+    """
+    kind = request.path_params["kind"]
+    ident = request.path_params["ident"]
+    fmt = request.path_params["fmt"]
+    exports = await asyncio.to_thread(importlib.import_module, "app.services.export")
+    try:
+        body = await asyncio.to_thread(exports.open_export, kind, ident, fmt)
+    except ValueError as e:
+        return PlainTextResponse(str(e), status_code=400)
+    if body is None:
+        return PlainTextResponse(
+            "This graph or result has expired. Calculate it again.", status_code=404
+        )
+    name = re.sub(r"[^\w.-]+", "_", request.query_params.get("name", ""))[:64] or kind
+    return StreamingResponse(
+        body,
+        media_type=exports.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+async def prewarm_graph_services() -> None:
+    """Imports the graph services off the event loop once the worker is up.
+
+    The state imports them on first use so that workers start quickly; this
+    loads them before the first graph is submitted.
+    """
+    await asyncio.to_thread(importlib.import_module, "app.services.graph_tasks")
+
+
 app = rx.App(
+    api_transformer=Starlette(
+        routes=[
+            Route("/metrics", metrics),
+            Route("/export/{kind}/{ident}.{fmt}", export),
+        ]
+    ),
     theme=rx.theme(appearance="light"),
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
@@ -56,4 +112,5 @@ app = rx.App(
     ],
 )
 app.add_page(index, route="/")
-app.add_page(graph_page, route="/graph", on_load=GraphState.on_load_graph)
\ No newline at end of file
+app.add_page(graph_page, route="/graph", on_load=GraphState.on_load_graph)
+app.register_lifespan_task(prewarm_graph_services)
@@ -1,27 +1,336 @@
 import reflex as rx
 from reflex.components.plotly import plotly
-from app.states.graph_state import GraphState
+from app.components.task_status import task_status
+from app.services.instrumentation import DEBUG_PANEL
+from app.states.graph_state import APPROX_LABELS, CENTRALITY_LABELS, GraphState
 
+LAYOUT_OPTIONS = [
+    ("auto", "Auto (by graph size)"),
+    ("spring", "Spring"),
+    ("force", "Force (Barnes-Hut)"),
+    ("spectral", "Spectral"),
+    ("circular", "Circular"),
+    ("random", "Random"),
+]
+BUDGET_OPTIONS = [
+    ("1s", "1 second"),
+    ("5s", "5 seconds"),
+    ("30s", "30 seconds"),
+    ("exact", "Exact"),
+]
+EXPORT_LABELS = {
+    "csv": "CSV",
+    "graphml": "GraphML",
+    "npz": "NPZ",
+    "parquet": "Parquet",
+}
 
-def result_table(title: str, data: rx.Var[dict]) -> rx.Component:
-    """A component to display algorithm results in a table."""
+
+def export_url(kind: str, ident: rx.Var[str], fmt: str, name: str) -> rx.Var[str]:
+    """The backend URL that streams an export, from the configured ``api_url``."""
+    api_url = rx.config.get_config().api_url.rstrip("/")
+    return rx.Var.create(f"{api_url}/export/{kind}/{ident}.{fmt}?name={name}")
+
+
+def export_links(
+    kind: str, ident: rx.Var[str], name: str, formats: tuple[str, ...]
+) -> rx.Component:
+    """Download links for a graph or result, one per file format."""
+    return rx.el.div(
+        rx.el.span("Download", class_name="text-xs text-gray-400"),
+        *[
+            rx.el.a(
+                EXPORT_LABELS[fmt],
+                href=export_url(kind, ident, fmt, name),
+                class_name="px-2 py-1 text-xs rounded-md bg-white/10 text-purple-200 hover:bg-white/20",
+            )
+            for fmt in formats
+        ],
+        class_name="flex flex-wrap items-center gap-2 mt-2",
+    )
+
+
+def result_table(table: str) -> rx.Component:
+    """One page of a server-side algorithm result, with sorting and a filter."""
+    view = GraphState.result_views[table]
+    pager_class = (
+        "px-2 py-1 text-xs rounded-md bg-white/10 hover:bg-white/20 disabled:opacity-30"
+    )
+    return rx.cond(
+        GraphState.result_views.contains(table),
+        rx.el.div(
+            rx.el.div(
+                rx.el.h4(view["title"], class_name="font-semibold text-purple-200"),
+                rx.el.button(
+                    rx.cond(
+                        view["descending"],
+                        rx.icon(tag="arrow-down-wide-narrow", class_name="h-4 w-4"),
+                        rx.icon(tag="arrow-up-narrow-wide", class_name="h-4 w-4"),
+                    ),
+                    on_click=GraphState.toggle_result_sort(table),
+                    title="Reverse the sort order",
+                    class_name="p-1 rounded-md text-purple-200 hover:bg-white/10",
+                ),
+                class_name="flex justify-between items-center mb-2",
+            ),
+            rx.debounce_input(
+                rx.el.input(
+                    placeholder="Filter nodes",
+                    value=view["query"],
+                    on_change=lambda query: GraphState.filter_result(table, query),
+                    class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 mb-2 border-none placeholder-gray-400 focus:ring-2 focus:ring-purple-500",
+                ),
+                debounce_timeout=300,
+            ),
+            rx.el.div(
+                rx.foreach(
+                    view["rows"],
+                    lambda row: rx.el.div(
+                        rx.el.span(
+                            row["rank"],
+                            class_name="w-12 text-xs text-gray-500 font-mono",
+                        ),
+                        rx.el.span(
+                            row["node"],
+                            class_name="flex-1 font-medium text-gray-300 truncate",
+                        ),
+                        rx.el.span(
+                            row["value"], class_name="text-purple-300 font-mono"
+                        ),
+                        class_name="flex items-center gap-2 text-sm p-2 rounded-md bg-white/5",
+                    ),
+                ),
+                class_name="space-y-1 max-h-60 overflow-y-auto pr-2",
+            ),
+            rx.el.div(
+                rx.el.button(
+                    "Prev",
+                    on_click=GraphState.turn_result_page(
+                        table, view["page"].to(int) - 1
+                    ),
+                    disabled=view["page"].to(int) <= 0,
+                    class_name=pager_class,
+                ),
+                rx.el.span(
+                    "Page ",
+                    view["page"].to(int) + 1,
+                    " of ",
+                    view["pages"],
+                    " (",
+                    view["total"],
+                    " nodes)",
+                    class_name="text-xs text-gray-400",
+                ),
+                rx.el.button(
+                    "Next",
+                    on_click=GraphState.turn_result_page(
+                        table, view["page"].to(int) + 1
+                    ),
+                    disabled=view["page"].to(int) + 1 >= view["pages"].to(int),
+                    class_name=pager_class,
+                ),
+                class_name="flex justify-between items-center mt-2",
+            ),
+            export_links("result", view["result_id"], table, ("csv", "npz", "parquet")),
+            class_name="p-4 bg-black/20 rounded-xl",
+        ),
+    )
+
+
+def node_picker(field: str, placeholder: str, value: rx.Var[str]) -> rx.Component:
+    """A node box that suggests matching node labels from the server as you type."""
+    matches = GraphState.node_matches.get(field, [])
+    return rx.el.div(
+        rx.debounce_input(
+            rx.el.input(
+                placeholder=placeholder,
+                value=value,
+                on_change=lambda query: GraphState.search_nodes(field, query),
+                auto_complete="off",
+                class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 border-none placeholder-gray-400 focus:ring-2 focus:ring-purple-500",
+            ),
+            debounce_timeout=300,
+        ),
+        rx.cond(
+            matches.length() > 0,
+            rx.el.div(
+                rx.foreach(
+                    matches,
+                    lambda label: rx.el.button(
+                        label,
+                        on_click=GraphState.pick_node(field, label),
+                        type="button",
+                        class_name="block w-full text-left text-sm px-2 py-1 truncate hover:bg-white/10",
+                    ),
+                ),
+                class_name="absolute z-10 mt-1 w-full max-h-60 overflow-y-auto rounded-md bg-gray-900 border border-white/10 shadow-lg",
+            ),
+        ),
+        class_name="relative",
+    )
+
+
+def edit_panel() -> rx.Component:
+    """Inputs for adding and removing single nodes and edges."""
+    input_class = "bg-white/10 text-white rounded-md w-full text-sm p-2 border-none placeholder-gray-400 focus:ring-2 focus:ring-purple-500"
+    button_class = (
+        "w-full text-sm py-2 rounded-lg transition-colors disabled:opacity-50"
+    )
+    return rx.el.div(
+        rx.el.h3("Edit Graph", class_name="text-lg font-bold text-white mb-1"),
+        rx.el.p(
+            "Leave the target empty to edit a node.",
+            class_name="text-xs text-gray-400 mb-3",
+        ),
+        rx.el.div(
+            rx.el.input(
+                placeholder="Node",
+                value=GraphState.edit_source,
+                on_change=GraphState.set_edit_source,
+                class_name=input_class,
+            ),
+            rx.el.input(
+                placeholder="Target (optional)",
+                value=GraphState.edit_target,
+                on_change=GraphState.set_edit_target,
+                class_name=input_class,
+            ),
+            class_name="grid grid-cols-2 gap-2 mb-3",
+        ),
+        rx.el.div(
+            rx.el.button(
+                "Add",
+                on_click=GraphState.edit_graph("add"),
+                disabled=GraphState.task_running,
+                class_name=f"{button_class} bg-purple-600 hover:bg-purple-700",
+            ),
+            rx.el.button(
+                "Remove",
+                on_click=GraphState.edit_graph("remove"),
+                disabled=GraphState.task_running,
+                class_name=f"{button_class} bg-white/10 hover:bg-white/20",
+            ),
+            class_name="grid grid-cols-2 gap-2",
+        ),
+        class_name="mb-8 p-4 bg-black/20 rounded-xl",
+    )
+
+
+def batch_panel() -> rx.Component:
+    """Form for computing many source-target distances at once."""
+    return rx.el.form(
+        rx.el.h4("Batch Distances", class_name="font-semibold text-purple-200 mb-1"),
+        rx.el.p(
+            "One 'source, target' pair per line.",
+            class_name="text-xs text-gray-400 mb-3",
+        ),
+        rx.el.textarea(
+            name="pairs",
+            placeholder="A, B\nA, C",
+            rows=4,
+            class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 mb-3 border-none placeholder-gray-400 font-mono focus:ring-2 focus:ring-purple-500",
+        ),
+        rx.el.button(
+            "Compute Distances",
+            type="submit",
+            disabled=GraphState.task_running,
+            class_name="w-full text-sm py-2 bg-purple-600 hover:bg-purple-700 rounded-lg transition-colors disabled:opacity-50",
+        ),
+        rx.cond(
+            GraphState.batch_result_id,
+            export_links(
+                "batch",
+                GraphState.batch_result_id,
+                "path_distances",
+                ("csv", "npz", "parquet"),
+            ),
+        ),
+        on_submit=GraphState.run_batch_queries,
+        reset_on_submit=False,
+        class_name="mb-6",
+    )
+
+
+def approx_panel() -> rx.Component:
+    """Sampled algorithms with a time budget, error bounds and timing."""
+    select_class = "bg-white/10 text-white rounded-md w-full text-sm p-2 border-none focus:ring-2 focus:ring-purple-500"
     return rx.el.div(
-        rx.el.h4(title, class_name="font-semibold text-purple-200 mb-2"),
+        rx.el.h4("Estimates", class_name="font-semibold text-purple-200 mb-1"),
+        rx.el.p(
+            "Samples until the time budget is spent. Ranges are error bounds.",
+            class_name="text-xs text-gray-400 mb-3",
+        ),
         rx.el.div(
-            rx.foreach(
-                data.entries(),
-                lambda item: rx.el.div(
-                    rx.el.span(item[0], class_name="font-medium text-gray-300"),
-                    rx.el.span(
-                        item[1].to(float).to_string(),
-                        class_name="text-purple-300 font-mono",
+            rx.el.select(
+                *[
+                    rx.el.option(label, value=value)
+                    for value, label in APPROX_LABELS.items()
+                ],
+                value=GraphState.approx_name,
+                on_change=GraphState.set_approx_name,
+                class_name=select_class,
+            ),
+            rx.el.select(
+                *[rx.el.option(label, value=value) for value, label in BUDGET_OPTIONS],
+                value=GraphState.approx_budget,
+                on_change=GraphState.set_approx_budget,
+                class_name=select_class,
+            ),
+            class_name="grid grid-cols-2 gap-2 mb-3",
+        ),
+        rx.el.button(
+            "Estimate",
+            on_click=GraphState.run_approximation,
+            class_name="w-full text-sm py-2 bg-purple-600 hover:bg-purple-700 rounded-lg transition-colors",
+        ),
+        rx.cond(
+            GraphState.approx_summary,
+            rx.el.div(
+                rx.el.h4(
+                    GraphState.approx_label,
+                    class_name="font-semibold text-purple-200 mb-2",
+                ),
+                rx.foreach(
+                    GraphState.approx_summary.entries(),
+                    lambda item: rx.el.div(
+                        rx.el.span(item[0], class_name="text-gray-400"),
+                        rx.el.span(item[1], class_name="text-purple-300 font-mono"),
+                        class_name="flex justify-between items-center text-sm py-1",
                     ),
-                    class_name="flex justify-between items-center text-sm p-2 rounded-md bg-white/5",
                 ),
+                class_name="mt-3 p-4 bg-black/20 rounded-xl",
             ),
-            class_name="space-y-1 max-h-60 overflow-y-auto pr-2",
         ),
-        class_name="p-4 bg-black/20 rounded-xl",
+        rx.el.div(result_table("approx"), class_name="mt-2"),
+        class_name="mb-6",
+    )
+
+
+def debug_panel() -> rx.Component:
+    """Time and allocations of each stage of the session's last task."""
+    return rx.el.div(
+        rx.el.h3("Debug", class_name="text-lg font-bold text-white mb-1"),
+        rx.el.p(
+            rx.cond(GraphState.debug_label, GraphState.debug_label, "No task yet."),
+            class_name="text-xs text-gray-400 mb-3",
+        ),
+        rx.foreach(
+            GraphState.debug_stages,
+            lambda row: rx.el.div(
+                rx.el.div(
+                    rx.el.span(row["stage"], class_name="font-medium text-gray-300"),
+                    rx.el.span(row["time"], class_name="text-purple-300 font-mono"),
+                    class_name="flex justify-between items-center",
+                ),
+                rx.el.div(
+                    rx.el.span(row["size"]),
+                    rx.el.span(row["alloc"], class_name="font-mono"),
+                    class_name="flex justify-between items-center text-xs text-gray-500",
+                ),
+                class_name="text-sm p-2 rounded-md bg-white/5",
+            ),
+        ),
+        class_name="mt-8 p-4 bg-black/20 rounded-xl space-y-1",
     )
 
 
@@ -59,12 +368,30 @@ def graph_sidebar() -> rx.Component:
                     ),
                     rx.el.p("No stats available.", class_name="text-gray-400"),
                 ),
+                export_links(
+                    "graph", GraphState.graph_key, "graph", tuple(EXPORT_LABELS)
+                ),
+                class_name="mb-8 p-4 bg-black/20 rounded-xl",
+            ),
+            edit_panel(),
+            rx.el.div(
+                rx.el.h3("Layout", class_name="text-lg font-bold text-white mb-3"),
+                rx.el.select(
+                    *[
+                        rx.el.option(label, value=value)
+                        for value, label in LAYOUT_OPTIONS
+                    ],
+                    value=GraphState.layout_engine,
+                    on_change=GraphState.set_layout_engine,
+                    class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 border-none focus:ring-2 focus:ring-purple-500",
+                ),
                 class_name="mb-8 p-4 bg-black/20 rounded-xl",
             ),
             rx.el.div(
                 rx.el.h3(
                     "Graph Algorithms", class_name="text-lg font-bold text-white mb-4"
                 ),
+                task_status(dark=True),
                 rx.el.div(
                     rx.el.div(
                         rx.el.h4(
@@ -72,27 +399,11 @@ def graph_sidebar() -> rx.Component:
                             class_name="font-semibold text-purple-200 mb-3",
                         ),
                         rx.el.div(
-                            rx.el.select(
-                                rx.foreach(
-                                    GraphState.graph_nodes,
-                                    lambda node: rx.el.option(
-                                        node["id"], value=node["id"]
-                                    ),
-                                ),
-                                placeholder="Start Node",
-                                on_change=GraphState.set_shortest_path_start,
-                                class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 border-none focus:ring-2 focus:ring-purple-500",
+                            node_picker(
+                                "start", "Start Node", GraphState.shortest_path_start
                             ),
-                            rx.el.select(
-                                rx.foreach(
-                                    GraphState.graph_nodes,
-                                    lambda node: rx.el.option(
-                                        node["id"], value=node["id"]
-                                    ),
-                                ),
-                                placeholder="End Node",
-                                on_change=GraphState.set_shortest_path_end,
-                                class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 border-none focus:ring-2 focus:ring-purple-500",
+                            node_picker(
+                                "end", "End Node", GraphState.shortest_path_end
                             ),
                             class_name="grid grid-cols-2 gap-2 mb-3",
                         ),
@@ -116,35 +427,40 @@ def graph_sidebar() -> rx.Component:
                         ),
                         class_name="mb-6",
                     ),
+                    batch_panel(),
+                    approx_panel(),
                     rx.el.div(
-                        rx.el.button(
-                            "Calculate Degree Centrality",
-                            on_click=GraphState.calculate_centrality,
-                            class_name="w-full text-sm py-2 mb-2 bg-purple-600 hover:bg-purple-700 rounded-lg transition-colors",
-                        ),
-                        rx.cond(
-                            GraphState.centrality_result.keys().length() > 0,
-                            result_table(
-                                "Degree Centrality", GraphState.centrality_result
+                        rx.el.div(
+                            rx.el.select(
+                                *[
+                                    rx.el.option(label, value=value)
+                                    for value, label in CENTRALITY_LABELS.items()
+                                ],
+                                value=GraphState.centrality_measure,
+                                on_change=GraphState.set_centrality_measure,
+                                class_name="bg-white/10 text-white rounded-md w-full text-sm p-2 border-none focus:ring-2 focus:ring-purple-500",
                             ),
+                            rx.el.button(
+                                "Calculate",
+                                on_click=GraphState.calculate_centrality,
+                                class_name="text-sm px-4 py-2 bg-purple-600 hover:bg-purple-700 rounded-lg transition-colors",
+                            ),
+                            class_name="flex gap-2 mb-2",
                         ),
+                        result_table("centrality"),
                         rx.el.button(
                             "Calculate Clustering Coefficient",
                             on_click=GraphState.calculate_clustering,
                             class_name="w-full text-sm py-2 mt-4 mb-2 bg-purple-600 hover:bg-purple-700 rounded-lg transition-colors",
                         ),
-                        rx.cond(
-                            GraphState.clustering_result.keys().length() > 0,
-                            result_table(
-                                "Clustering Coefficient", GraphState.clustering_result
-                            ),
-                        ),
+                        result_table("clustering"),
                         class_name="space-y-2",
                     ),
                     class_name="space-y-4",
                 ),
                 class_name="p-4 bg-black/20 rounded-xl",
             ),
+            debug_panel() if DEBUG_PANEL else rx.fragment(),
             class_name="p-6",
         ),
         class_name="w-96 h-screen bg-gray-900/80 backdrop-blur-sm border-r border-white/10 overflow-y-auto shrink-0",
@@ -153,18 +469,44 @@ def graph_sidebar() -> rx.Component:
 
 def graph_display() -> rx.Component:
     """The main view for displaying the generated graph."""
+    from plotly.graph_objects import Figure
+
     return rx.el.div(
         rx.cond(
             GraphState.graph_figure,
-            plotly(data=GraphState.graph_figure, class_name="w-full h-full"),
             rx.el.div(
-                rx.el.p("No graph generated. ", class_name="text-gray-400"),
-                rx.el.a(
-                    "Go back to create one.",
-                    href="/",
-                    class_name="text-purple-400 hover:underline",
+                plotly(
+                    data=GraphState.graph_figure.to(Figure),
+                    on_selected=GraphState.zoom_to_selection,
+                    on_click=GraphState.drill_into_cell,
+                    class_name="w-full h-full",
+                ),
+                rx.cond(
+                    GraphState.lod_region.length() > 0,
+                    rx.el.button(
+                        rx.icon(tag="zoom-out", class_name="h-4 w-4 mr-2"),
+                        "Reset View",
+                        on_click=GraphState.reset_view,
+                        class_name="absolute top-4 right-4 inline-flex items-center px-3 py-1.5 text-sm font-semibold text-purple-200 bg-gray-900/80 rounded-lg hover:bg-white/20 transition-colors",
+                    ),
+                ),
+                class_name="relative w-full h-full",
+            ),
+            rx.cond(
+                GraphState.graph_meta,
+                rx.el.div(
+                    rx.el.p("Drawing the graph...", class_name="text-gray-400"),
+                    class_name="flex items-center justify-center w-full h-full text-lg",
+                ),
+                rx.el.div(
+                    rx.el.p("No graph generated. ", class_name="text-gray-400"),
+                    rx.el.a(
+                        "Go back to create one.",
+                        href="/",
+                        class_name="text-purple-400 hover:underline",
+                    ),
+                    class_name="flex items-center justify-center w-full h-full text-lg",
                 ),
-                class_name="flex items-center justify-center w-full h-full text-lg",
             ),
         ),
         class_name="flex-1 h-screen bg-transparent",
@@ -177,4 +519,4 @@ def graph_page() -> rx.Component:
         graph_sidebar(),
         graph_display(),
         class_name="flex w-full h-screen font-['Roboto'] bg-gradient-to-br from-gray-900 via-purple-900 to-gray-900 text-white",
-    )
\ No newline at end of file
+    )
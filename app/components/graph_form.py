@@ -1,4 +1,7 @@
 import reflex as rx
+from app.services.generator_params import GENERATORS, Generator
+from app.services.file_formats import UPLOAD_ACCEPT
+from app.components.task_status import task_status
 from app.states.graph_state import GraphState
 
 
@@ -12,6 +15,100 @@ def preset_button(label: str, preset_name: str) -> rx.Component:
     )
 
 
+def upload_section() -> rx.Component:
+    """File upload input for loading large graphs straight from a file."""
+    return rx.el.div(
+        rx.el.label(
+            "Or Upload a File",
+            class_name="block text-sm font-semibold text-gray-700 mb-2",
+        ),
+        rx.upload.root(
+            rx.el.div(
+                rx.icon("upload", class_name="h-5 w-5 text-purple-500 mr-2 shrink-0"),
+                rx.cond(
+                    rx.selected_files("graph_upload").length() > 0,
+                    rx.el.span(
+                        rx.selected_files("graph_upload")[0],
+                        class_name="text-sm font-medium text-gray-700 truncate",
+                    ),
+                    rx.el.span(
+                        "Drop a CSV, TSV, edge list, GraphML or Parquet file, or click to browse.",
+                        class_name="text-sm text-gray-500",
+                    ),
+                ),
+                class_name="flex items-center justify-center",
+            ),
+            id="graph_upload",
+            accept=UPLOAD_ACCEPT,
+            max_files=1,
+            multiple=False,
+            class_name="w-full px-4 py-5 bg-white/60 border-2 border-dashed border-purple-200 rounded-xl cursor-pointer hover:border-purple-400 transition-colors",
+        ),
+        rx.el.button(
+            rx.cond(GraphState.task_running, "Processing...", "Upload & Generate"),
+            on_click=GraphState.handle_upload(
+                rx.upload_files(upload_id="graph_upload")
+            ),
+            disabled=GraphState.task_running,
+            type="button",
+            class_name="mt-3 px-4 py-2 text-sm font-semibold text-purple-700 bg-purple-100 rounded-lg hover:bg-purple-200 transition-colors disabled:opacity-50",
+        ),
+        class_name="mb-6",
+    )
+
+
+def generator_inputs(generator: Generator) -> rx.Component:
+    """Number inputs for one generator's size parameters."""
+    return rx.el.div(
+        *[
+            rx.el.label(
+                rx.el.span(param.label, class_name="block text-xs text-gray-500 mb-1"),
+                rx.el.input(
+                    type="number",
+                    name=param.name,
+                    default_value=str(param.default),
+                    min=param.low,
+                    max=param.high,
+                    key=f"{generator.name}-{param.name}",
+                    class_name="w-full px-3 py-2 text-sm bg-white border border-gray-200 rounded-lg focus:ring-2 focus:ring-purple-500 focus:border-transparent",
+                ),
+            )
+            for param in generator.params
+        ],
+        class_name="grid grid-cols-2 gap-3",
+    )
+
+
+def generator_section() -> rx.Component:
+    """Builds large synthetic graphs from a generator and its size parameters."""
+    return rx.el.form(
+        rx.el.label(
+            "Or Generate a Large Graph",
+            class_name="block text-sm font-semibold text-gray-700 mb-2",
+        ),
+        rx.el.select(
+            *[rx.el.option(g.label, value=g.name) for g in GENERATORS.values()],
+            value=GraphState.generator_name,
+            on_change=GraphState.set_generator_name,
+            class_name="w-full px-3 py-2 mb-3 text-sm bg-white border border-gray-200 rounded-lg focus:ring-2 focus:ring-purple-500",
+        ),
+        rx.match(
+            GraphState.generator_name,
+            *[(g.name, generator_inputs(g)) for g in GENERATORS.values()],
+            rx.fragment(),
+        ),
+        rx.el.button(
+            rx.cond(GraphState.task_running, "Processing...", "Generate"),
+            type="submit",
+            disabled=GraphState.task_running,
+            class_name="mt-3 px-4 py-2 text-sm font-semibold text-purple-700 bg-purple-100 rounded-lg hover:bg-purple-200 transition-colors disabled:opacity-50",
+        ),
+        on_submit=GraphState.handle_generate,
+        reset_on_submit=False,
+        class_name="w-full mt-8 pt-6 border-t border-gray-200",
+    )
+
+
 def graph_form() -> rx.Component:
     """The main input form for generating the graph."""
     return rx.el.div(
@@ -75,6 +172,7 @@ C, D""",
                     ),
                     class_name="flex items-center mb-6",
                 ),
+                upload_section(),
                 rx.el.fieldset(
                     rx.el.legend(
                         "Graph Type",
@@ -86,6 +184,7 @@ C, D""",
                                 type="radio",
                                 name="graph_type",
                                 value="undirected",
+                                on_change=GraphState.set_graph_type,
                                 class_name="h-4 w-4 text-purple-600 border-gray-300 focus:ring-purple-500 cursor-pointer",
                                 default_checked=True,
                             ),
@@ -97,6 +196,7 @@ C, D""",
                                 type="radio",
                                 name="graph_type",
                                 value="directed",
+                                on_change=GraphState.set_graph_type,
                                 class_name="h-4 w-4 text-purple-600 border-gray-300 focus:ring-purple-500 cursor-pointer",
                             ),
                             rx.el.span("Directed", class_name="ml-2 text-gray-700"),
@@ -110,12 +210,15 @@ C, D""",
                     "Generate Graph",
                     rx.icon("arrow-right", class_name="ml-2"),
                     type="submit",
-                    class_name="w-full flex items-center justify-center px-6 py-4 text-base font-semibold text-white bg-gradient-to-r from-purple-600 to-indigo-600 rounded-xl shadow-lg hover:shadow-xl hover:from-purple-700 hover:to-indigo-700 transition-all duration-300 transform hover:-translate-y-0.5",
+                    disabled=GraphState.task_running,
+                    class_name="w-full flex items-center justify-center px-6 py-4 text-base font-semibold text-white bg-gradient-to-r from-purple-600 to-indigo-600 rounded-xl shadow-lg hover:shadow-xl hover:from-purple-700 hover:to-indigo-700 transition-all duration-300 transform hover:-translate-y-0.5 disabled:opacity-50",
                 ),
+                task_status(),
             ),
             on_submit=GraphState.handle_submit,
             reset_on_submit=False,
             class_name="w-full",
         ),
+        generator_section(),
         class_name="w-full max-w-2xl mx-auto bg-white/70 backdrop-blur-xl p-8 sm:p-12 rounded-2xl shadow-2xl border border-gray-100",
-    )
\ No newline at end of file
+    )
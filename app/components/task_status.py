@@ -0,0 +1,42 @@
+import reflex as rx
+from app.states.graph_state import GraphState
+
+
+def task_status(dark: bool = False) -> rx.Component:
+    """Progress bar and cancel button for the session's running task."""
+    return rx.cond(
+        GraphState.task_running,
+        rx.el.div(
+            rx.el.div(
+                rx.el.span(
+                    GraphState.task_label,
+                    "... ",
+                    GraphState.task_progress,
+                    "%",
+                    class_name="text-xs font-medium "
+                    + ("text-purple-200" if dark else "text-gray-600"),
+                ),
+                rx.el.button(
+                    "Cancel",
+                    on_click=GraphState.cancel_current_task,
+                    type="button",
+                    class_name="text-xs font-semibold "
+                    + (
+                        "text-purple-200 hover:text-white"
+                        if dark
+                        else "text-purple-700 hover:text-purple-900"
+                    ),
+                ),
+                class_name="flex justify-between items-center mb-1",
+            ),
+            rx.el.div(
+                rx.el.div(
+                    class_name="h-2 bg-purple-600 rounded-full transition-all duration-300",
+                    style={"width": f"{GraphState.task_progress}%"},
+                ),
+                class_name="w-full h-2 rounded-full overflow-hidden "
+                + ("bg-white/10" if dark else "bg-purple-100"),
+            ),
+            class_name="mt-3",
+        ),
+    )
@@ -0,0 +1,53 @@
+import networkx as nx
+from app.services import sparse_backend
+from app.services.instrumentation import timed
+from app.services.metrics import graph_metrics
+from app.services.tasks import TaskControl
+
+
+@timed("degree")
+def degree_centrality(
+    G: nx.Graph | nx.DiGraph, key: str = "", control: TaskControl | None = None
+) -> dict:
+    """Same as :func:`nx.degree_centrality`, from the graph's shared metrics."""
+    return graph_metrics(G, key, control).degree_centrality(G)
+
+
+@timed("clustering")
+def clustering(G: nx.Graph, key: str = "", control: TaskControl | None = None) -> dict:
+    """Same as :func:`nx.clustering`, from the graph's shared metrics."""
+    return graph_metrics(G, key, control).clustering_by_node(G)
+
+
+@timed("pagerank")
+def pagerank(
+    G: nx.Graph | nx.DiGraph, key: str = "", control: TaskControl | None = None
+) -> dict:
+    """Same as :func:`nx.pagerank`; large graphs go to the sparse backend."""
+    if sparse_backend.use_sparse(G):
+        return sparse_backend.pagerank(G, key, control)
+    return nx.pagerank(G)
+
+
+@timed("eigenvector")
+def eigenvector_centrality(
+    G: nx.Graph | nx.DiGraph, key: str = "", control: TaskControl | None = None
+) -> dict:
+    """Same as :func:`nx.eigenvector_centrality`; large graphs go to the sparse backend.
+
+    Small graphs that power iteration cannot settle, such as grids, are
+    solved by the sparse backend too.
+    """
+    if not sparse_backend.use_sparse(G):
+        try:
+            return nx.eigenvector_centrality(G)
+        except nx.PowerIterationFailedConvergence:
+            pass
+    return sparse_backend.eigenvector_centrality(G, key, control)
+
+
+CENTRALITY_MEASURES = {
+    "degree": degree_centrality,
+    "pagerank": pagerank,
+    "eigenvector": eigenvector_centrality,
+}
@@ -0,0 +1,271 @@
+"""Sampled estimates of measures that are too slow to compute exactly.
+
+Each function takes a time budget in seconds and keeps drawing samples in
+batches until the budget is spent, or until every node has been sampled, in
+which case the result is exact. ``None`` means no budget: always compute the
+exact value. Results carry their error bounds and the time they took.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from statistics import NormalDist
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+from app.services import sparse_backend
+from app.services.graph_arrays import adjacency_matrix
+from app.services.instrumentation import timed
+from app.services.stats import graph_stats
+from app.services.tasks import TaskControl
+
+BUDGETS: dict[str, float | None] = {"1s": 1.0, "5s": 5.0, "30s": 30.0, "exact": None}
+CONFIDENCE = 0.95
+SEED = 42
+BETWEENNESS_BATCH = 16
+DISTANCE_BATCH = 16
+WEDGE_BATCH = 100_000
+
+
+@dataclass
+class Estimate:
+    """A value with lower and upper bounds; ``high`` is ``None`` if unbounded."""
+
+    label: str
+    value: float
+    low: float
+    high: float | None
+
+    def describe(self) -> str:
+        if self.low == self.value == self.high:
+            return f"{self.value:.4g}"
+        high = "∞" if self.high is None else f"{self.high:.4g}"
+        return f"{self.value:.4g} ({self.low:.4g} – {high})"
+
+
+@dataclass
+class ApproxResult:
+    estimates: list[Estimate]
+    samples: int
+    population: int
+    unit: str
+    seconds: float
+    per_node: dict = field(default_factory=dict)
+    per_node_error: float = 0.0
+
+    @property
+    def exact(self) -> bool:
+        return self.samples >= self.population
+
+    def summary(self) -> dict[str, str]:
+        """The rows shown under the approximation in the graph page sidebar."""
+        rows = {e.label: e.describe() for e in self.estimates}
+        if self.per_node and not self.exact:
+            rows["Error per node"] = f"± {self.per_node_error:.4g}"
+        if self.exact:
+            rows["Method"] = "Exact"
+        elif math.isinf(self.population):
+            rows["Method"] = f"{self.samples:,} sampled {self.unit}"
+        else:
+            rows["Method"] = f"{self.samples:,} of {self.population:,} {self.unit}"
+        rows["Time"] = f"{self.seconds:.2f} s"
+        return rows
+
+
+def _hoeffding(samples: int, value_range: float = 1.0) -> float:
+    """Half-width of a ``CONFIDENCE`` interval for a mean of bounded samples."""
+    if samples == 0:
+        return value_range
+    return value_range * math.sqrt(math.log(2 / (1 - CONFIDENCE)) / (2 * samples))
+
+
+def _out_of_time(start: float, budget: float | None) -> bool:
+    return budget is not None and time.perf_counter() - start >= budget
+
+
+def _report(
+    control: TaskControl | None, start: float, budget: float | None, done: float
+) -> None:
+    if control is not None:
+        if budget is None:
+            control.report(done)
+        else:
+            control.report(min(max(done, (time.perf_counter() - start) / budget), 1.0))
+
+
+@timed("approx_betweenness")
+def betweenness(
+    G: nx.Graph | nx.DiGraph,
+    key: str = "",
+    budget: float | None = None,
+    control: TaskControl | None = None,
+) -> ApproxResult:
+    """Betweenness centrality from a random sample of source nodes.
+
+    Same as :func:`nx.betweenness_centrality` with ``k`` equal to the number
+    of sources processed within the budget; exact if every node was used.
+    Like NetworkX, sums are divided by ``k * (n - 2)`` ordered pairs, and by
+    ``(k - 1) * (n - 2)`` for sampled nodes, which are never inside their
+    own paths. The per-node error is a Hoeffding bound on the normalized
+    value.
+    """
+    start = time.perf_counter()
+    n = G.number_of_nodes()
+    A = adjacency_matrix(G, key)
+    sources = np.random.default_rng(SEED).permutation(n)
+    raw = np.zeros(n)
+    done = 0
+    while done < n and (done == 0 or not _out_of_time(start, budget)):
+        batch = sources[done : done + BETWEENNESS_BATCH]
+        raw += sparse_backend.dependencies(A, batch)
+        done += len(batch)
+        _report(control, start, budget, done / max(n, 1))
+
+    values = np.zeros(n)
+    if n > 2:
+        counts = np.full(n, float(done))
+        counts[sources[:done]] -= 1
+        values = raw / (counts * (n - 2))
+    per_node = dict(zip(G, values.tolist()))
+    top = max(per_node.values(), default=0.0)
+    return ApproxResult(
+        estimates=[Estimate("Highest betweenness", top, top, top)],
+        samples=done,
+        population=n,
+        unit="sources",
+        seconds=time.perf_counter() - start,
+        per_node=per_node,
+        per_node_error=_hoeffding(done) if done < n else 0.0,
+    )
+
+
+@timed("approx_clustering")
+def average_clustering(
+    G: nx.Graph,
+    key: str = "",
+    budget: float | None = None,
+    control: TaskControl | None = None,
+) -> ApproxResult:
+    """Average clustering estimated from randomly sampled wedges.
+
+    Each trial picks a node and two of its neighbours and checks whether
+    they are linked, as in :func:`nx.approximation.average_clustering`.
+    Without a budget the exact value comes from :func:`graph_stats`.
+    """
+    start = time.perf_counter()
+    n = G.number_of_nodes()
+    if budget is None or n == 0:
+        value = graph_stats(G, key).average_clustering or 0.0
+        return ApproxResult(
+            estimates=[Estimate("Avg. Clustering", value, value, value)],
+            samples=n,
+            population=n,
+            unit="nodes",
+            seconds=time.perf_counter() - start,
+        )
+    A = adjacency_matrix(G, key)
+    degrees = np.diff(A.indptr)
+    arcs = np.repeat(np.arange(n, dtype=np.int64), degrees) * n + A.indices
+    rng = np.random.default_rng(SEED)
+    trials = closed = 0
+    while trials == 0 or not _out_of_time(start, budget):
+        nodes = rng.integers(0, n, WEDGE_BATCH)
+        d = degrees[nodes]
+        wedge = d >= 2
+        nodes, d = nodes[wedge], d[wedge]
+        first = rng.integers(0, np.maximum(d, 1))
+        second = rng.integers(0, np.maximum(d - 1, 1))
+        second += second >= first
+        u = A.indices[A.indptr[nodes] + first].astype(np.int64)
+        v = A.indices[A.indptr[nodes] + second].astype(np.int64)
+        pos = np.searchsorted(arcs, u * n + v)
+        hit = arcs[np.minimum(pos, len(arcs) - 1)] == u * n + v
+        closed += int(np.count_nonzero(hit))
+        trials += WEDGE_BATCH
+        _report(control, start, budget, 0.0)
+
+    value = closed / trials
+    error = _hoeffding(trials)
+    return ApproxResult(
+        estimates=[
+            Estimate(
+                "Avg. Clustering",
+                value,
+                max(value - error, 0.0),
+                min(value + error, 1.0),
+            )
+        ],
+        samples=trials,
+        population=math.inf,
+        unit="wedges",
+        seconds=time.perf_counter() - start,
+    )
+
+
+@timed("approx_distances")
+def distances(
+    G: nx.Graph | nx.DiGraph,
+    key: str = "",
+    budget: float | None = None,
+    control: TaskControl | None = None,
+) -> ApproxResult:
+    """Diameter and average distance from BFS runs at sampled source nodes.
+
+    Distances are taken over reachable pairs only. The largest distance seen
+    is a lower bound on the diameter; on a connected undirected graph twice
+    the smallest eccentricity seen is an upper bound. The average distance
+    carries a ``CONFIDENCE`` interval from the spread of per-source means.
+    """
+    start = time.perf_counter()
+    n = G.number_of_nodes()
+    A = adjacency_matrix(G, key)
+    sources = np.random.default_rng(SEED).permutation(n)
+    eccentricity, total, reached = [], [], []
+    done = 0
+    while done < n and (done == 0 or not _out_of_time(start, budget)):
+        batch = sources[done : done + DISTANCE_BATCH]
+        dist = shortest_path(A, directed=True, unweighted=True, indices=batch)
+        finite = np.where(np.isfinite(dist), dist, 0)
+        eccentricity.append(finite.max(axis=1))
+        total.append(finite.sum(axis=1))
+        reached.append(np.isfinite(dist).sum(axis=1) - 1)
+        done += len(batch)
+        _report(control, start, budget, done / max(n, 1))
+
+    ecc = np.concatenate(eccentricity) if eccentricity else np.zeros(0)
+    total = np.concatenate(total) if total else np.zeros(0)
+    reached = np.concatenate(reached) if reached else np.zeros(0)
+    exact = done >= n
+    diameter = float(ecc.max(initial=0))
+    upper = diameter
+    if not exact:
+        connected = not G.is_directed() and bool(np.all(reached == n - 1))
+        upper = float(2 * ecc.min()) if connected else None
+
+    pairs = reached.sum()
+    average = float(total.sum() / pairs) if pairs else 0.0
+    error = 0.0
+    means = total[reached > 0] / reached[reached > 0]
+    if not exact and len(means) > 1:
+        z = NormalDist().inv_cdf((1 + CONFIDENCE) / 2)
+        error = z * float(means.std(ddof=1)) / math.sqrt(len(means))
+        error *= math.sqrt(1 - done / n)
+    return ApproxResult(
+        estimates=[
+            Estimate("Diameter", diameter, diameter, upper),
+            Estimate(
+                "Avg. Distance", average, max(average - error, 0.0), average + error
+            ),
+        ],
+        samples=done,
+        population=n,
+        unit="sources",
+        seconds=time.perf_counter() - start,
+    )
+
+
+APPROXIMATIONS = {
+    "betweenness": betweenness,
+    "clustering": average_clustering,
+    "distances": distances,
+}
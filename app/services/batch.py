@@ -0,0 +1,123 @@
+import os
+import uuid
+from dataclasses import dataclass
+import networkx as nx
+import numpy as np
+from app.services.edge_parser import EdgeListParser, iter_text_chunks
+from app.services.executor import pair_distances
+from app.services.graph_cache import LRUCache
+from app.services.instrumentation import timed
+from app.services.paths import path_index
+from app.services.result_store import shared_results
+from app.services.results import LABEL_BYTES
+from app.services.tasks import TaskControl
+
+MAX_BATCH_PAIRS = 1_000_000
+STATUSES = ("ok", "no path", "unknown node")
+DEFAULT_BATCH_CACHE_BYTES = 128 * 1024 * 1024
+
+
+@dataclass
+class BatchSummary:
+    pairs: int
+    unknown: int
+    unreachable: int
+    malformed: int
+    result_id: str
+
+
+@dataclass
+class BatchResult:
+    """The distance of every queried pair, in input order.
+
+    ``src`` and ``dst`` are positions in ``labels``, ``distances`` is ``-1``
+    where there is no distance and ``status`` indexes :data:`STATUSES`.
+    """
+
+    labels: list[str]
+    src: np.ndarray
+    dst: np.ndarray
+    distances: np.ndarray
+    status: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.src, self.dst, self.distances, self.status)
+        return LABEL_BYTES * len(self.labels) + sum(a.nbytes for a in arrays)
+
+
+batch_cache: LRUCache[str, BatchResult] = LRUCache(
+    max_bytes=int(os.environ.get("BATCH_CACHE_MAX_BYTES", DEFAULT_BATCH_CACHE_BYTES)),
+    sizeof=lambda result: max(result.nbytes, 1),
+    name="batch",
+)
+
+
+def get_batch(result_id: str) -> BatchResult | None:
+    """A batch result from this process or the shared store, or ``None``."""
+    result = batch_cache.get(result_id)
+    if result is None:
+        result = shared_results.get(f"batch:{result_id}")
+        if result is not None:
+            batch_cache.put(result_id, result)
+    return result
+
+
+def parse_pairs(text: str) -> tuple[list[str], np.ndarray, np.ndarray, int]:
+    """Parses ``source, target`` lines into label ids.
+
+    Returns the interned labels, the source and target ids and the number of
+    malformed lines. Extra columns and ``#`` comments are ignored.
+    """
+    parser = EdgeListParser(skip_comments=True, extra_columns=True)
+    batches = [parser.feed(chunk) for chunk in iter_text_chunks(text)]
+    batches.append(parser.finish())
+    src = np.concatenate([batch.src for batch in batches])
+    dst = np.concatenate([batch.dst for batch in batches])
+    return parser.labels, src, dst, parser.malformed_count
+
+
+@timed("batch_distances")
+def run_batch(
+    G: nx.Graph | nx.DiGraph,
+    key: str,
+    text: str,
+    control: TaskControl | None = None,
+) -> BatchSummary:
+    """Computes the distance for every pair in ``text``.
+
+    The result is kept in :data:`batch_cache` and the shared result store
+    under the summary's ``result_id`` until it is downloaded through
+    :mod:`app.services.export`.
+    """
+    labels, src_ids, dst_ids, malformed = parse_pairs(text)
+    if len(src_ids) > MAX_BATCH_PAIRS:
+        raise ValueError(f"At most {MAX_BATCH_PAIRS:,} pairs can be queried at once.")
+    index = path_index(G, key).index
+    positions = np.fromiter(
+        (index.get(label, -1) for label in labels), dtype=np.int64, count=len(labels)
+    )
+    src, dst = positions[src_ids], positions[dst_ids]
+    known = (src >= 0) & (dst >= 0)
+    distances = np.full(len(src), np.nan)
+    distances[known] = pair_distances(G, key, src[known], dst[known], control)
+
+    status = np.where(known, 0, 2).astype(np.uint8)
+    status[np.isinf(distances)] = 1
+    result_id = uuid.uuid4().hex
+    result = BatchResult(
+        labels=labels,
+        src=src_ids,
+        dst=dst_ids,
+        distances=np.where(np.isfinite(distances), distances, -1).astype(np.int64),
+        status=status,
+    )
+    batch_cache.put(result_id, result)
+    shared_results.put(f"batch:{result_id}", result)
+    return BatchSummary(
+        pairs=len(src),
+        unknown=int(np.count_nonzero(~known)),
+        unreachable=int(np.count_nonzero(np.isinf(distances))),
+        malformed=malformed,
+        result_id=result_id,
+    )
@@ -0,0 +1,255 @@
+import gc
+import re
+import time
+from dataclasses import dataclass, field
+from collections.abc import Callable, Iterable, Iterator
+import networkx as nx
+import numpy as np
+from app.services.instrumentation import Span, graph_size, record
+
+CHUNK_CHARS = 4 * 1024 * 1024
+MAX_REPORTED_ERRORS = 20
+ProgressCallback = Callable[[float], None]
+_PAIR_LINES = re.compile(r"(?:[^,\n]*,[^,\n]*\n)*")
+_BLANKS = re.compile(r"[ \t]+")
+_COMMENT_LINES = re.compile(r"^[ \t]*#[^\n]*\n", re.MULTILINE)
+
+
+@dataclass
+class MalformedLine:
+    line_no: int
+    text: str
+
+
+@dataclass
+class EdgeBatch:
+    """Edges of one parsed chunk as interned integer node ids."""
+
+    src: np.ndarray
+    dst: np.ndarray
+
+
+class LabelIndex(dict[str, int]):
+    """Maps node labels to dense integer ids in first-seen order."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.labels: list[str] = []
+
+    def __missing__(self, label: str) -> int:
+        node_id = self[label] = len(self.labels)
+        self.labels.append(label)
+        return node_id
+
+
+@dataclass
+class EdgeListParser:
+    """Incremental comma-separated edge-list parser.
+
+    Text may be fed in arbitrary pieces; a trailing partial line is carried
+    over to the next call. Chunks where every line is a plain ``a, b`` pair,
+    once comment lines are removed, are tokenized with a single split; anything else falls back to a
+    line-by-line pass that records malformed lines. Node labels are interned
+    to integer ids so every occurrence of a label shares one string object.
+
+    The defaults match the form's textarea format. File ingestion can set
+    ``delimiter`` (``None`` splits on runs of spaces/tabs), skip a header row,
+    ignore ``#`` comment lines and accept extra trailing columns.
+    """
+
+    delimiter: str | None = ","
+    skip_header: bool = False
+    skip_comments: bool = False
+    extra_columns: bool = False
+    index: LabelIndex = field(default_factory=LabelIndex)
+    malformed: list[MalformedLine] = field(default_factory=list)
+    malformed_count: int = 0
+    lines_read: int = 0
+    _pending: str = ""
+
+    @property
+    def labels(self) -> list[str]:
+        return self.index.labels
+
+    def intern(self, label: str) -> int:
+        """Returns the integer id for a label, assigning a new one if unseen."""
+        return self.index[label]
+
+    def feed(self, text: str) -> EdgeBatch:
+        """Parses all complete lines in ``text`` and returns their edges."""
+        text = self._pending + text
+        if self.skip_header and self.lines_read == 0:
+            header_end = text.find("\n") + 1
+            if not header_end:
+                self._pending = text
+                return self._parse("")
+            text = text[header_end:]
+            self.lines_read = 1
+        cut = text.rfind("\n") + 1
+        self._pending = text[cut:]
+        return self._parse(text[:cut])
+
+    def finish(self) -> EdgeBatch:
+        """Parses any remaining partial line."""
+        text, self._pending = self._pending, ""
+        return self._parse(text + "\n" if text else "")
+
+    def _parse(self, text: str) -> EdgeBatch:
+        """Parses newline-terminated ``text``."""
+        n_lines = text.count("\n")
+        pairs = _COMMENT_LINES.sub("", text) if self.skip_comments else text
+        tokens = None
+        if pairs:
+            pairs = self._to_commas(pairs)
+            if _PAIR_LINES.fullmatch(pairs):
+                tokens = list(map(str.strip, pairs[:-1].replace("\n", ",").split(",")))
+                if "" in tokens:
+                    tokens = None
+        else:
+            tokens = []
+        if tokens is None:
+            # The line-by-line pass reads the unstripped text so that
+            # malformed lines keep their line numbers.
+            tokens = self._tokenize_lines(text.split("\n")[:-1])
+        self.lines_read += n_lines
+        ids = np.fromiter(
+            map(self.index.__getitem__, tokens), dtype=np.int64, count=len(tokens)
+        )
+        return EdgeBatch(src=ids[0::2], dst=ids[1::2])
+
+    def _to_commas(self, text: str) -> str:
+        if self.delimiter is None:
+            return _BLANKS.sub(",", text)
+        if self.delimiter != ",":
+            return text.replace(self.delimiter, ",")
+        return text
+
+    def _tokenize_lines(self, lines: list[str]) -> list[str]:
+        tokens: list[str] = []
+        first_line = self.lines_read + 1
+        for offset, line in enumerate(lines):
+            if self.skip_comments and line.lstrip().startswith("#"):
+                continue
+            parts = [p.strip() for p in self._to_commas(line).split(",") if p.strip()]
+            if len(parts) == 2 or (self.extra_columns and len(parts) > 2):
+                tokens.extend(parts[:2])
+            elif parts:
+                self._report(first_line + offset, line)
+        return tokens
+
+    def _report(self, line_no: int, line: str) -> None:
+        self.malformed_count += 1
+        if len(self.malformed) < MAX_REPORTED_ERRORS:
+            self.malformed.append(MalformedLine(line_no, line.strip()[:80]))
+
+
+def iter_text_chunks(
+    text: str,
+    chunk_chars: int = CHUNK_CHARS,
+    progress: ProgressCallback | None = None,
+) -> Iterator[str]:
+    """Splits text into pieces of roughly ``chunk_chars`` ending on newlines."""
+    start, length = 0, len(text)
+    while start < length:
+        end = text.find("\n", min(start + chunk_chars, length))
+        end = length if end == -1 else end + 1
+        yield text[start:end]
+        start = end
+        if progress is not None:
+            progress(start / length)
+
+
+def iter_edge_batches(
+    parser: EdgeListParser, chunks: Iterable[str]
+) -> Iterator[EdgeBatch]:
+    """Streams edge batches from text chunks through ``parser``."""
+    for chunk in chunks:
+        batch = parser.feed(chunk)
+        if len(batch.src):
+            yield batch
+    batch = parser.finish()
+    if len(batch.src):
+        yield batch
+
+
+def parse_node_labels(nodes_str: str) -> list[str]:
+    """Splits a comma-separated node list."""
+    return [n.strip() for n in nodes_str.split(",") if n.strip()]
+
+
+def build_graph_from_chunks(
+    chunks: Iterable[str],
+    directed: bool,
+    nodes: Iterable[str] = (),
+    parser: EdgeListParser | None = None,
+) -> nx.Graph | nx.DiGraph:
+    """Builds a graph by streaming edge-list text chunks into it in batches.
+
+    The cyclic garbage collector is paused while edges are inserted; the
+    millions of adjacency dicts created here would otherwise trigger repeated
+    full collections without ever producing garbage.
+
+    Malformed lines are recorded on ``G.graph["malformed_lines"]`` (first few,
+    with 1-based line numbers) and ``G.graph["malformed_count"]``. Time spent
+    parsing and inserting is recorded as the ``parse`` and ``graph_build``
+    stages.
+    """
+    parser = parser or EdgeListParser()
+    G = nx.DiGraph() if directed else nx.Graph()
+    labels = parser.labels
+    G.add_nodes_from(labels[parser.intern(n)] for n in nodes)
+    parse = Span("parse")
+    insert = Span("graph_build")
+    batches = iter_edge_batches(parser, chunks)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            parse.seconds += time.perf_counter() - start
+            if batch is None:
+                break
+            start = time.perf_counter()
+            G.add_edges_from(
+                zip(
+                    map(labels.__getitem__, batch.src.tolist()),
+                    map(labels.__getitem__, batch.dst.tolist()),
+                )
+            )
+            insert.seconds += time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    parse.size = insert.size = graph_size(G)
+    record(parse)
+    record(insert)
+    G.graph["malformed_lines"] = [(m.line_no, m.text) for m in parser.malformed]
+    G.graph["malformed_count"] = parser.malformed_count
+    return G
+
+
+def build_graph_from_text(
+    nodes_str: str,
+    edges_str: str,
+    directed: bool,
+    progress: ProgressCallback | None = None,
+) -> nx.Graph | nx.DiGraph:
+    """Builds a graph from the form's node and edge text."""
+    return build_graph_from_chunks(
+        iter_text_chunks(edges_str, progress=progress),
+        directed,
+        parse_node_labels(nodes_str),
+    )
+
+
+def describe_malformed(G: nx.Graph | nx.DiGraph, limit: int = 3) -> str:
+    """Human readable summary of the lines skipped while parsing ``G``."""
+    count = G.graph.get("malformed_count", 0)
+    if not count:
+        return ""
+    shown = ", ".join(
+        f"line {line_no}: '{text}'"
+        for line_no, text in G.graph.get("malformed_lines", [])[:limit]
+    )
+    return f"Skipped {count} malformed edge line(s) ({shown})."
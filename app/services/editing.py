@@ -0,0 +1,140 @@
+import dataclasses
+from dataclasses import dataclass
+from typing import Literal
+import networkx as nx
+import numpy as np
+from app.services.graph_arrays import adjacency_cache, edge_array_cache
+from app.services.graph_cache import edited_graph_key, graph_cache
+from app.services.graph_store import delete_graph, save_graph
+from app.services.instrumentation import forget_graph_size, timed
+from app.services.layout import (
+    LAYOUT_ENGINES,
+    LayoutBudget,
+    layout_cache,
+    resolve_engine,
+)
+from app.services.metrics import metrics_cache
+from app.services.node_search import node_index_cache
+from app.services.paths import path_index_cache
+from app.services.stats import GraphStats, graph_stats, stats_cache
+
+WARM_START_ENGINES = ("spring", "force", "random")
+RELAX_ENGINES = ("spring", "force")
+WARM_START_ITERATIONS = 5
+WARM_RELAX_MAX_NODES = 20_000
+
+
+@dataclass(frozen=True)
+class GraphEdit:
+    """Adds or removes a node, or an edge when ``target`` is given."""
+
+    action: Literal["add", "remove"]
+    source: str
+    target: str = ""
+
+
+def _mutate(G: nx.Graph | nx.DiGraph, stats: GraphStats, edit: GraphEdit) -> None:
+    """Applies an edit to ``G`` and ``stats`` together."""
+    u, v = edit.source, edit.target
+    if not v:
+        if edit.action == "add":
+            if u in G:
+                raise ValueError(f"Node '{u}' already exists.")
+            G.add_node(u)
+            stats.add_node(u)
+        else:
+            if u not in G:
+                raise ValueError(f"Node '{u}' does not exist.")
+            stats.remove_node(G, u)
+            G.remove_node(u)
+        return
+    if edit.action == "add":
+        if G.has_edge(u, v):
+            raise ValueError(f"Edge '{u}' - '{v}' already exists.")
+        for node in (u, v):
+            if node not in G:
+                G.add_node(node)
+                stats.add_node(node)
+        G.add_edge(u, v)
+        stats.edge_changed(G, u, v, added=True)
+    else:
+        if not G.has_edge(u, v):
+            raise ValueError(f"Edge '{u}' - '{v}' does not exist.")
+        G.remove_edge(u, v)
+        stats.edge_changed(G, u, v, added=False)
+
+
+def _warm_start(
+    G: nx.Graph | nx.DiGraph, old_nodes: list, old_pos: np.ndarray
+) -> np.ndarray:
+    """Carries positions over to the edited graph's node order.
+
+    New nodes are placed at the centroid of their positioned neighbours, or
+    near the middle of the layout if they have none.
+    """
+    index = {node: i for i, node in enumerate(old_nodes)}
+    nodes = list(G)
+    rows = np.fromiter(
+        (index.get(node, -1) for node in nodes), dtype=np.int64, count=len(nodes)
+    )
+    pos = old_pos[np.maximum(rows, 0)] if len(old_pos) else np.zeros((len(nodes), 2))
+    center = old_pos.mean(axis=0) if len(old_pos) else np.zeros(2)
+    rng = np.random.default_rng(42)
+    for i in np.nonzero(rows < 0)[0].tolist():
+        known = [index[nbr] for nbr in G.adj[nodes[i]] if nbr in index]
+        pos[i] = old_pos[known].mean(axis=0) if known else center
+        pos[i] += rng.normal(scale=0.01, size=2)
+    return pos
+
+
+@timed("edit")
+def apply_edit(
+    G: nx.Graph | nx.DiGraph,
+    key: str,
+    edit: GraphEdit,
+    engine: str = "auto",
+    private: bool = False,
+) -> tuple[nx.Graph | nx.DiGraph, str]:
+    """Applies an edit and returns the edited graph and its new cache key.
+
+    Cached graphs are shared between sessions, so the first edit copies the
+    graph; later edits (``private=True``) change the session's copy in place.
+    Statistics are carried over and updated from the touched neighbourhood,
+    and the layout is warm-started from the previous positions.
+
+    Edited keys are not content hashes, so the graph cannot be rebuilt from
+    its key: it is saved to the graph store, where it outlives the cache,
+    and a privately edited graph's previous version is deleted from it.
+    """
+    stats = graph_stats(G, key)
+    if not private:
+        G = G.copy()
+        stats = dataclasses.replace(stats, triangles=dict(stats.triangles))
+    resolved = resolve_engine(G, engine)
+    old_pos = layout_cache.get((key, resolved))
+    old_nodes = list(G) if old_pos is not None else []
+
+    _mutate(G, stats, edit)
+    forget_graph_size(G)
+
+    if private:
+        graph_cache.pop(key)
+        stats_cache.pop(key)
+        path_index_cache.pop(key)
+        adjacency_cache.pop(key)
+        edge_array_cache.pop(key)
+        metrics_cache.pop(key)
+        node_index_cache.pop(key)
+        delete_graph(key)
+    new_key = edited_graph_key(key)
+    graph_cache.put(new_key, G)
+    save_graph(new_key, G)
+    stats_cache.put(new_key, stats)
+    resolved = resolve_engine(G, engine)
+    if old_pos is not None and resolved in WARM_START_ENGINES:
+        pos = _warm_start(G, old_nodes, old_pos)
+        if resolved in RELAX_ENGINES and G.number_of_nodes() <= WARM_RELAX_MAX_NODES:
+            budget = LayoutBudget(iterations=WARM_START_ITERATIONS)
+            pos = LAYOUT_ENGINES[resolved](G, budget, pos)
+        layout_cache.put((new_key, resolved), pos)
+    return G, new_key
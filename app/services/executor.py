@@ -0,0 +1,324 @@
+"""Runs graph algorithms on a pool of worker processes.
+
+NetworkX algorithms hold the GIL, so the thread pool in
+:mod:`app.services.tasks` keeps the event loop responsive but cannot use more
+than one core. For large graphs the work is sent to worker processes instead.
+Each graph is written once into a shared-memory CSR snapshot. Workers attach
+to the snapshot by name and wrap it in a SciPy matrix without copying, then
+run vectorized versions of the algorithms over the node range they were given.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import chain
+from multiprocessing.shared_memory import SharedMemory
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import shortest_path
+from app.services import sparse_backend
+from app.services.graph_arrays import adjacency_matrix
+from app.services.graph_cache import LRUCache
+from app.services.tasks import ExecutorBusy, TaskControl
+
+PARALLEL_MIN_EDGES = int(os.environ.get("GRAPH_PARALLEL_MIN_EDGES", 50_000))
+WORKERS = int(os.environ.get("GRAPH_WORKERS", os.cpu_count() or 1))
+MAX_QUEUED_JOBS = int(os.environ.get("GRAPH_MAX_QUEUED_JOBS", 4 * WORKERS))
+PARTS_PER_WORKER = 4
+SOURCES_PER_JOB = 16
+WORKER_ATTACHED_SNAPSHOTS = 4
+WAIT_INTERVAL_SECONDS = 0.25
+DEFAULT_SNAPSHOT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SnapshotRef:
+    """What a worker needs to attach to a snapshot; cheap to pickle."""
+
+    name: str
+    n: int
+    nnz: int
+    index_dtype: str
+
+    def views(self, buf: memoryview) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The (indptr, indices, data) arrays laid out in ``buf``."""
+        dtype = np.dtype(self.index_dtype)
+        indptr = np.ndarray((self.n + 1,), dtype=dtype, buffer=buf)
+        offset = indptr.nbytes
+        indices = np.ndarray((self.nnz,), dtype=dtype, buffer=buf, offset=offset)
+        offset += indices.nbytes
+        data = np.ndarray((self.nnz,), dtype=np.int8, buffer=buf, offset=offset)
+        return indptr, indices, data
+
+    def matrix(self, buf: memoryview) -> sp.csr_matrix:
+        indptr, indices, data = self.views(buf)
+        return sp.csr_matrix(
+            (data, indices, indptr), shape=(self.n, self.n), copy=False
+        )
+
+
+class GraphSnapshot:
+    """A graph's :func:`adjacency_matrix` in a shared-memory block.
+
+    The block is unlinked once the snapshot has left the cache and no job is
+    still using it.
+    """
+
+    def __init__(self, G: nx.Graph | nx.DiGraph, key: str = ""):
+        n = G.number_of_nodes()
+        csr = adjacency_matrix(G, key)
+        index_dtype = np.dtype(np.int32 if max(n, csr.nnz) < 2**31 else np.int64)
+        size = (n + 1 + csr.nnz) * index_dtype.itemsize + csr.nnz
+        self._shm = SharedMemory(create=True, size=max(size, 1))
+        self.ref = SnapshotRef(
+            name=self._shm.name, n=n, nnz=csr.nnz, index_dtype=index_dtype.str
+        )
+        indptr, indices, data = self.ref.views(self._shm.buf)
+        indptr[:] = csr.indptr
+        indices[:] = csr.indices
+        data[:] = csr.data
+        self.matrix = self.ref.matrix(self._shm.buf)
+        self.nbytes = size
+        self._users = 0
+        self._evicted = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            self._maybe_unlink()
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evicted = True
+            self._maybe_unlink()
+
+    def _maybe_unlink(self) -> None:
+        if self._evicted and self._users == 0 and self._shm is not None:
+            self.matrix = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+snapshot_cache: LRUCache[str, GraphSnapshot] = LRUCache(
+    max_bytes=int(
+        os.environ.get("SNAPSHOT_CACHE_MAX_BYTES", DEFAULT_SNAPSHOT_CACHE_BYTES)
+    ),
+    sizeof=lambda snapshot: snapshot.nbytes,
+    on_evict=lambda _, snapshot: snapshot.evict(),
+    name="snapshot",
+)
+
+
+def graph_snapshot(G: nx.Graph | nx.DiGraph, key: str) -> GraphSnapshot:
+    """Returns the cached snapshot for a graph, building it on a miss."""
+    return snapshot_cache.get_or_create(key, lambda: GraphSnapshot(G, key))
+
+
+# -- Worker side ------------------------------------------------------------
+
+_attached: OrderedDict[str, tuple[SharedMemory, sp.csr_matrix]] = OrderedDict()
+
+
+def _attach(ref: SnapshotRef) -> sp.csr_matrix:
+    """Maps a snapshot into this worker, keeping the most recent few open."""
+    entry = _attached.get(ref.name)
+    if entry is None:
+        shm = SharedMemory(name=ref.name)
+        entry = (shm, ref.matrix(shm.buf))
+        _attached[ref.name] = entry
+        while len(_attached) > WORKER_ATTACHED_SNAPSHOTS:
+            _attached.popitem(last=False)[1][0].close()
+    _attached.move_to_end(ref.name)
+    return entry[1]
+
+
+def _clustering_range(ref: SnapshotRef, lo: int, hi: int) -> np.ndarray:
+    """Clustering coefficients of nodes ``lo`` to ``hi``."""
+    return sparse_backend.clustering_range(_attach(ref), lo, hi)
+
+
+def _source_distances(
+    A: sp.csr_matrix, sources: np.ndarray, targets: list[np.ndarray]
+) -> list[np.ndarray]:
+    """Hop counts from each source to its targets; ``inf`` if unreachable."""
+    return [
+        shortest_path(A, method="D", unweighted=True, indices=int(source))[dst]
+        for source, dst in zip(sources.tolist(), targets)
+    ]
+
+
+def _distance_job(
+    ref: SnapshotRef, sources: np.ndarray, targets: list[np.ndarray]
+) -> list[np.ndarray]:
+    return _source_distances(_attach(ref), sources, targets)
+
+
+# -- Dispatch ---------------------------------------------------------------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_queued = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    """Drops a pool whose worker died so the next job starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _admit(jobs: int) -> None:
+    """Reserves queue slots for ``jobs`` jobs or raises :class:`ExecutorBusy`."""
+    global _queued
+    with _pool_lock:
+        if _queued + jobs > MAX_QUEUED_JOBS and _queued > 0:
+            raise ExecutorBusy(
+                "The server is busy with other calculations. Try again shortly."
+            )
+        _queued += jobs
+
+
+def _finish(_: Future) -> None:
+    global _queued
+    with _pool_lock:
+        _queued -= 1
+
+
+def _run_jobs(
+    snapshot: GraphSnapshot,
+    fn,
+    jobs: list[tuple],
+    control: TaskControl | None = None,
+) -> list:
+    """Runs ``fn(ref, *job)`` for each job and returns results in job order.
+
+    Progress is reported as jobs complete. When the task is cancelled, jobs
+    that have not started are dropped.
+    """
+    _admit(len(jobs))
+    snapshot.acquire()
+    pool = _get_pool()
+    futures = []
+    try:
+        for job in jobs:
+            future = pool.submit(fn, snapshot.ref, *job)
+            future.add_done_callback(_finish)
+            futures.append(future)
+        pending = set(futures)
+        while pending:
+            _, pending = wait(
+                pending, timeout=WAIT_INTERVAL_SECONDS, return_when=FIRST_COMPLETED
+            )
+            if control is not None:
+                control.report(1 - len(pending) / len(jobs))
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+        for _ in range(len(jobs) - len(futures)):
+            _finish(None)
+        snapshot.release()
+
+
+def _partition(snapshot: GraphSnapshot, parts: int) -> list[tuple[int, int]]:
+    """Splits the node range into ``parts`` ranges of similar clustering cost."""
+    n = snapshot.ref.n
+    cost = np.cumsum(sparse_backend.two_path_counts(snapshot.matrix, 0, n) + 1)
+    bounds = np.searchsorted(cost, np.linspace(0, cost[-1], parts + 1)[1:-1])
+    edges = np.unique(np.concatenate([[0], bounds, [n]]))
+    return [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+
+
+def use_pool(G: nx.Graph | nx.DiGraph, key: str) -> bool:
+    return bool(key) and G.number_of_edges() >= PARALLEL_MIN_EDGES
+
+
+def clustering_values(
+    G: nx.Graph, key: str, control: TaskControl | None = None
+) -> np.ndarray:
+    """Clustering coefficients in node order, spread across worker processes.
+
+    Only worth it for graphs where :func:`use_pool` holds; below that,
+    process start-up and transfer cost more than they save.
+    """
+    snapshot = graph_snapshot(G, key)
+    ranges = _partition(snapshot, WORKERS * PARTS_PER_WORKER)
+    parts = _run_jobs(snapshot, _clustering_range, ranges, control)
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def pair_distances(
+    G: nx.Graph | nx.DiGraph,
+    key: str,
+    src: np.ndarray,
+    dst: np.ndarray,
+    control: TaskControl | None = None,
+) -> np.ndarray:
+    """Hop counts between the node positions ``src[i]`` and ``dst[i]``.
+
+    Pairs are grouped by source so that one BFS answers every target from
+    that source; on undirected graphs they are grouped by target instead
+    when that gives fewer searches. Groups are spread across the worker
+    pool for large graphs. Unreachable pairs get ``inf``.
+    """
+    if not G.is_directed() and len(np.unique(dst)) < len(np.unique(src)):
+        src, dst = dst, src
+    order = np.argsort(src, kind="stable")
+    sources, starts = np.unique(src[order], return_index=True)
+    groups = np.split(order, starts[1:])
+    targets = [dst[group] for group in groups]
+    jobs = [
+        (sources[i : i + SOURCES_PER_JOB], targets[i : i + SOURCES_PER_JOB])
+        for i in range(0, len(sources), SOURCES_PER_JOB)
+    ]
+    if use_pool(G, key):
+        results = _run_jobs(graph_snapshot(G, key), _distance_job, jobs, control)
+    else:
+        A = adjacency_matrix(G, key)
+        results = []
+        for job in jobs:
+            results.append(_source_distances(A, *job))
+            if control is not None:
+                control.report(len(results) / len(jobs))
+    out = np.empty(len(src))
+    for group, distances in zip(groups, chain.from_iterable(results)):
+        out[group] = distances
+    return out
+
+
+@atexit.register
+def shutdown() -> None:
+    """Stops the workers and frees every shared-memory snapshot."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+    snapshot_cache.clear()
@@ -0,0 +1,352 @@
+"""Graphs and computed results streamed as downloadable files.
+
+An export is a :class:`Table` of equal-length columns backed by the arrays
+already cached for a graph, a per-node result or a batch of distances.
+Writers walk it ``CHUNK_ROWS`` rows at a time and yield each chunk's bytes
+as soon as it is encoded, so a download of millions of rows holds one chunk
+of text in memory rather than the whole file.
+
+CSV and Parquet files hold one row per edge or result row, with node labels
+written out. NPZ files keep the arrays as they are: a label column is stored
+as int64 positions into a label table, which is saved once as UTF-8 bytes
+(``<table>_utf8``) and their offsets (``<table>_offsets``). GraphML is only
+offered for graphs. Node and edge attributes are not exported.
+"""
+
+import csv
+import html
+import io
+import zipfile
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+import numpy as np
+from app.services.batch import STATUSES, get_batch
+from app.services.graph_arrays import cached_edge_arrays
+from app.services.graph_cache import graph_cache
+from app.services.graph_store import load_arrays
+from app.services.results import get_result
+
+CHUNK_ROWS = 64 * 1024
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "graphml": "application/graphml+xml",
+    "npz": "application/zip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass
+class Column:
+    """One exported column.
+
+    If ``labels`` is set, ``values`` are positions in it and the column is
+    written as the labels; columns with the same ``table`` share one label
+    table in NPZ files. Rows where ``missing`` is true are left empty.
+    """
+
+    name: str
+    values: np.ndarray
+    labels: Sequence | None = None
+    table: str = ""
+    missing: np.ndarray | None = None
+
+    def chunk(self, rows: slice | np.ndarray) -> list:
+        """The column's values for ``rows``, as Python objects."""
+        values = self.values[rows].tolist()
+        if self.labels is not None:
+            labels = self.labels
+            return [str(labels[i]) for i in values]
+        if self.missing is not None:
+            missing = self.missing[rows].tolist()
+            return [None if gap else value for value, gap in zip(values, missing)]
+        return values
+
+
+@dataclass
+class Table:
+    """The columns of an export, read in the row order given by ``order``.
+
+    Graphs also carry every node and whether edges are directed, which
+    GraphML needs and an edge list cannot show.
+    """
+
+    columns: list[Column]
+    rows: int
+    order: np.ndarray | None = None
+    nodes: Sequence | None = None
+    directed: bool = False
+
+    def chunks(self) -> Iterator[slice | np.ndarray]:
+        for start in range(0, self.rows, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, self.rows)
+            yield slice(start, stop) if self.order is None else self.order[start:stop]
+
+
+def graph_table(key: str) -> Table | None:
+    """The edge list of a cached or stored graph, or ``None`` if it is gone.
+
+    A graph that is only in the store is read from its arrays without
+    rebuilding it in NetworkX.
+    """
+    G = graph_cache.get(key)
+    if G is not None:
+        directed, nodes = G.is_directed(), list(G)
+        src, dst = cached_edge_arrays(G, key)
+    else:
+        arrays = load_arrays(key)
+        if arrays is None:
+            return None
+        directed, nodes, src, dst = arrays
+    return Table(
+        columns=[
+            Column("source", src, nodes, "nodes"),
+            Column("target", dst, nodes, "nodes"),
+        ],
+        rows=len(src),
+        nodes=nodes,
+        directed=directed,
+    )
+
+
+def result_table(result_id: str) -> Table | None:
+    """A per-node result from highest to lowest value, or ``None`` if expired."""
+    index = get_result(result_id)
+    if index is None:
+        return None
+    positions = np.arange(len(index.labels), dtype=np.int64)
+    return Table(
+        columns=[
+            Column("rank", index.ranks),
+            Column("node", positions, index.labels, "nodes"),
+            Column("value", index.values),
+        ],
+        rows=len(positions),
+        order=index.order,
+    )
+
+
+def batch_table(result_id: str) -> Table | None:
+    """Batch distances in input order, or ``None`` if expired."""
+    result = get_batch(result_id)
+    if result is None:
+        return None
+    return Table(
+        columns=[
+            Column("source", result.src, result.labels, "nodes"),
+            Column("target", result.dst, result.labels, "nodes"),
+            Column("distance", result.distances, missing=result.distances < 0),
+            Column("status", result.status, STATUSES, "statuses"),
+        ],
+        rows=len(result.src),
+    )
+
+
+EXPORTS: dict[str, Callable[[str], Table | None]] = {
+    "graph": graph_table,
+    "result": result_table,
+    "batch": batch_table,
+}
+
+
+class _Sink(io.RawIOBase):
+    """An unseekable file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _csv(table: Table) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in table.columns])
+    for rows in table.chunks():
+        writer.writerows(zip(*(column.chunk(rows) for column in table.columns)))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _escaped(labels: list[str]) -> list[str]:
+    """``labels`` escaped for double-quoted XML attributes, in one pass."""
+    text = html.escape("\0".join(labels), quote=True)
+    for char, ref in (("\n", "&#10;"), ("\r", "&#13;"), ("\t", "&#9;")):
+        text = text.replace(char, ref)
+    return text.split("\0")
+
+
+def _graphml(table: Table) -> Iterator[bytes]:
+    edgedefault = "directed" if table.directed else "undirected"
+    yield (
+        "<?xml version='1.0' encoding='utf-8'?>\n"
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        f'<graph edgedefault="{edgedefault}">\n'
+    ).encode("utf-8")
+    nodes = table.nodes
+    for start in range(0, len(nodes), CHUNK_ROWS):
+        chunk = _escaped([str(node) for node in nodes[start : start + CHUNK_ROWS]])
+        yield "".join(f'<node id="{node}"/>\n' for node in chunk).encode("utf-8")
+    source, target = table.columns
+    for rows in table.chunks():
+        yield "".join(
+            f'<edge source="{u}" target="{v}"/>\n'
+            for u, v in zip(_escaped(source.chunk(rows)), _escaped(target.chunk(rows)))
+        ).encode("utf-8")
+    yield b"</graph>\n</graphml>\n"
+
+
+def _parquet(table: Table) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            (
+                column.name,
+                pa.string()
+                if column.labels is not None
+                else pa.from_numpy_dtype(column.values.dtype),
+            )
+            for column in table.columns
+        ]
+    )
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in table.chunks():
+            arrays = []
+            for column, field in zip(table.columns, schema):
+                if column.labels is not None:
+                    arrays.append(pa.array(column.chunk(rows), type=field.type))
+                else:
+                    mask = None if column.missing is None else column.missing[rows]
+                    arrays.append(pa.array(column.values[rows], mask=mask))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _npy_header(dtype: np.dtype, shape: tuple[int, ...]) -> bytes:
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header,
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": shape,
+        },
+    )
+    return header.getvalue()
+
+
+def _label_offsets(labels: Sequence) -> np.ndarray:
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    for start in range(0, len(labels), CHUNK_ROWS):
+        chunk = labels[start : start + CHUNK_ROWS]
+        lengths = np.fromiter(
+            (len(str(label).encode("utf-8")) for label in chunk),
+            dtype=np.int64,
+            count=len(chunk),
+        )
+        offsets[start + 1 : start + 1 + len(chunk)] = offsets[start] + np.cumsum(
+            lengths
+        )
+    return offsets
+
+
+def _npz(table: Table) -> Iterator[bytes]:
+    """An uncompressed ``.npz`` archive, like :func:`np.savez` writes."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as archive:
+
+        def member(
+            name: str, dtype: type, shape: tuple[int, ...], parts: Iterator[bytes]
+        ) -> Iterator[bytes]:
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as out:
+                out.write(_npy_header(np.dtype(dtype), shape))
+                for part in parts:
+                    out.write(part)
+                    yield sink.drain()
+            yield sink.drain()
+
+        tables = {}
+        for column in table.columns:
+            if column.labels is not None:
+                tables.setdefault(column.table, column.labels)
+        for name, labels in tables.items():
+            offsets = _label_offsets(labels)
+            yield from member(
+                f"{name}_offsets", np.int64, offsets.shape, iter([offsets.tobytes()])
+            )
+            yield from member(
+                f"{name}_utf8",
+                np.uint8,
+                (int(offsets[-1]),),
+                (
+                    "".join(map(str, labels[start : start + CHUNK_ROWS])).encode(
+                        "utf-8"
+                    )
+                    for start in range(0, len(labels), CHUNK_ROWS)
+                ),
+            )
+        for column in table.columns:
+            dtype = np.int64 if column.labels is not None else column.values.dtype
+            yield from member(
+                column.name,
+                dtype,
+                (table.rows,),
+                (
+                    np.ascontiguousarray(column.values[rows], dtype=dtype).tobytes()
+                    for rows in table.chunks()
+                ),
+            )
+        if table.nodes is not None:
+            directed = np.bool_(table.directed).tobytes()
+            yield from member("directed", np.bool_, (), iter([directed]))
+    yield sink.drain()
+
+
+WRITERS: dict[str, Callable[[Table], Iterator[bytes]]] = {
+    "csv": _csv,
+    "graphml": _graphml,
+    "npz": _npz,
+    "parquet": _parquet,
+}
+
+
+def open_export(kind: str, ident: str, fmt: str) -> Iterator[bytes] | None:
+    """The bytes of an export, or ``None`` if the graph or result has expired.
+
+    Raises ``ValueError`` for formats that do not apply, before anything is
+    written.
+    """
+    if kind not in EXPORTS or fmt not in WRITERS:
+        raise ValueError(f"Unsupported export: {kind} as {fmt}")
+    if fmt == "graphml" and kind != "graph":
+        raise ValueError("Only graphs can be exported as GraphML.")
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ValueError("Parquet exports require the 'pyarrow' package.") from e
+    table = EXPORTS[kind](ident)
+    if table is None:
+        return None
+    return WRITERS[fmt](table)
@@ -0,0 +1,88 @@
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+from app.services.graph_arrays import cached_edge_arrays
+
+WEBGL_MIN_ELEMENTS = 5_000
+LABEL_MAX_NODES = 150
+HOVER_MAX_NODES = 50_000
+
+FIGURE_LAYOUT = go.Layout(
+    showlegend=False,
+    hovermode="closest",
+    margin=dict(b=20, l=5, r=5, t=40),
+    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(0,0,0,0)",
+    font=dict(color="#e5e7eb"),
+)
+
+
+def edge_segments(
+    pos: np.ndarray, src: np.ndarray, dst: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Line coordinates for edges as ``x0, x1, NaN`` triples per edge."""
+    m = len(src)
+    x = np.full(3 * m, np.nan, dtype=np.float32)
+    y = np.full(3 * m, np.nan, dtype=np.float32)
+    x[0::3] = pos[src, 0]
+    x[1::3] = pos[dst, 0]
+    y[0::3] = pos[src, 1]
+    y[1::3] = pos[dst, 1]
+    return x, y
+
+
+def build_figure(G: nx.Graph | nx.DiGraph, pos: np.ndarray, key: str = "") -> go.Figure:
+    """Builds the graph figure from node coordinates in the graph's node order."""
+    n = G.number_of_nodes()
+    labels = [str(node) for node in G] if n <= HOVER_MAX_NODES else None
+    src, dst = cached_edge_arrays(G, key)
+    return figure_from_arrays(pos, src, dst, labels)
+
+
+def figure_from_arrays(
+    pos: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    labels: list[str] | None = None,
+    sizes: np.ndarray | None = None,
+    title: str = "",
+) -> go.Figure:
+    """Builds a node-link figure from coordinate and edge index arrays.
+
+    Coordinates stay float32 NumPy arrays so Plotly serializes them as
+    compact binary typed arrays. Large graphs switch to WebGL traces and drop
+    the always-on node labels, which would be unreadable anyway.
+    """
+    n = len(pos)
+    webgl = n + len(src) >= WEBGL_MIN_ELEMENTS
+    scatter = go.Scattergl if webgl else go.Scatter
+    pos = pos.astype(np.float32, copy=False)
+    edge_x, edge_y = edge_segments(pos, src, dst)
+    edge_trace = scatter(
+        x=edge_x,
+        y=edge_y,
+        line=dict(width=0.5 if webgl else 1, color="#888"),
+        hoverinfo="none",
+        mode="lines",
+    )
+    show_labels = labels is not None and n <= LABEL_MAX_NODES
+    node_trace = scatter(
+        x=pos[:, 0],
+        y=pos[:, 1],
+        mode="markers+text" if show_labels else "markers",
+        hoverinfo="text" if labels is not None else "none",
+        text=labels,
+        textposition="bottom center",
+        marker=dict(
+            showscale=False,
+            color="#9333ea",
+            size=(5 if webgl else 15) if sizes is None else sizes,
+            line_width=0 if webgl else 2,
+        ),
+    )
+    fig = go.Figure(data=[edge_trace, node_trace], layout=FIGURE_LAYOUT)
+    if title:
+        fig.update_layout(title=dict(text=title, font=dict(size=13)))
+    return fig
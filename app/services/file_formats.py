@@ -0,0 +1,30 @@
+"""The graph file types accepted for upload.
+
+Kept apart from :mod:`app.services.ingest` so the form can list them, and
+uploads can be checked, without importing the parsers.
+"""
+
+from pathlib import Path
+
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".txt": "edgelist",
+    ".edgelist": "edgelist",
+    ".edges": "edgelist",
+    ".graphml": "graphml",
+    ".xml": "graphml",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+UPLOAD_ACCEPT = {
+    "text/csv": [".csv", ".tsv"],
+    "text/plain": [".txt", ".edgelist", ".edges"],
+    "application/xml": [".graphml", ".xml"],
+    "application/octet-stream": [".parquet", ".pq"],
+}
+
+
+def detect_format(filename: str) -> str | None:
+    """Maps a file name to one of the supported graph file formats."""
+    return FILE_FORMATS.get(Path(filename).suffix.lower())
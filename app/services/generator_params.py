@@ -0,0 +1,96 @@
+"""The synthetic graph generators offered on the form, and their parameters.
+
+Only names, labels and limits live here, so the form can be built and its
+input checked without importing the generators themselves, which are in
+:mod:`app.services.generators`. Each default preset gives about half a
+million edges, which fits the default graph cache budget.
+"""
+
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+
+MAX_GENERATED_EDGES = int(os.environ.get("GRAPH_MAX_GENERATED_EDGES", 5_000_000))
+
+
+@dataclass(frozen=True)
+class GeneratorParam:
+    name: str
+    label: str
+    default: int
+    low: int
+    high: int
+
+
+@dataclass(frozen=True)
+class Generator:
+    name: str
+    label: str
+    params: tuple[GeneratorParam, ...]
+    edge_count: Callable[[dict[str, int]], int]
+
+
+GENERATORS = {
+    g.name: g
+    for g in (
+        Generator(
+            "barabasi_albert",
+            "Barabási–Albert",
+            (
+                GeneratorParam("n", "Nodes", 200_000, 2, 2_000_000),
+                GeneratorParam("m", "Edges per node", 3, 1, 20),
+            ),
+            lambda p: (p["n"] - p["m"] - 1) * p["m"] + p["m"],
+        ),
+        Generator(
+            "grid",
+            "Grid",
+            (
+                GeneratorParam("rows", "Rows", 500, 1, 3_000),
+                GeneratorParam("cols", "Columns", 500, 1, 3_000),
+            ),
+            lambda p: 2 * p["rows"] * p["cols"] - p["rows"] - p["cols"],
+        ),
+        Generator(
+            "gnm",
+            "Random (G(n, m))",
+            (
+                GeneratorParam("n", "Nodes", 100_000, 2, 2_000_000),
+                GeneratorParam("m", "Edges", 500_000, 0, MAX_GENERATED_EDGES),
+            ),
+            lambda p: p["m"],
+        ),
+    )
+}
+
+
+def validate_params(name: str, raw: dict) -> dict[str, int]:
+    """Parses a generator's parameters, raising ``ValueError`` if they are invalid."""
+    generator = GENERATORS.get(name)
+    if generator is None:
+        raise ValueError(f"Unknown generator '{name}'.")
+    params = {}
+    for param in generator.params:
+        value = raw.get(param.name, param.default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{param.label} must be a whole number.") from None
+        if not param.low <= value <= param.high:
+            raise ValueError(
+                f"{param.label} must be between {param.low:,} and {param.high:,}."
+            )
+        params[param.name] = value
+    if name == "barabasi_albert" and params["m"] >= params["n"]:
+        raise ValueError("Edges per node must be smaller than the number of nodes.")
+    if name == "gnm":
+        n = params["n"]
+        if params["m"] > n * (n - 1) // 2:
+            raise ValueError(
+                f"A graph with {n:,} nodes has at most {n * (n - 1) // 2:,} edges."
+            )
+    if generator.edge_count(params) > MAX_GENERATED_EDGES:
+        raise ValueError(
+            f"Generated graphs are limited to {MAX_GENERATED_EDGES:,} edges."
+        )
+    return params
@@ -0,0 +1,119 @@
+"""Synthetic graphs built straight from generator parameters.
+
+Presets such as a Barabási–Albert graph with 200,000 nodes are far too
+large to paste into the form. Generators build their edges as NumPy arrays
+and insert them into a graph directly; the graph is identified by its
+generator and parameters, so it never passes through edge-list text.
+Generation is seeded, so the same parameters always give the same graph.
+The generators' parameters and their limits are in
+:mod:`app.services.generator_params`.
+"""
+
+import gc
+import random
+from collections.abc import Callable
+import networkx as nx
+import numpy as np
+from app.services.edge_parser import ProgressCallback
+from app.services.instrumentation import span
+
+SEED = 42
+EdgeArrays = tuple[list[str], np.ndarray, np.ndarray]
+
+
+def _integer_labels(n: int) -> list[str]:
+    return [str(i) for i in range(n)]
+
+
+def gnm_edges(params: dict[str, int], directed: bool) -> EdgeArrays:
+    """``m`` distinct random edges between ``n`` nodes, without self-loops."""
+    n, m = params["n"], params["m"]
+    rng = np.random.default_rng(SEED)
+    codes = np.zeros(0, dtype=np.int64)
+    while len(codes) < m:
+        u = rng.integers(0, n, 2 * (m - len(codes)))
+        v = rng.integers(0, n, len(u))
+        keep = u != v
+        u, v = u[keep], v[keep]
+        if not directed:
+            u, v = np.minimum(u, v), np.maximum(u, v)
+        codes = np.union1d(codes, u * n + v)
+    codes = rng.permutation(codes)[:m]
+    return _integer_labels(n), codes // n, codes % n
+
+
+def barabasi_albert_edges(params: dict[str, int], directed: bool) -> EdgeArrays:
+    """Preferential attachment of each new node to ``m`` existing ones.
+
+    Starts from a star on ``m + 1`` nodes, as :func:`nx.barabasi_albert_graph`
+    does; targets are drawn from the list of edge endpoints, so a node is
+    picked in proportion to its degree. Edges point from new to old nodes.
+    """
+    n, m = params["n"], params["m"]
+    rand = random.Random(SEED).random
+    src, dst = [m] * m, list(range(m))
+    endpoints = list(range(m)) + [m] * m
+    for node in range(m + 1, n):
+        targets = set()
+        size = len(endpoints)
+        while len(targets) < m:
+            targets.add(endpoints[int(rand() * size)])
+        src.extend([node] * m)
+        dst.extend(targets)
+        endpoints.extend(targets)
+        endpoints.extend([node] * m)
+    return _integer_labels(n), np.array(src), np.array(dst)
+
+
+def grid_edges(params: dict[str, int], directed: bool) -> EdgeArrays:
+    """A ``rows`` × ``cols`` lattice with nodes labelled ``row_col``."""
+    rows, cols = params["rows"], params["cols"]
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    src = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    dst = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    labels = [f"{r}_{c}" for r in range(rows) for c in range(cols)]
+    return labels, src, dst
+
+
+BUILDERS: dict[str, Callable[[dict[str, int], bool], EdgeArrays]] = {
+    "barabasi_albert": barabasi_albert_edges,
+    "grid": grid_edges,
+    "gnm": gnm_edges,
+}
+
+
+def generate_graph(
+    name: str,
+    params: dict[str, int],
+    directed: bool,
+    progress: ProgressCallback | None = None,
+) -> nx.Graph | nx.DiGraph:
+    """Builds a generator's graph, inserting its edge arrays in one pass.
+
+    The cyclic garbage collector is paused during insertion, as in
+    :func:`app.services.edge_parser.build_graph_from_chunks`. ``progress``
+    is called once the edges are generated and again once they are inserted.
+    """
+    with span("generate") as stage:
+        labels, src, dst = BUILDERS[name](params, directed)
+        stage.size = len(src)
+    if progress is not None:
+        progress(0.5)
+    with span("graph_build", len(src)):
+        G = nx.DiGraph() if directed else nx.Graph()
+        G.add_nodes_from(labels)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            G.add_edges_from(
+                zip(
+                    map(labels.__getitem__, src.tolist()),
+                    map(labels.__getitem__, dst.tolist()),
+                )
+            )
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    if progress is not None:
+        progress(1.0)
+    return G
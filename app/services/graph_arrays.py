@@ -0,0 +1,82 @@
+import os
+from itertools import chain
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from app.services.graph_cache import LRUCache
+
+DEFAULT_EDGE_ARRAY_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_ADJACENCY_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def node_index(G: nx.Graph | nx.DiGraph) -> dict:
+    """Maps each node to its position in the graph's node order."""
+    return {node: i for i, node in enumerate(G)}
+
+
+def edge_arrays(
+    G: nx.Graph | nx.DiGraph, index: dict | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns edge endpoints as integer positions in the graph's node order."""
+    index = node_index(G) if index is None else index
+    m = G.number_of_edges()
+    flat = np.fromiter(
+        map(index.__getitem__, chain.from_iterable(G.edges())),
+        dtype=np.int64,
+        count=2 * m,
+    )
+    return flat[0::2], flat[1::2]
+
+
+edge_array_cache: LRUCache[str, tuple[np.ndarray, np.ndarray]] = LRUCache(
+    max_bytes=int(
+        os.environ.get("EDGE_ARRAY_CACHE_MAX_BYTES", DEFAULT_EDGE_ARRAY_CACHE_BYTES)
+    ),
+    sizeof=lambda edges: edges[0].nbytes + edges[1].nbytes,
+    name="edge_arrays",
+)
+
+
+def cached_edge_arrays(
+    G: nx.Graph | nx.DiGraph, key: str = ""
+) -> tuple[np.ndarray, np.ndarray]:
+    """Like :func:`edge_arrays`, memoized per graph key."""
+    if not key:
+        return edge_arrays(G)
+    return edge_array_cache.get_or_create(key, lambda: edge_arrays(G))
+
+
+def _build_adjacency(G: nx.Graph | nx.DiGraph, key: str) -> sp.csr_matrix:
+    n = G.number_of_nodes()
+    src, dst = cached_edge_arrays(G, key)
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    if not G.is_directed():
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+    coo = sp.coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), (n, n))
+    csr = coo.tocsr()
+    csr.sum_duplicates()
+    csr.data[:] = 1
+    return csr
+
+
+adjacency_cache: LRUCache[str, sp.csr_matrix] = LRUCache(
+    max_bytes=int(
+        os.environ.get("ADJACENCY_CACHE_MAX_BYTES", DEFAULT_ADJACENCY_CACHE_BYTES)
+    ),
+    sizeof=lambda A: A.data.nbytes + A.indices.nbytes + A.indptr.nbytes,
+    name="adjacency",
+)
+
+
+def adjacency_matrix(G: nx.Graph | nx.DiGraph, key: str = "") -> sp.csr_matrix:
+    """The graph's adjacency as an ``int8`` CSR matrix in node order.
+
+    Undirected graphs store both directions of every edge. Self-loops are
+    dropped, matching how NetworkX treats them in clustering and paths. The
+    matrix is memoized per graph key and shared, so callers must not modify
+    it.
+    """
+    if not key:
+        return _build_adjacency(G, key)
+    return adjacency_cache.get_or_create(key, lambda: _build_adjacency(G, key))
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Generic, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+NODE_BYTES = 600
+EDGE_BYTES = 350
+DEFAULT_GRAPH_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def graph_key(nodes_str: str, edges_str: str, graph_type: str) -> str:
+    """Content hash identifying a parsed graph."""
+    h = hashlib.sha256()
+    for part in (graph_type, nodes_str, edges_str):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def file_graph_key(file_digest: str, fmt: str, graph_type: str) -> str:
+    """Content hash identifying a graph read from an uploaded file.
+
+    The format is part of the key: the same bytes parse into different
+    graphs as, say, CSV and whitespace-separated edge lists.
+    """
+    return hashlib.sha256(f"{graph_type}:file:{fmt}:{file_digest}".encode()).hexdigest()
+
+
+def generated_graph_key(name: str, params: dict[str, int], graph_type: str) -> str:
+    """Identifies a graph built by a seeded generator from its parameters."""
+    args = ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return hashlib.sha256(f"{graph_type}:gen:{name}:{args}".encode()).hexdigest()
+
+
+def edited_graph_key(parent_key: str) -> str:
+    """A fresh key for an edited copy of a graph.
+
+    Edited graphs are private to one session, so their keys are random
+    rather than content hashes, which could collide between sessions making
+    the same edit.
+    """
+    return hashlib.sha256(f"{parent_key}:edit:{uuid.uuid4().hex}".encode()).hexdigest()
+
+
+def estimate_graph_bytes(G: "nx.Graph | nx.DiGraph") -> int:
+    """Rough in-memory size of a NetworkX graph's dict-of-dicts adjacency."""
+    return NODE_BYTES * G.number_of_nodes() + EDGE_BYTES * G.number_of_edges()
+
+
+caches: "dict[str, LRUCache]" = {}
+
+
+class LRUCache(Generic[K, V]):
+    """A thread-safe LRU cache bounded by an estimated memory budget.
+
+    ``on_evict`` is called with each key and value that leaves the cache,
+    whether by eviction, replacement, :meth:`pop` or :meth:`clear`.
+
+    A value larger than the whole budget is not stored, unless
+    ``keep_oversized`` is set: then it is kept as the only entry, so the
+    most recent value is always served from memory. Named caches are listed
+    in :data:`caches` and their :meth:`stats` are exported on ``/metrics``.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[V], int],
+        on_evict: Callable[[K, V], None] | None = None,
+        name: str = "",
+        keep_oversized: bool = False,
+    ):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.keep_oversized = keep_oversized
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0
+        if name:
+            caches[name] = self
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Returns the cached value and marks it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        """Stores a value, evicting least recently used entries over budget."""
+        size = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                self.oversized += 1
+                if self.name:
+                    logging.warning(
+                        f"A {size / 2**20:,.0f} MiB {self.name} cache entry is over "
+                        f"the {self.max_bytes / 2**20:,.0f} MiB budget; "
+                        + (
+                            "keeping it alone."
+                            if self.keep_oversized
+                            else "not cached."
+                        )
+                    )
+                if not self.keep_oversized:
+                    if self._on_evict is not None:
+                        self._on_evict(key, value)
+                    return
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, (evicted, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+                if self._on_evict is not None:
+                    self._on_evict(evicted_key, evicted)
+
+    def get_or_create(self, key: K, factory: Callable[[], V | None]) -> V | None:
+        """Returns the cached value, building and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def pop(self, key: K) -> V | None:
+        """Removes an entry and returns its value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            self._discard(key)
+            return None if entry is None else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "oversized": self.oversized,
+            }
+
+    def _discard(self, key: K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+            if self._on_evict is not None:
+                self._on_evict(key, entry[0])
+
+
+graph_cache: "LRUCache[str, nx.Graph | nx.DiGraph]" = LRUCache(
+    max_bytes=int(os.environ.get("GRAPH_CACHE_MAX_BYTES", DEFAULT_GRAPH_CACHE_BYTES)),
+    sizeof=estimate_graph_bytes,
+    name="graph",
+    keep_oversized=True,
+)
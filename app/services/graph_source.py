@@ -0,0 +1,51 @@
+from pathlib import Path
+import networkx as nx
+from app.services.edge_parser import build_graph_from_text
+from app.services.generators import generate_graph
+from app.services.graph_cache import graph_cache
+from app.services.graph_spec import GraphSpec
+from app.services.graph_store import load_graph, save_graph
+from app.services.ingest import ProgressCallback, load_graph_file
+from app.services.uploads import touch_upload
+
+
+def build_graph(
+    spec: GraphSpec, progress: ProgressCallback | None = None
+) -> nx.Graph | nx.DiGraph:
+    """Builds the graph a spec describes, bypassing the cache."""
+    if not spec.content_addressed:
+        raise LookupError("The graph is no longer available. Generate it again.")
+    if spec.generator:
+        return generate_graph(
+            spec.generator, dict(spec.params), spec.directed, progress
+        )
+    if spec.source:
+        path = Path(spec.source)
+        touch_upload(path)
+        return load_graph_file(path, spec.format, spec.directed, progress)
+    return build_graph_from_text(
+        spec.nodes_str, spec.edges_str, spec.directed, progress
+    )
+
+
+def _load_or_build(
+    spec: GraphSpec, progress: ProgressCallback | None
+) -> nx.Graph | nx.DiGraph:
+    G = load_graph(spec.key)
+    if G is None:
+        G = build_graph(spec, progress)
+        save_graph(spec.key, G)
+    return G
+
+
+def resolve_graph(
+    spec: GraphSpec, progress: ProgressCallback | None = None
+) -> nx.Graph | nx.DiGraph:
+    """Returns the cached graph for a spec, building it on a miss.
+
+    Misses are served from the on-disk graph store when another worker, or
+    an earlier run, has already built the graph; newly built graphs are
+    saved there. Cached graphs are shared across sessions; callers must not
+    mutate them.
+    """
+    return graph_cache.get_or_create(spec.key, lambda: _load_or_build(spec, progress))
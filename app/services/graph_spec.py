@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from app.services.graph_cache import file_graph_key, generated_graph_key, graph_key
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    """Everything needed to find a graph in the cache or rebuild it.
+
+    Specs are plain values captured from session state, so worker threads can
+    resolve graphs without touching the state itself.
+    """
+
+    key: str
+    graph_type: str = "undirected"
+    nodes_str: str = ""
+    edges_str: str = ""
+    source: str = ""
+    format: str = ""
+    generator: str = ""
+    params: tuple[tuple[str, int], ...] = ()
+
+    @property
+    def directed(self) -> bool:
+        return self.graph_type == "directed"
+
+    @property
+    def content_addressed(self) -> bool:
+        """Whether the key identifies the graph's content, rather than an edit."""
+        return bool(self.source or self.edges_str or self.generator)
+
+    @classmethod
+    def from_text(cls, nodes_str: str, edges_str: str, graph_type: str) -> "GraphSpec":
+        return cls(
+            key=graph_key(nodes_str, edges_str, graph_type),
+            graph_type=graph_type,
+            nodes_str=nodes_str,
+            edges_str=edges_str,
+        )
+
+    @classmethod
+    def from_generator(
+        cls, name: str, params: dict[str, int], graph_type: str
+    ) -> "GraphSpec":
+        return cls(
+            key=generated_graph_key(name, params, graph_type),
+            graph_type=graph_type,
+            generator=name,
+            params=tuple(sorted(params.items())),
+        )
+
+    @classmethod
+    def from_file(
+        cls, source: str, fmt: str, digest: str, graph_type: str
+    ) -> "GraphSpec":
+        return cls(
+            key=file_graph_key(digest, fmt, graph_type),
+            graph_type=graph_type,
+            source=source,
+            format=fmt,
+        )
@@ -0,0 +1,218 @@
+"""A graph store on local disk, shared by every worker process.
+
+Each graph is saved under its content key as one file of flat arrays: the
+edges as CSR offsets and neighbour positions, in the order NetworkX lists
+them, followed by the node labels as UTF-8 text and their offsets. Files
+are opened with :func:`np.memmap`, so a worker that finds a graph here
+rebuilds it from the arrays without parsing any text, and the edge arrays
+are handed to :mod:`app.services.graph_arrays` as they are.
+
+Files are written to a temporary name and renamed into place, so workers
+never see a partial file. The store is bounded by ``GRAPH_STORE_MAX_BYTES``;
+the least recently used files are deleted first. Only the graph structure
+is kept: node and edge attributes are dropped.
+
+File layout, with every section aligned to 8 bytes::
+
+    header        MAGIC, version, directed, index width, nodes, edges, label bytes
+    offsets       int64[nodes + 1]
+    neighbours    int32 or int64[edges]
+    label_offsets int64[nodes + 1]
+    labels        uint8[label bytes]
+"""
+
+import gc
+import logging
+import os
+import struct
+import uuid
+from pathlib import Path
+import networkx as nx
+import numpy as np
+from app.services.graph_arrays import cached_edge_arrays, edge_array_cache
+from app.services.instrumentation import graph_size, span
+
+MAGIC = b"NXGSTORE"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQQQ")
+HEADER_BYTES = 64
+SUFFIX = ".graph"
+STORE_DIR = Path(os.environ.get("GRAPH_STORE_DIR", ".graph_store"))
+DEFAULT_STORE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+STORE_MAX_BYTES = int(os.environ.get("GRAPH_STORE_MAX_BYTES", DEFAULT_STORE_MAX_BYTES))
+
+
+def _aligned(size: int) -> int:
+    return -(-size // 8) * 8
+
+
+def _path(key: str) -> Path:
+    return STORE_DIR / f"{key}{SUFFIX}"
+
+
+def save_graph(key: str, G: nx.Graph | nx.DiGraph) -> None:
+    """Writes a graph to the store, then trims the store to its size limit.
+
+    Failures are logged rather than raised: the store is only a cache.
+    """
+    try:
+        with span("store_save", graph_size(G)):
+            _write(key, G)
+        evict(STORE_MAX_BYTES)
+    except OSError as e:
+        logging.warning(f"Could not save graph {key[:12]} to the store: {e}")
+
+
+def _write(key: str, G: nx.Graph | nx.DiGraph) -> None:
+    n = G.number_of_nodes()
+    src, dst = cached_edge_arrays(G, key)
+    if np.any(src[1:] < src[:-1]):
+        order = np.argsort(src, kind="stable")
+        src, dst = src[order], dst[order]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    index_dtype = np.int32 if n < 2**31 else np.int64
+    encoded = [str(node).encode("utf-8") for node in G]
+    label_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(label) for label in encoded], out=label_offsets[1:])
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        int(G.is_directed()),
+        np.dtype(index_dtype).itemsize,
+        n,
+        len(dst),
+        int(label_offsets[-1]),
+    )
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STORE_DIR / f".{key}.{uuid.uuid4().hex}.tmp"
+    try:
+        with tmp.open("wb") as f:
+            f.write(header.ljust(HEADER_BYTES, b"\0"))
+            for array in (offsets, dst.astype(index_dtype, copy=False), label_offsets):
+                data = array.tobytes()
+                f.write(data.ljust(_aligned(len(data)), b"\0"))
+            f.write(b"".join(encoded))
+        tmp.replace(_path(key))
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _sections(
+    mm: np.memmap,
+) -> tuple[bool, np.ndarray, np.ndarray, np.ndarray, np.memmap]:
+    magic, version, directed, width, n, m, label_bytes = HEADER.unpack_from(
+        mm[:HEADER_BYTES]
+    )
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a graph store file")
+    pos = HEADER_BYTES
+    sections = []
+    for dtype, count in (
+        (np.int64, n + 1),
+        (np.dtype(f"<i{width}"), m),
+        (np.int64, n + 1),
+    ):
+        size = np.dtype(dtype).itemsize * count
+        sections.append(mm[pos : pos + size].view(dtype))
+        pos += _aligned(size)
+    if len(mm) < pos + label_bytes:
+        raise ValueError("truncated graph store file")
+    offsets, neighbours, label_offsets = sections
+    return (
+        bool(directed),
+        offsets,
+        neighbours,
+        label_offsets,
+        mm[pos : pos + label_bytes],
+    )
+
+
+def _labels(data: np.memmap, offsets: np.ndarray) -> list[str]:
+    raw = data.tobytes()
+    text = raw.decode("utf-8")
+    bounds = offsets.tolist()
+    if len(text) != len(raw):
+        return [raw[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def _open(key: str) -> tuple | None:
+    path = _path(key)
+    try:
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        sections = _sections(mm)
+        os.utime(path)
+    except (OSError, ValueError, struct.error) as e:
+        if path.exists():
+            logging.warning(f"Ignoring unreadable graph store file {path}: {e}")
+        return None
+    return sections
+
+
+def _decode(sections: tuple) -> tuple[bool, list[str], np.ndarray, np.ndarray]:
+    directed, offsets, neighbours, label_offsets, label_data = sections
+    labels = _labels(label_data, label_offsets)
+    src = np.repeat(np.arange(len(labels), dtype=np.int64), np.diff(offsets))
+    dst = np.asarray(neighbours, dtype=np.int64)
+    return directed, labels, src, dst
+
+
+def load_arrays(key: str) -> tuple[bool, list[str], np.ndarray, np.ndarray] | None:
+    """A stored graph's directedness, node labels and edge arrays.
+
+    Cheaper than :func:`load_graph` for callers that only read the edges,
+    since no NetworkX graph is built. Returns ``None`` if it is not stored.
+    """
+    sections = _open(key)
+    return None if sections is None else _decode(sections)
+
+
+def load_graph(key: str) -> nx.Graph | nx.DiGraph | None:
+    """Rebuilds a stored graph, or returns ``None`` if it is not in the store.
+
+    The graph's edge arrays are cached under ``key`` straight from the file.
+    """
+    sections = _open(key)
+    if sections is None:
+        return None
+    with span("store_load", len(sections[2])):
+        directed, labels, src, dst = _decode(sections)
+        G = nx.DiGraph() if directed else nx.Graph()
+        G.add_nodes_from(labels)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            G.add_edges_from(
+                zip(
+                    map(labels.__getitem__, src.tolist()),
+                    map(labels.__getitem__, dst.tolist()),
+                )
+            )
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    edge_array_cache.put(key, (src, dst))
+    return G
+
+
+def delete_graph(key: str) -> None:
+    """Removes a graph from the store, if it is there."""
+    _path(key).unlink(missing_ok=True)
+
+
+def evict(max_bytes: int) -> None:
+    """Deletes the least recently used graphs until the store fits ``max_bytes``."""
+    files = []
+    for path in STORE_DIR.glob(f"*{SUFFIX}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
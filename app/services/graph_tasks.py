@@ -0,0 +1,235 @@
+"""The work behind the graph page's events.
+
+Everything here runs on NetworkX, NumPy, SciPy or Plotly's figure builders,
+which take about half a second to import. :mod:`app.states.graph_state`
+imports this module the first time an event needs it rather than at start-up,
+so a new worker serves the form page without loading them; :mod:`app.app`
+imports it in the background once the worker is up.
+"""
+
+from collections.abc import Callable, Hashable
+from typing import TypeVar
+import networkx as nx
+import plotly.graph_objects as go
+from app.services import algorithms, results
+from app.services.approx import APPROXIMATIONS, BUDGETS
+from app.services.batch import BatchSummary, run_batch
+from app.services.edge_parser import describe_malformed
+from app.services.editing import GraphEdit, apply_edit
+from app.services.graph_source import resolve_graph
+from app.services.graph_spec import GraphSpec
+from app.services.instrumentation import graph_size, span
+from app.services.layout import (
+    ENGINE_MAX_NODES,
+    LAYOUT_ENGINES,
+    compute_layout,
+    engine_fits,
+)
+from app.services.lod import Region, summary_cell_region
+from app.services.node_search import node_index, node_index_cache
+from app.services.paths import path_index
+from app.services.result_store import result_key, shared_results
+from app.services.stats import graph_stats
+from app.services.tasks import TaskControl
+from app.services.views import figure_cache, render_view, view_key
+
+T = TypeVar("T")
+
+
+def graph_meta(G: nx.Graph | nx.DiGraph) -> dict:
+    """The few facts about a graph that are kept in session state."""
+    return {
+        "nodes": G.number_of_nodes(),
+        "edges": G.number_of_edges(),
+        "directed": G.is_directed(),
+    }
+
+
+def load_graph(
+    spec: GraphSpec, engine: str, control: TaskControl
+) -> tuple[dict, dict, str, str]:
+    """Builds a graph and warms the caches behind its first view and sidebar.
+
+    Returns the graph's metadata and statistics, the key of its first view
+    and a warning about malformed input, if any.
+    """
+    G = resolve_graph(spec, control.report)
+    stats = graph_stats(G, spec.key).summary()
+    node_index(G, spec.key)
+    render_view(G, spec.key, engine, None)
+    return graph_meta(G), stats, view_key(spec.key, engine, None), describe_malformed(G)
+
+
+def edit_graph(
+    spec: GraphSpec,
+    action: str,
+    source: str,
+    target: str,
+    engine: str,
+    region: Region | None,
+    private: bool,
+    control: TaskControl,
+) -> tuple[dict, dict, str, str]:
+    """Applies an edit and renders the current view of the edited graph.
+
+    Returns the edited graph's metadata, statistics and key, and the key of
+    the rendered view.
+    """
+    edit = GraphEdit(action, source, target)
+    G, key = apply_edit(resolve_graph(spec), spec.key, edit, engine, private)
+    render_view(G, key, engine, region)
+    stats = graph_stats(G, key).summary()
+    return graph_meta(G), stats, key, view_key(key, engine, region)
+
+
+def draw_view(
+    spec: GraphSpec, engine: str, region: Region | None, control: TaskControl
+) -> str:
+    """Lays out and draws a view of a graph; returns the view's key."""
+    render_view(resolve_graph(spec, control.report), spec.key, engine, region)
+    return view_key(spec.key, engine, region)
+
+
+def cached_view(key: str, engine: str, region: Region | None) -> str:
+    """The key of a view that is already drawn, or ``""`` if it has to be drawn.
+
+    Only the figure cache is consulted; the graph itself is not resolved.
+    """
+    figure = view_key(key, engine, region)
+    return figure if figure in figure_cache else ""
+
+
+def cached_figure(figure: str) -> go.Figure | None:
+    """A drawn figure by its view key, or ``None`` if it has been evicted."""
+    return figure_cache.get(figure)
+
+
+def index_nodes(spec: GraphSpec, control: TaskControl) -> None:
+    """Builds the label index behind the node pickers."""
+    node_index(resolve_graph(spec, control.report), spec.key)
+
+
+def search_cached_nodes(key: str, query: str) -> list[str] | None:
+    """Nodes matching ``query``, or ``None`` if the graph's index is not built.
+
+    Only the index cache is consulted, so a keystroke never resolves the
+    graph; :func:`index_nodes` builds a missing index in a background task.
+    """
+    index = node_index_cache.get(key)
+    return None if index is None else index.search(query)
+
+
+def _shared(
+    spec: GraphSpec,
+    compute: Callable[[], T],
+    control: TaskControl,
+    algorithm: str,
+    *params: Hashable,
+) -> T:
+    """Runs ``compute`` once for every session asking for the same result.
+
+    Edited graphs are private to a session, so their results are not shared.
+    """
+    if not spec.content_addressed:
+        return compute()
+    key = result_key(spec.key, algorithm, *params)
+    return shared_results.get_or_compute(key, compute, control)
+
+
+def shortest_path(
+    spec: GraphSpec, source: str, target: str, control: TaskControl
+) -> list[str]:
+    """The shortest path between two nodes, or an empty list if there is none."""
+    G = resolve_graph(spec)
+
+    def compute() -> list[str]:
+        try:
+            with span("shortest_path", graph_size(G)):
+                return path_index(G, spec.key).shortest_path(source, target)
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            return []
+
+    return _shared(spec, compute, control, "shortest_path", source, target)
+
+
+def centrality(spec: GraphSpec, measure: str, control: TaskControl) -> str:
+    """Computes a centrality measure and returns the id of its stored result."""
+    G = resolve_graph(spec)
+    compute = algorithms.CENTRALITY_MEASURES[measure]
+    try:
+        values = _shared(spec, lambda: compute(G, spec.key, control), control, measure)
+    except nx.PowerIterationFailedConvergence as e:
+        raise ValueError(
+            "the iteration did not converge on this graph, so the scores would "
+            "be unreliable"
+        ) from e
+    return results.store_result(values)
+
+
+def clustering(spec: GraphSpec, control: TaskControl) -> str:
+    """Computes clustering coefficients and returns the id of their stored result."""
+    G = resolve_graph(spec)
+    values = _shared(
+        spec, lambda: algorithms.clustering(G, spec.key, control), control, "clustering"
+    )
+    return results.store_result(values)
+
+
+def approximate(
+    spec: GraphSpec, name: str, budget_name: str, control: TaskControl
+) -> tuple[dict[str, str], str]:
+    """Runs an approximation; returns its summary rows and stored per-node result."""
+    G = resolve_graph(spec)
+    budget = BUDGETS[budget_name]
+    result = _shared(
+        spec,
+        lambda: APPROXIMATIONS[name](G, spec.key, budget, control),
+        control,
+        f"approx_{name}",
+        budget,
+    )
+    if not result.per_node:
+        return result.summary(), ""
+    return result.summary(), results.store_result(result.per_node)
+
+
+def batch_distances(spec: GraphSpec, text: str, control: TaskControl) -> BatchSummary:
+    """Answers the pasted ``source, target`` pairs; returns their stored summary."""
+    return run_batch(resolve_graph(spec), spec.key, text, control)
+
+
+def known_layout_engine(engine: str) -> bool:
+    """Whether ``engine`` is ``"auto"`` or one of the layout engines offered."""
+    return engine == "auto" or engine in LAYOUT_ENGINES
+
+
+def layout_engine_error(engine: str, nodes: int) -> str:
+    """Why ``engine`` cannot lay out a graph of ``nodes`` nodes, or ``""``."""
+    if not known_layout_engine(engine):
+        return f"Unknown layout engine '{engine}'."
+    if not engine_fits(engine, nodes):
+        return (
+            f"The {engine} layout is limited to graphs of up to "
+            f"{ENGINE_MAX_NODES[engine]:,} nodes. Use Auto or Force instead."
+        )
+    return ""
+
+
+def cell_region(
+    spec: GraphSpec,
+    engine: str,
+    region: Region | None,
+    point: int,
+    control: TaskControl,
+) -> Region | None:
+    """The region covered by a clicked summary cell of the current view."""
+    G = resolve_graph(spec, control.report)
+    pos = compute_layout(G, spec.key, engine)
+    return summary_cell_region(G, pos, spec.key, region, point)
+
+
+def result_page(
+    result_id: str, page: int, descending: bool, query: str
+) -> results.ResultPage | None:
+    """The rows a result table shows, filtered by ``query``; ``None`` if expired."""
+    return results.result_page(result_id, page, descending=descending, query=query)
@@ -0,0 +1,129 @@
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+import networkx as nx
+from app.services.edge_parser import (
+    EdgeListParser,
+    LabelIndex,
+    ProgressCallback,
+    build_graph_from_chunks,
+)
+from app.services.instrumentation import graph_size, span
+
+READ_CHUNK_BYTES = 8 * 1024 * 1024
+PARQUET_BATCH_ROWS = 262_144
+HEADER_NAMES = {
+    ("source", "target"),
+    ("src", "dst"),
+    ("from", "to"),
+    ("u", "v"),
+    ("node1", "node2"),
+}
+
+
+def iter_mmap_text_chunks(
+    path: Path,
+    chunk_bytes: int = READ_CHUNK_BYTES,
+    progress: ProgressCallback | None = None,
+) -> Iterator[str]:
+    """Yields decoded text from a memory-mapped file in newline-aligned chunks."""
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", min(start + chunk_bytes, size))
+                end = size if end == -1 else end + 1
+                yield mm[start:end].decode("utf-8", errors="replace")
+                start = end
+                if progress is not None:
+                    progress(start / size)
+
+
+def _has_header(path: Path, delimiter: str | None) -> bool:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        first = f.readline().strip().lower()
+    parts = first.split(delimiter) if delimiter else first.split()
+    return tuple(p.strip() for p in parts[:2]) in HEADER_NAMES
+
+
+def _load_delimited(
+    path: Path, fmt: str, directed: bool, progress: ProgressCallback | None
+) -> nx.Graph | nx.DiGraph:
+    delimiter = {"csv": ",", "tsv": "\t"}.get(fmt)
+    parser = EdgeListParser(
+        delimiter=delimiter,
+        skip_header=_has_header(path, delimiter),
+        skip_comments=True,
+        extra_columns=True,
+    )
+    return build_graph_from_chunks(
+        iter_mmap_text_chunks(path, progress=progress), directed, parser=parser
+    )
+
+
+def _load_graphml(
+    path: Path, directed: bool, progress: ProgressCallback | None
+) -> nx.Graph | nx.DiGraph:
+    G = nx.read_graphml(path)
+    if isinstance(G, nx.MultiGraph):
+        G = nx.DiGraph(G) if G.is_directed() else nx.Graph(G)
+    if directed != G.is_directed():
+        G = G.to_directed() if directed else G.to_undirected()
+    G = nx.relabel_nodes(G, str, copy=False)
+    if progress is not None:
+        progress(1.0)
+    return G
+
+
+def _load_parquet(
+    path: Path, directed: bool, progress: ProgressCallback | None
+) -> nx.Graph | nx.DiGraph:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Parquet uploads require the 'pyarrow' package.") from e
+    pf = pq.ParquetFile(path)
+    names = pf.schema_arrow.names
+    if len(names) < 2:
+        raise ValueError("Parquet edge files need at least two columns.")
+    index = LabelIndex()
+    labels = index.labels
+    G = nx.DiGraph() if directed else nx.Graph()
+    total = max(pf.metadata.num_rows, 1)
+    rows = 0
+    for batch in pf.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=names[:2]):
+        src, dst = (col.to_pylist() for col in batch.columns)
+        G.add_edges_from(
+            (labels[index[str(u)]], labels[index[str(v)]])
+            for u, v in zip(src, dst)
+            if u is not None and v is not None
+        )
+        rows += batch.num_rows
+        if progress is not None:
+            progress(rows / total)
+    return G
+
+
+def load_graph_file(
+    path: Path,
+    fmt: str,
+    directed: bool,
+    progress: ProgressCallback | None = None,
+) -> nx.Graph | nx.DiGraph:
+    """Reads a graph from an uploaded file.
+
+    Meant to run in a worker thread; ``progress`` is called with the fraction
+    of the file consumed so far.
+    """
+    if fmt in ("csv", "tsv", "edgelist"):
+        return _load_delimited(path, fmt, directed, progress)
+    if fmt in ("graphml", "parquet"):
+        load = _load_graphml if fmt == "graphml" else _load_parquet
+        with span("graph_build") as stage:
+            G = load(path, directed, progress)
+            stage.size = graph_size(G)
+        return G
+    raise ValueError(f"Unsupported graph file format: {fmt}")
@@ -0,0 +1,263 @@
+"""Timing spans and allocation counters for the hot paths.
+
+Each finished span is added to a process-wide registry, which
+:func:`render_metrics` exports in the Prometheus text format, and to the
+list opened by the innermost :func:`collect` block, which is how the graph
+page's debug panel (shown with ``GRAPH_DEBUG_PANEL=1``) lists the stages
+of the session's last task. Spans are labelled with the stage
+name and the order of magnitude of the graph's edge count.
+
+Allocation counters use :mod:`tracemalloc`, which slows Python code down
+noticeably, so they are only collected when ``GRAPH_TRACE_ALLOCATIONS=1``.
+They measure the traced peak during the span above the memory in use when
+it started; spans running at the same time in other threads inflate it.
+A nested span resets the traced peak, so it hands the peak reached before
+the reset, and its own peak on exit, up to the enclosing span.
+
+``/metrics`` also reports the occupancy and hit counts of every named
+:class:`app.services.graph_cache.LRUCache`.
+"""
+
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TypeVar
+from weakref import WeakKeyDictionary
+from app.services.graph_cache import caches
+
+T = TypeVar("T")
+
+TRACE_ALLOCATIONS = os.environ.get("GRAPH_TRACE_ALLOCATIONS", "") == "1"
+DEBUG_PANEL = os.environ.get("GRAPH_DEBUG_PANEL", "") == "1"
+SECONDS_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 120.0)
+SIZE_CLASSES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+if TRACE_ALLOCATIONS and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+@dataclass
+class Span:
+    """One timed stage; ``size`` is the graph's edge count."""
+
+    stage: str
+    size: int = 0
+    seconds: float = 0.0
+    alloc_bytes: int | None = None
+    failed: bool = False
+
+
+_edge_counts: WeakKeyDictionary = WeakKeyDictionary()
+_edge_counts_lock = threading.Lock()
+
+
+def graph_size(G) -> int:
+    """The edge count of ``G`` that spans are labelled with.
+
+    NetworkX counts edges by summing every node's degree, which is too slow
+    to repeat for each span on a large graph, so the count is remembered per
+    graph. Code that changes a graph in place must call
+    :func:`forget_graph_size` afterwards.
+    """
+    with _edge_counts_lock:
+        edges = _edge_counts.get(G)
+    if edges is None:
+        edges = G.number_of_edges()
+        with _edge_counts_lock:
+            _edge_counts[G] = edges
+    return edges
+
+
+def forget_graph_size(G) -> None:
+    """Drops the remembered edge count of a graph that has been edited."""
+    with _edge_counts_lock:
+        _edge_counts.pop(G, None)
+
+
+def size_class(edges: int) -> str:
+    """The label for a graph size, e.g. ``"10k"`` for up to 10,000 edges."""
+    for bound in SIZE_CLASSES:
+        if edges <= bound:
+            return (
+                f"{bound // 1000}k" if bound < 1_000_000 else f"{bound // 1_000_000}M"
+            )
+    return "inf"
+
+
+class _Registry:
+    """Histograms of span durations and totals of allocations and failures."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple[str, str], list[int]] = {}
+        self._sums: dict[tuple[str, str], float] = {}
+        self._alloc: dict[tuple[str, str], int] = {}
+        self._failures: dict[tuple[str, str], int] = {}
+
+    def observe(self, span: Span) -> None:
+        labels = (span.stage, size_class(span.size))
+        with self._lock:
+            counts = self._buckets.setdefault(labels, [0] * (len(SECONDS_BUCKETS) + 1))
+            for i, bound in enumerate(SECONDS_BUCKETS):
+                if span.seconds <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._sums[labels] = self._sums.get(labels, 0.0) + span.seconds
+            if span.alloc_bytes is not None:
+                self._alloc[labels] = self._alloc.get(labels, 0) + span.alloc_bytes
+            if span.failed:
+                self._failures[labels] = self._failures.get(labels, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP graph_stage_seconds Time spent in each stage.",
+            "# TYPE graph_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (stage, size), counts in sorted(self._buckets.items()):
+                labels = f'stage="{stage}",size="{size}"'
+                for bound, count in zip(SECONDS_BUCKETS, counts):
+                    lines.append(
+                        f'graph_stage_seconds_bucket{{{labels},le="{bound:g}"}} {count}'
+                    )
+                lines.append(
+                    f'graph_stage_seconds_bucket{{{labels},le="+Inf"}} {counts[-1]}'
+                )
+                lines.append(
+                    f"graph_stage_seconds_sum{{{labels}}} {self._sums[(stage, size)]:.6f}"
+                )
+                lines.append(f"graph_stage_seconds_count{{{labels}}} {counts[-1]}")
+            lines += [
+                "# HELP graph_stage_alloc_bytes_total Peak traced allocations per stage.",
+                "# TYPE graph_stage_alloc_bytes_total counter",
+            ]
+            for (stage, size), total in sorted(self._alloc.items()):
+                lines.append(
+                    f'graph_stage_alloc_bytes_total{{stage="{stage}",size="{size}"}} {total}'
+                )
+            lines += [
+                "# HELP graph_stage_failures_total Stages that raised.",
+                "# TYPE graph_stage_failures_total counter",
+            ]
+            for (stage, size), total in sorted(self._failures.items()):
+                lines.append(
+                    f'graph_stage_failures_total{{stage="{stage}",size="{size}"}} {total}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = _Registry()
+_collected: ContextVar[list[Span] | None] = ContextVar("collected_spans", default=None)
+_enclosing_peak: ContextVar[list[int] | None] = ContextVar(
+    "enclosing_peak", default=None
+)
+
+
+def record(span: Span) -> None:
+    """Adds a finished span to the registry and the current :func:`collect` list."""
+    registry.observe(span)
+    collected = _collected.get()
+    if collected is not None:
+        collected.append(span)
+
+
+@contextmanager
+def span(stage: str, size: int = 0) -> Iterator[Span]:
+    """Times the block; the yielded span's ``size`` may be set inside it."""
+    current = Span(stage, size)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        base, peak = tracemalloc.get_traced_memory()
+        parent = _enclosing_peak.get()
+        if parent is not None:
+            parent[0] = max(parent[0], peak)
+        carried = [0]
+        token = _enclosing_peak.set(carried)
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.failed = True
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        if tracing:
+            _enclosing_peak.reset(token)
+            peak = max(tracemalloc.get_traced_memory()[1], carried[0])
+            if parent is not None:
+                parent[0] = max(parent[0], peak)
+            current.alloc_bytes = max(peak - base, 0)
+        record(current)
+
+
+def timed(stage: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorates a function whose first argument is a graph with a span."""
+
+    def decorate(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(G, *args, **kwargs) -> T:
+            with span(stage, graph_size(G)):
+                return fn(G, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def collect() -> Iterator[list[Span]]:
+    """Collects the spans finished in this context, including worker threads
+    started with :func:`app.services.tasks.run_task`."""
+    spans: list[Span] = []
+    token = _collected.set(spans)
+    try:
+        yield spans
+    finally:
+        _collected.reset(token)
+
+
+CACHE_METRICS = (
+    ("entries", "gauge", "Entries held by each cache."),
+    ("bytes", "gauge", "Estimated bytes held by each cache."),
+    ("max_bytes", "gauge", "Memory budget of each cache."),
+    ("hits", "counter", "Lookups that found an entry."),
+    ("misses", "counter", "Lookups that found nothing."),
+    ("evictions", "counter", "Entries evicted to stay within budget."),
+    ("oversized", "counter", "Values larger than the whole budget."),
+)
+
+
+def _render_caches() -> str:
+    stats = {name: cache.stats() for name, cache in sorted(caches.items())}
+    lines = []
+    for field, kind, help_text in CACHE_METRICS:
+        metric = f"graph_cache_{field}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, values in stats.items():
+            lines.append(f'{metric}{{cache="{name}"}} {values[field]}')
+    return "\n".join(lines) + "\n"
+
+
+def render_metrics() -> str:
+    """All spans so far and the caches' counters, in the Prometheus text format."""
+    return registry.render() + _render_caches()
+
+
+def breakdown(spans: list[Span]) -> list[dict[str, str]]:
+    """Rows for the debug panel, one per span, in the order they finished."""
+    return [
+        {
+            "stage": s.stage + (" (failed)" if s.failed else ""),
+            "time": f"{s.seconds * 1000:,.1f} ms",
+            "alloc": "-" if s.alloc_bytes is None else f"{s.alloc_bytes / 1e6:,.1f} MB",
+            "size": f"{s.size:,} edges" if s.size else "",
+        }
+        for s in spans
+    ]
@@ -0,0 +1,271 @@
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+import networkx as nx
+import numpy as np
+from app.services.graph_arrays import edge_arrays
+from app.services.graph_cache import LRUCache
+from app.services.instrumentation import graph_size, span
+from app.services.result_store import result_key, shared_results
+
+SPRING_MAX_NODES = 1_000
+SPRING_LIMIT_NODES = 2_000
+FORCE_MAX_NODES = 200_000
+COARSE_GRID = 8
+FINE_GRID = 8
+BLOCK_NODES = 2_048
+WARM_START_TEMPERATURE = 0.01
+DEFAULT_LAYOUT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class LayoutBudget:
+    """Upper bounds on the work a layout engine may do."""
+
+    iterations: int = 50
+    seconds: float = 10.0
+
+
+LayoutEngine = Callable[
+    [nx.Graph | nx.DiGraph, LayoutBudget, np.ndarray | None], np.ndarray
+]
+
+LAYOUT_ENGINES: dict[str, LayoutEngine] = {}
+ENGINE_MAX_NODES = {"spring": SPRING_LIMIT_NODES}
+
+
+def register_layout_engine(name: str) -> Callable[[LayoutEngine], LayoutEngine]:
+    """Registers a layout engine under ``name``.
+
+    Engines take the graph, a budget and optional initial positions and return
+    an ``(n, 2)`` array of coordinates in the graph's node order.
+    """
+
+    def decorator(engine: LayoutEngine) -> LayoutEngine:
+        LAYOUT_ENGINES[name] = engine
+        return engine
+
+    return decorator
+
+
+def choose_engine(G: nx.Graph | nx.DiGraph) -> str:
+    """Picks the most accurate engine that stays affordable for the graph size."""
+    n = G.number_of_nodes()
+    if n <= SPRING_MAX_NODES:
+        return "spring"
+    if n <= FORCE_MAX_NODES:
+        return "force"
+    return "random"
+
+
+def engine_fits(engine: str, nodes: int) -> bool:
+    """Whether ``engine`` may be used on a graph of ``nodes`` nodes.
+
+    Engines that ignore :attr:`LayoutBudget.seconds`, such as spring, would
+    otherwise tie up a worker for minutes on a large graph.
+    """
+    return nodes <= ENGINE_MAX_NODES.get(engine, nodes)
+
+
+def resolve_engine(G: nx.Graph | nx.DiGraph, engine: str) -> str:
+    """The engine to run for a requested one.
+
+    ``"auto"``, unknown engines and engines too slow for the graph's size
+    fall back to :func:`choose_engine`.
+    """
+    if engine in LAYOUT_ENGINES and engine_fits(engine, G.number_of_nodes()):
+        return engine
+    return choose_engine(G)
+
+
+def _positions_array(G: nx.Graph | nx.DiGraph, pos: dict) -> np.ndarray:
+    return np.array([pos[node] for node in G], dtype=np.float64).reshape(-1, 2)
+
+
+@register_layout_engine("spring")
+def spring_layout(
+    G: nx.Graph | nx.DiGraph, budget: LayoutBudget, init: np.ndarray | None
+) -> np.ndarray:
+    """NetworkX Fruchterman-Reingold; exact but O(n^2) per iteration."""
+    initial = None if init is None else dict(zip(G, init))
+    pos = nx.spring_layout(G, pos=initial, iterations=budget.iterations, seed=42)
+    return _positions_array(G, pos)
+
+
+@register_layout_engine("force")
+def force_layout(
+    G: nx.Graph | nx.DiGraph, budget: LayoutBudget, init: np.ndarray | None
+) -> np.ndarray:
+    """Fruchterman-Reingold with Barnes-Hut style approximated repulsion.
+
+    Nodes are bucketed into a two-level grid. Each node is repelled by the
+    centroids of every other coarse cell, by the centroids of the other fine
+    cells inside its own coarse cell, and by the centroid of the remaining
+    nodes in its own fine cell, which costs O(n * (coarse + fine cells)) per
+    iteration instead of O(n^2). Attraction along edges is exact.
+    """
+    n = G.number_of_nodes()
+    if n <= 2:
+        return _positions_array(G, nx.circular_layout(G))
+    src, dst = edge_arrays(G)
+    rng = np.random.default_rng(42)
+    pos = rng.random((n, 2)) if init is None else np.array(init, dtype=np.float64)
+    k = 1.0 / np.sqrt(n)
+    temperature = 0.1 if init is None else WARM_START_TEMPERATURE
+    cooling = temperature / (budget.iterations + 1)
+    deadline = time.perf_counter() + budget.seconds
+    for _ in range(budget.iterations):
+        disp = _grid_repulsion(pos, k)
+        delta = pos[src] - pos[dst]
+        dist = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+        pull = delta * (dist / k)[:, None]
+        for axis in range(2):
+            disp[:, axis] -= np.bincount(src, weights=pull[:, axis], minlength=n)
+            disp[:, axis] += np.bincount(dst, weights=pull[:, axis], minlength=n)
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+        if time.perf_counter() > deadline:
+            break
+    return _rescale(pos)
+
+
+def _cell_centroids(
+    cell: np.ndarray, pos: np.ndarray, cells: int
+) -> tuple[np.ndarray, np.ndarray]:
+    counts = np.bincount(cell, minlength=cells).astype(np.float64)
+    sums = np.stack(
+        [np.bincount(cell, weights=pos[:, axis], minlength=cells) for axis in (0, 1)],
+        axis=1,
+    )
+    return counts, sums
+
+
+def _grid_repulsion(pos: np.ndarray, k: float) -> np.ndarray:
+    lo = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - lo, 1e-9)
+    fine_side = COARSE_GRID * FINE_GRID
+    fxy = np.minimum(((pos - lo) / span * fine_side).astype(np.int64), fine_side - 1)
+    cxy = fxy // FINE_GRID
+    coarse = cxy[:, 0] * COARSE_GRID + cxy[:, 1]
+    local = (fxy[:, 0] % FINE_GRID) * FINE_GRID + fxy[:, 1] % FINE_GRID
+    fine = coarse * FINE_GRID**2 + local
+
+    coarse_counts, coarse_sums = _cell_centroids(coarse, pos, COARSE_GRID**2)
+    fine_counts, fine_sums = _cell_centroids(fine, pos, fine_side**2)
+    occupied = np.nonzero(coarse_counts)[0]
+    coarse_mass = coarse_counts[occupied]
+    coarse_centers = coarse_sums[occupied] / coarse_mass[:, None]
+    fine_mass = fine_counts.reshape(-1, FINE_GRID**2)
+    fine_cx = fine_sums[:, 0].reshape(fine_mass.shape) / np.maximum(fine_mass, 1.0)
+    fine_cy = fine_sums[:, 1].reshape(fine_mass.shape) / np.maximum(fine_mass, 1.0)
+    coarse_cx = coarse_centers[None, :, 0].copy()
+    coarse_cy = coarse_centers[None, :, 1].copy()
+
+    k2 = k * k
+    disp = np.zeros_like(pos)
+    for start in range(0, len(pos), BLOCK_NODES):
+        block = slice(start, start + BLOCK_NODES)
+        p = pos[block]
+        mass = np.where(
+            occupied[None, :] == coarse[block, None], 0.0, coarse_mass[None, :]
+        )
+        disp[block] += _repel(p, coarse_cx, coarse_cy, mass, k2)
+        cells = coarse[block]
+        own_fine = fine_mass[cells]
+        own_fine[np.arange(len(p)), local[block]] = 0.0
+        disp[block] += _repel(p, fine_cx[cells], fine_cy[cells], own_fine, k2)
+    others = fine_counts[fine] - 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        near_center = (fine_sums[fine] - pos) / others[:, None]
+    near = _repel(pos, near_center[:, 0:1], near_center[:, 1:2], others[:, None], k2)
+    disp += np.nan_to_num(near)
+    return disp
+
+
+def _repel(
+    p: np.ndarray, cx: np.ndarray, cy: np.ndarray, mass: np.ndarray, k2: float
+) -> np.ndarray:
+    """Sum of FR repulsion on points ``p`` from point masses at (cx, cy)."""
+    dx = p[:, 0:1] - cx
+    dy = p[:, 1:2] - cy
+    weight = dx * dx
+    weight += dy * dy
+    np.maximum(weight, 1e-12, out=weight)
+    np.divide(mass, weight, out=weight)
+    return k2 * np.column_stack(
+        [np.einsum("ij,ij->i", dx, weight), np.einsum("ij,ij->i", dy, weight)]
+    )
+
+
+def _rescale(pos: np.ndarray) -> np.ndarray:
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    return pos / extent if extent > 0 else pos
+
+
+@register_layout_engine("spectral")
+def spectral_layout(
+    G: nx.Graph | nx.DiGraph, budget: LayoutBudget, init: np.ndarray | None
+) -> np.ndarray:
+    """Laplacian eigenvector layout.
+
+    One sparse eigensolve; cheap per iteration but slow to converge on large
+    sparse graphs, so it is only used when requested explicitly.
+    """
+    if G.number_of_nodes() <= 2:
+        return _positions_array(G, nx.circular_layout(G))
+    return _positions_array(G, nx.spectral_layout(G))
+
+
+@register_layout_engine("circular")
+def circular_layout(
+    G: nx.Graph | nx.DiGraph, budget: LayoutBudget, init: np.ndarray | None
+) -> np.ndarray:
+    """Nodes evenly spaced on the unit circle, in node order."""
+    theta = np.linspace(0, 2 * np.pi, G.number_of_nodes(), endpoint=False)
+    return np.column_stack([np.cos(theta), np.sin(theta)])
+
+
+@register_layout_engine("random")
+def random_layout(
+    G: nx.Graph | nx.DiGraph, budget: LayoutBudget, init: np.ndarray | None
+) -> np.ndarray:
+    """Uniformly random positions in [-1, 1]^2."""
+    return np.random.default_rng(42).uniform(-1, 1, (G.number_of_nodes(), 2))
+
+
+layout_cache: LRUCache[tuple[str, str], np.ndarray] = LRUCache(
+    max_bytes=int(os.environ.get("LAYOUT_CACHE_MAX_BYTES", DEFAULT_LAYOUT_CACHE_BYTES)),
+    sizeof=lambda pos: pos.nbytes,
+    name="layout",
+)
+
+
+def compute_layout(
+    G: nx.Graph | nx.DiGraph,
+    key: str = "",
+    engine: str = "auto",
+    budget: LayoutBudget | None = None,
+    init: np.ndarray | None = None,
+) -> np.ndarray:
+    """Returns node coordinates as an ``(n, 2)`` array in the graph's node order.
+
+    Results are cached per (graph key, engine) when a key is given, so
+    revisiting a graph never recomputes its layout, and shared with other
+    sessions and worker processes through the result store.
+    """
+    engine = resolve_engine(G, engine)
+    budget = budget or LayoutBudget()
+
+    def run() -> np.ndarray:
+        with span("layout", graph_size(G)):
+            return LAYOUT_ENGINES[engine](G, budget, init)
+
+    if not key:
+        return run()
+    return layout_cache.get_or_create(
+        (key, engine),
+        lambda: shared_results.get_or_compute(result_key(key, "layout", engine), run),
+    )
@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+from app.services.figure import build_figure, figure_from_arrays
+from app.services.graph_arrays import cached_edge_arrays
+
+SUMMARY_MIN_ELEMENTS = 20_000
+DETAIL_MAX_ELEMENTS = 20_000
+SUMMARY_BINS = 48
+MAX_SUMMARY_EDGES = 10_000
+
+Region = tuple[float, float, float, float]
+
+
+@dataclass
+class Summary:
+    """A graph collapsed onto the occupied cells of a grid over its layout."""
+
+    centers: np.ndarray
+    counts: np.ndarray
+    bounds: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    weights: np.ndarray
+
+
+def bounding_region(pos: np.ndarray) -> Region:
+    """The (x0, x1, y0, y1) box around all positions."""
+    if len(pos) == 0:
+        return (-1.0, 1.0, -1.0, 1.0)
+    lo, hi = pos.min(axis=0), pos.max(axis=0)
+    return (float(lo[0]), float(hi[0]), float(lo[1]), float(hi[1]))
+
+
+def region_mask(pos: np.ndarray, region: Region) -> np.ndarray:
+    x0, x1, y0, y1 = region
+    return (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+
+
+def view_mode(
+    pos: np.ndarray, src: np.ndarray, dst: np.ndarray, region: Region | None
+) -> str:
+    """Whether a view renders the whole graph, an exact region or a summary."""
+    if region is None:
+        return "full" if len(pos) + len(src) < SUMMARY_MIN_ELEMENTS else "summary"
+    mask = region_mask(pos, region)
+    touched = np.count_nonzero(mask[src] | mask[dst])
+    return (
+        "detail"
+        if np.count_nonzero(mask) + touched <= DETAIL_MAX_ELEMENTS
+        else "summary"
+    )
+
+
+def summarize(
+    pos: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    region: Region,
+    bins: int = SUMMARY_BINS,
+) -> Summary:
+    """Bins the nodes inside ``region`` into a ``bins`` x ``bins`` grid.
+
+    Each occupied cell becomes a summary node at the centroid of its members;
+    edges between cells are merged and weighted by multiplicity, keeping the
+    ``MAX_SUMMARY_EDGES`` heaviest.
+    """
+    x0, x1, y0, y1 = region
+    width = max(x1 - x0, 1e-12) / bins
+    height = max(y1 - y0, 1e-12) / bins
+    inside = np.nonzero(region_mask(pos, region))[0]
+    col = np.clip(((pos[inside, 0] - x0) / width).astype(np.int64), 0, bins - 1)
+    row = np.clip(((pos[inside, 1] - y0) / height).astype(np.int64), 0, bins - 1)
+    cells, members, counts = np.unique(
+        col * bins + row, return_inverse=True, return_counts=True
+    )
+    centers = (
+        np.column_stack(
+            [np.bincount(members, weights=pos[inside, axis]) for axis in (0, 1)]
+        )
+        / counts[:, None]
+    )
+    cx, cy = cells // bins, cells % bins
+    bounds = np.column_stack(
+        [
+            x0 + cx * width,
+            x0 + (cx + 1) * width,
+            y0 + cy * height,
+            y0 + (cy + 1) * height,
+        ]
+    )
+
+    cell_of = np.full(len(pos), -1, dtype=np.int64)
+    cell_of[inside] = members
+    cu, cv = cell_of[src], cell_of[dst]
+    keep = (cu >= 0) & (cv >= 0) & (cu != cv)
+    lo = np.minimum(cu[keep], cv[keep])
+    hi = np.maximum(cu[keep], cv[keep])
+    pairs, weights = np.unique(lo * len(cells) + hi, return_counts=True)
+    if len(pairs) > MAX_SUMMARY_EDGES:
+        top = np.argpartition(weights, -MAX_SUMMARY_EDGES)[-MAX_SUMMARY_EDGES:]
+        pairs, weights = pairs[top], weights[top]
+    return Summary(
+        centers=centers,
+        counts=counts,
+        bounds=bounds,
+        src=pairs // len(cells),
+        dst=pairs % len(cells),
+        weights=weights,
+    )
+
+
+def _summary_figure(summary: Summary, total_nodes: int) -> go.Figure:
+    sizes = np.clip(6 + 3 * np.log2(summary.counts), 6, 36)
+    hover = [f"{count:,} nodes" for count in summary.counts.tolist()]
+    fig = figure_from_arrays(
+        summary.centers,
+        summary.src,
+        summary.dst,
+        hover,
+        sizes=sizes,
+        title=(
+            f"Summary: {int(summary.counts.sum()):,} of {total_nodes:,} nodes in "
+            f"{len(summary.counts):,} cells. Click a cell or box-select to zoom in."
+        ),
+    )
+    fig.update_layout(dragmode="select")
+    return fig
+
+
+def _detail_figure(
+    G: nx.Graph | nx.DiGraph,
+    pos: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    region: Region,
+) -> go.Figure:
+    mask = region_mask(pos, region)
+    touched = mask[src] | mask[dst]
+    sub_src, sub_dst = src[touched], dst[touched]
+    nodes = np.unique(np.concatenate([np.nonzero(mask)[0], sub_src, sub_dst]))
+    node_list = list(G)
+    labels = [str(node_list[i]) for i in nodes.tolist()]
+    return figure_from_arrays(
+        pos[nodes],
+        np.searchsorted(nodes, sub_src),
+        np.searchsorted(nodes, sub_dst),
+        labels,
+        title=f"Detail: {np.count_nonzero(mask):,} nodes in the selected region.",
+    )
+
+
+def build_lod_figure(
+    G: nx.Graph | nx.DiGraph,
+    pos: np.ndarray,
+    key: str = "",
+    region: Region | None = None,
+) -> go.Figure:
+    """Builds a figure whose size is bounded regardless of the graph size.
+
+    Small graphs are drawn in full. Large graphs are drawn as a grid-binned
+    summary; a region narrows the view and is drawn exactly once it holds
+    few enough nodes and edges.
+    """
+    src, dst = cached_edge_arrays(G, key)
+    mode = view_mode(pos, src, dst, region)
+    if mode == "full":
+        return build_figure(G, pos, key)
+    if mode == "detail":
+        return _detail_figure(G, pos, src, dst, region)
+    summary = summarize(pos, src, dst, region or bounding_region(pos))
+    return _summary_figure(summary, len(pos))
+
+
+def summary_cell_region(
+    G: nx.Graph | nx.DiGraph,
+    pos: np.ndarray,
+    key: str,
+    region: Region | None,
+    cell: int,
+) -> Region | None:
+    """The bounds of summary cell ``cell`` in the current view, if it is a summary."""
+    src, dst = cached_edge_arrays(G, key)
+    if view_mode(pos, src, dst, region) != "summary":
+        return None
+    summary = summarize(pos, src, dst, region or bounding_region(pos))
+    if not 0 <= cell < len(summary.bounds):
+        return None
+    return tuple(float(v) for v in summary.bounds[cell])
@@ -0,0 +1,122 @@
+"""Per-node metrics computed together in one pass over the adjacency matrix.
+
+The sidebar statistics, degree centrality and the clustering table used to
+walk the graph separately. :func:`graph_metrics` computes degrees,
+triangles, clustering and connected components from the graph's CSR matrix
+once and memoizes them per graph key, so all of them are served from the
+same computation.
+"""
+
+import os
+from dataclasses import dataclass
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+from app.services import executor, sparse_backend
+from app.services.graph_arrays import adjacency_matrix, cached_edge_arrays
+from app.services.graph_cache import LRUCache
+from app.services.instrumentation import timed
+from app.services.tasks import TaskControl
+
+DEFAULT_METRICS_CACHE_BYTES = 128 * 1024 * 1024
+
+
+@dataclass
+class GraphMetrics:
+    """Node-ordered metric arrays of one graph.
+
+    ``degrees`` counts like :meth:`nx.Graph.degree`: self-loops twice, and
+    in plus out edges for directed graphs. Triangles and clustering are only
+    kept for undirected graphs. Components are weakly connected ones for
+    directed graphs.
+    """
+
+    edges: int
+    directed: bool
+    degrees: np.ndarray
+    components: int
+    triangles: np.ndarray | None = None
+    clustering: np.ndarray | None = None
+
+    @property
+    def nodes(self) -> int:
+        return len(self.degrees)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.degrees, self.triangles, self.clustering)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    @property
+    def clustering_sum(self) -> float:
+        return float(self.clustering.sum()) if self.clustering is not None else 0.0
+
+    def degree_centrality(self, G: nx.Graph | nx.DiGraph) -> dict[str, float]:
+        """Same as :func:`nx.degree_centrality` for the graph these came from."""
+        if self.nodes <= 1:
+            return {node: 1.0 for node in G}
+        return dict(zip(G, (self.degrees / (self.nodes - 1)).tolist()))
+
+    def clustering_by_node(self, G: nx.Graph) -> dict[str, float]:
+        """Same as :func:`nx.clustering` for the graph these came from."""
+        return dict(zip(G, self.clustering.tolist()))
+
+
+def _closed_two_paths(
+    G: nx.Graph, key: str, A, control: TaskControl | None
+) -> np.ndarray:
+    """Twice the triangles at each node, on the worker pool for large graphs."""
+    if executor.use_pool(G, key):
+        try:
+            values = executor.clustering_values(G, key, control)
+            degrees = np.diff(A.indptr)
+            return np.rint(values * degrees * (degrees - 1)).astype(np.int64)
+        except executor.ExecutorBusy:
+            pass
+    return sparse_backend.closed_two_paths(A, 0, A.shape[0], control)
+
+
+@timed("metrics")
+def compute_metrics(
+    G: nx.Graph | nx.DiGraph, key: str = "", control: TaskControl | None = None
+) -> GraphMetrics:
+    n = G.number_of_nodes()
+    A = adjacency_matrix(G, key)
+    src, dst = cached_edge_arrays(G, key)
+    loops = np.bincount(src[src == dst], minlength=n)
+    out_degrees = np.diff(A.indptr)
+    degrees = out_degrees + 2 * loops
+    directed = G.is_directed()
+    if directed:
+        degrees = degrees + np.bincount(A.indices, minlength=n)
+    components = connected_components(A, directed=directed, connection="weak")[0]
+    metrics = GraphMetrics(
+        edges=G.number_of_edges(),
+        directed=directed,
+        degrees=degrees,
+        components=int(components),
+    )
+    if not directed:
+        closed = _closed_two_paths(G, key, A, control)
+        pairs = out_degrees * (out_degrees - 1)
+        metrics.triangles = closed // 2
+        metrics.clustering = np.divide(closed, pairs, out=np.zeros(n), where=pairs > 0)
+    return metrics
+
+
+metrics_cache: LRUCache[str, GraphMetrics] = LRUCache(
+    max_bytes=int(
+        os.environ.get("METRICS_CACHE_MAX_BYTES", DEFAULT_METRICS_CACHE_BYTES)
+    ),
+    sizeof=lambda metrics: max(metrics.nbytes, 1),
+    name="metrics",
+)
+
+
+def graph_metrics(
+    G: nx.Graph | nx.DiGraph, key: str = "", control: TaskControl | None = None
+) -> GraphMetrics:
+    """Returns the metrics of a graph, memoized per graph key."""
+    if not key:
+        return compute_metrics(G, control=control)
+    return metrics_cache.get_or_create(key, lambda: compute_metrics(G, key, control))
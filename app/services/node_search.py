@@ -0,0 +1,61 @@
+"""Prefix search over node labels for the node pickers.
+
+The index holds the lower-cased labels in sorted order, so a query is a
+binary search for the first label at or after it followed by a short scan;
+every keystroke costs ``O(log n + limit)`` whatever the graph size.
+"""
+
+import os
+from bisect import bisect_left
+import networkx as nx
+from app.services.graph_cache import LRUCache
+
+MAX_MATCHES = 20
+LABEL_BYTES = 64
+DEFAULT_NODE_INDEX_CACHE_BYTES = 128 * 1024 * 1024
+
+
+class NodeIndex:
+    """Node labels sorted case-insensitively."""
+
+    def __init__(self, G: nx.Graph | nx.DiGraph):
+        entries = sorted((str(node).lower(), str(node)) for node in G)
+        self.keys = [key for key, _ in entries]
+        self.labels = [label for _, label in entries]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def search(self, query: str, limit: int = MAX_MATCHES) -> list[str]:
+        """The first ``limit`` labels starting with ``query``, ignoring case.
+
+        A label equal to the query comes first.
+        """
+        prefix = query.strip().lower()
+        start = bisect_left(self.keys, prefix)
+        matches = []
+        for i in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[i].startswith(prefix):
+                break
+            matches.append(self.labels[i])
+        exact = query.strip()
+        if exact in matches:
+            matches.remove(exact)
+            matches.insert(0, exact)
+        return matches
+
+
+node_index_cache: LRUCache[str, NodeIndex] = LRUCache(
+    max_bytes=int(
+        os.environ.get("NODE_INDEX_CACHE_MAX_BYTES", DEFAULT_NODE_INDEX_CACHE_BYTES)
+    ),
+    sizeof=lambda index: max(LABEL_BYTES * len(index), 1),
+    name="node_index",
+)
+
+
+def node_index(G: nx.Graph | nx.DiGraph, key: str = "") -> NodeIndex:
+    """Returns the label index of a graph, memoized per graph key."""
+    if not key:
+        return NodeIndex(G)
+    return node_index_cache.get_or_create(key, lambda: NodeIndex(G))
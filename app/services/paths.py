@@ -0,0 +1,155 @@
+import os
+import threading
+from collections import OrderedDict
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import breadth_first_order
+from app.services.graph_arrays import adjacency_matrix
+from app.services.graph_cache import LRUCache
+
+HOT_SOURCES = int(os.environ.get("PATH_INDEX_HOT_SOURCES", 16))
+HOT_AFTER_QUERIES = 2
+MAX_TRACKED_SOURCES = 4_096
+INDEX_ENTRY_BYTES = 150
+DEFAULT_PATH_INDEX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class PathIndex:
+    """Answers repeated unweighted shortest-path queries on one graph.
+
+    The index keeps the graph's CSR adjacency and node labels, not the
+    graph itself, so its size is what the cache counts. A first query from a
+    source runs a bidirectional BFS on the CSR, expanding the smaller
+    frontier one level at a time until the two meet. Once a source has been
+    queried ``HOT_AFTER_QUERIES`` times, a full SciPy BFS stores its
+    predecessor tree; trees of the ``HOT_SOURCES`` most recent hot sources
+    are kept. A query from a hot source, or to one on an undirected graph,
+    only walks the stored tree.
+    """
+
+    def __init__(self, G: nx.Graph | nx.DiGraph, key: str = ""):
+        self.nodes = list(G)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.directed = G.is_directed()
+        self._matrix = adjacency_matrix(G, key)
+        self._reverse = self._matrix.T.tocsr() if self.directed else self._matrix
+        matrices = {id(m): m for m in (self._matrix, self._reverse)}.values()
+        self.nbytes = (
+            INDEX_ENTRY_BYTES * len(self.nodes)
+            + sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+            + HOT_SOURCES * len(self.nodes) * 4
+        )
+        self._trees: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._queries: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _cached_tree(self, source: int) -> np.ndarray | None:
+        with self._lock:
+            tree = self._trees.get(source)
+            if tree is not None:
+                self._trees.move_to_end(source)
+            return tree
+
+    def _tree(self, source: int) -> np.ndarray:
+        """Predecessors on BFS paths from ``source``; -9999 where unreachable."""
+        tree = self._cached_tree(source)
+        if tree is None:
+            _, predecessors = breadth_first_order(
+                self._matrix, source, directed=True, return_predecessors=True
+            )
+            tree = predecessors.astype(np.int32)
+            with self._lock:
+                self._trees[source] = tree
+                while len(self._trees) > HOT_SOURCES:
+                    self._trees.popitem(last=False)
+        return tree
+
+    def shortest_path(self, source, target) -> list:
+        """Same result length as :func:`nx.shortest_path`, and same exceptions."""
+        for node in (source, target):
+            if node not in self.index:
+                raise nx.NodeNotFound(f"Node {node} not in G")
+        s, t = self.index[source], self.index[target]
+        if self._cached_tree(s) is not None:
+            return self._walk(self._tree(s), s, t)[::-1]
+        if not self.directed:
+            reverse = self._cached_tree(t)
+            if reverse is not None:
+                return self._walk(reverse, t, s)
+        if self._count_query(s) >= HOT_AFTER_QUERIES:
+            return self._walk(self._tree(s), s, t)[::-1]
+        return self._bidirectional(s, t)
+
+    def _bidirectional(self, s: int, t: int) -> list:
+        """Labels on a shortest path from ``s`` to ``t`` found from both ends."""
+        n = len(self.nodes)
+        forward = np.full(n, -1, dtype=np.int32)
+        backward = np.full(n, -1, dtype=np.int32)
+        forward[s], backward[t] = s, t
+        front, back = np.array([s]), np.array([t])
+        meet = s if s == t else -1
+        while meet < 0 and len(front) and len(back):
+            if len(front) <= len(back):
+                front = _expand(self._matrix, front, forward)
+                hits = front[backward[front] >= 0]
+            else:
+                back = _expand(self._reverse, back, backward)
+                hits = back[forward[back] >= 0]
+            if len(hits):
+                meet = int(hits[0])
+        if meet < 0:
+            raise nx.NetworkXNoPath(
+                f"No path between {self.nodes[s]} and {self.nodes[t]}."
+            )
+        return self._walk(forward, s, meet)[::-1] + self._walk(backward, t, meet)[1:]
+
+    def _count_query(self, source: int) -> int:
+        with self._lock:
+            if len(self._queries) >= MAX_TRACKED_SOURCES:
+                self._queries.clear()
+            self._queries[source] = self._queries.get(source, 0) + 1
+            return self._queries[source]
+
+    def _walk(self, tree: np.ndarray, root: int, node: int) -> list:
+        """Labels from ``node`` back up ``tree`` to ``root``."""
+        path = [self.nodes[node]]
+        while node != root:
+            node = int(tree[node])
+            if node < 0:
+                raise nx.NetworkXNoPath(
+                    f"No path between {self.nodes[root]} and {path[0]}."
+                )
+            path.append(self.nodes[node])
+        return path
+
+
+def _expand(matrix, frontier: np.ndarray, parents: np.ndarray) -> np.ndarray:
+    """Visits the unvisited neighbours of ``frontier``, recording their parents."""
+    starts = matrix.indptr[frontier]
+    counts = matrix.indptr[frontier + 1] - starts
+    ends = np.cumsum(counts)
+    arcs = np.repeat(starts - ends + counts, counts) + np.arange(
+        ends[-1] if len(ends) else 0
+    )
+    neighbours = matrix.indices[arcs]
+    sources = np.repeat(frontier, counts)
+    fresh = parents[neighbours] < 0
+    neighbours, first = np.unique(neighbours[fresh], return_index=True)
+    parents[neighbours] = sources[fresh][first]
+    return neighbours
+
+
+path_index_cache: LRUCache[str, PathIndex] = LRUCache(
+    max_bytes=int(
+        os.environ.get("PATH_INDEX_CACHE_MAX_BYTES", DEFAULT_PATH_INDEX_CACHE_BYTES)
+    ),
+    sizeof=lambda index: index.nbytes,
+    name="path_index",
+)
+
+
+def path_index(G: nx.Graph | nx.DiGraph, key: str = "") -> PathIndex:
+    """Returns the path index for a graph, building it on first use."""
+    if not key:
+        return PathIndex(G)
+    return path_index_cache.get_or_create(key, lambda: PathIndex(G, key))
@@ -0,0 +1,265 @@
+"""Algorithm results shared by every session and worker process.
+
+Results are keyed by the graph's content key, the algorithm and its
+parameters, and kept pickled in a SQLite database next to the graph store,
+with a small in-memory LRU in front. Entries expire after
+``RESULT_STORE_TTL`` seconds and the least recently used are deleted once
+the database holds more than ``RESULT_STORE_MAX_BYTES``.
+
+Results that are looked up by a random id, such as the per-node tables
+and batch distances offered for download, are saved with :meth:`ResultStore.put`
+so that whichever worker serves the request can find them.
+
+Identical requests are computed once. Within a process, later callers wait
+for the first one; across processes, the first caller claims the key in a
+``pending`` table and the others poll until the result appears. Waiting
+callers keep reporting to their :class:`TaskControl`, so they can still be
+cancelled, and take over if the computation they were waiting for fails.
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TypeVar
+from app.services.graph_cache import LRUCache
+from app.services.graph_store import STORE_DIR
+from app.services.tasks import TASK_TIMEOUT_SECONDS, TaskControl
+
+T = TypeVar("T")
+
+DB_PATH = Path(os.environ.get("RESULT_STORE_PATH", STORE_DIR / "results.sqlite3"))
+TTL_SECONDS = float(os.environ.get("RESULT_STORE_TTL", 7 * 24 * 3600))
+DEFAULT_STORE_MAX_BYTES = 1024 * 1024 * 1024
+STORE_MAX_BYTES = int(os.environ.get("RESULT_STORE_MAX_BYTES", DEFAULT_STORE_MAX_BYTES))
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+POLL_SECONDS = 0.1
+STALE_CLAIM_SECONDS = TASK_TIMEOUT_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS pending (key TEXT PRIMARY KEY, started REAL NOT NULL);
+"""
+
+
+def result_key(graph_key: str, algorithm: str, *params: Hashable) -> str:
+    """The store key of one algorithm run on one graph."""
+    return ":".join([graph_key, algorithm, *map(repr, params)])
+
+
+class ResultStore:
+    """A SQLite-backed result cache with single-flight computation."""
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = TTL_SECONDS,
+        max_bytes: int = STORE_MAX_BYTES,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: LRUCache[str, tuple[object, float]] = LRUCache(
+            max_bytes=memory_bytes, sizeof=lambda entry: entry[1]
+        )
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            if not self._ready:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(_SCHEMA)
+                self._ready = True
+            db.execute("PRAGMA synchronous=NORMAL")
+            yield db
+        finally:
+            db.close()
+
+    def _read(self, key: str) -> object | None:
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT value FROM results WHERE key = ? AND created > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        value = pickle.loads(row[0])
+        self._memory.put(key, (value, len(row[0])))
+        return value
+
+    def _write(self, key: str, value: object) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        self._memory.put(key, (value, len(blob)))
+        if len(blob) > self.max_bytes:
+            return
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        """Deletes expired results, then the least recently used over the limit."""
+        db.execute("DELETE FROM results WHERE created <= ?", (now - self.ttl,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        db.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def _claim(self, key: str) -> bool:
+        """Marks ``key`` as being computed here, unless another process is.
+
+        Claims older than ``STALE_CLAIM_SECONDS`` belong to processes that
+        died mid-computation and are taken over.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "DELETE FROM pending WHERE key = ? AND started < ?",
+                (key, now - STALE_CLAIM_SECONDS),
+            )
+            inserted = db.execute(
+                "INSERT OR IGNORE INTO pending VALUES (?, ?)", (key, now)
+            ).rowcount
+        return inserted == 1
+
+    def _release(self, key: str) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM pending WHERE key = ?", (key,))
+
+    def _claimed(self, key: str) -> bool:
+        with self._connect() as db:
+            row = db.execute("SELECT 1 FROM pending WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def get(self, key: str) -> object | None:
+        """The stored result, or ``None``."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry[0]
+        try:
+            return self._read(key)
+        except sqlite3.Error as e:
+            logging.warning(f"Result store read failed: {e}")
+            return None
+
+    def put(self, key: str, value: object) -> None:
+        """Stores ``value`` under ``key``, logging rather than raising on failure."""
+        try:
+            self._write(key, value)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not save result {key[:12]} to the store: {e}")
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], T],
+        control: TaskControl | None = None,
+    ) -> T:
+        """Returns the stored result for ``key``, computing it at most once.
+
+        The store is only a cache: if it cannot be read or written, the
+        failure is logged and the result is computed and returned as usual.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = threading.Event()
+            if not leader:
+                while not flight.wait(POLL_SECONDS):
+                    _keep_alive(control)
+                continue
+            try:
+                return self._compute(key, compute, control)
+            except _ComputedElsewhere:
+                continue
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                flight.set()
+
+    def _compute(
+        self, key: str, compute: Callable[[], T], control: TaskControl | None
+    ) -> T:
+        try:
+            claimed = self._claim(key)
+        except sqlite3.Error as e:
+            logging.warning(f"Result store unavailable: {e}")
+            return compute()
+        if not claimed:
+            self._wait_elsewhere(key, control)
+            raise _ComputedElsewhere()
+        try:
+            value = compute()
+            try:
+                self._write(key, value)
+            except sqlite3.Error as e:
+                logging.warning(f"Could not save result {key[:12]} to the store: {e}")
+        finally:
+            try:
+                self._release(key)
+            except sqlite3.Error:
+                pass
+        return value
+
+    def _wait_elsewhere(self, key: str, control: TaskControl | None) -> None:
+        """Waits while another process computes ``key``."""
+        try:
+            while self._claimed(key) and self.get(key) is None:
+                time.sleep(POLL_SECONDS)
+                _keep_alive(control)
+        except sqlite3.Error as e:
+            logging.warning(f"Result store unavailable: {e}")
+
+    def clear(self) -> None:
+        """Deletes every stored result."""
+        self._memory.clear()
+        with self._connect() as db:
+            db.execute("DELETE FROM results")
+
+
+class _ComputedElsewhere(Exception):
+    """Another process held the claim; look the result up again."""
+
+
+def _keep_alive(control: TaskControl | None) -> None:
+    """Lets a waiting task be cancelled without changing its progress."""
+    if control is not None:
+        control.report(control.progress)
+
+
+shared_results = ResultStore(DB_PATH)
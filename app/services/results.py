@@ -0,0 +1,159 @@
+"""Per-node results kept on the server and served a page at a time.
+
+A centrality or clustering result has one value per node, far more than a
+sidebar table can show. Results are stored here under a random id, sorted
+once by value, and the session only holds the id and the page it is looking
+at, so the state sent to the browser does not grow with the graph.
+
+Each result is also saved to the shared result store, so a page or download
+requested from another worker process finds it there.
+"""
+
+import math
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+import numpy as np
+from app.services.graph_cache import LRUCache
+from app.services.result_store import shared_results
+
+PAGE_SIZE = 25
+LABEL_BYTES = 64
+DEFAULT_RESULT_CACHE_BYTES = 128 * 1024 * 1024
+
+
+@dataclass
+class ResultPage:
+    """One page of a result: ``(rank, node, value)`` rows and the match count."""
+
+    rows: list[tuple[int, str, float]]
+    total: int
+    page: int
+    pages: int
+
+
+@dataclass
+class ResultIndex:
+    """Node values with their ranks, from highest (rank 1) to lowest."""
+
+    labels: list[str]
+    values: np.ndarray
+    order: np.ndarray
+    ranks: np.ndarray
+    _filters: dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_values(cls, values: dict) -> "ResultIndex":
+        array = np.fromiter(values.values(), dtype=np.float64, count=len(values))
+        order = np.argsort(-array, kind="stable")
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(1, len(order) + 1)
+        return cls(
+            labels=[str(node) for node in values],
+            values=array,
+            order=order,
+            ranks=ranks,
+        )
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__, _filters={})
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state, _lock=threading.Lock())
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.values, self.order, self.ranks)
+        return LABEL_BYTES * len(self.labels) + sum(a.nbytes for a in arrays)
+
+    def matching(self, query: str) -> np.ndarray:
+        """Positions in rank order of the nodes whose label contains ``query``.
+
+        The last filter is memoized, so paging through it does not rescan
+        every label.
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.order
+        with self._lock:
+            matches = self._filters.get(query)
+            if matches is None:
+                hits = np.fromiter(
+                    (query in label.lower() for label in self.labels),
+                    dtype=bool,
+                    count=len(self.labels),
+                )
+                matches = self.order[hits[self.order]]
+                self._filters = {query: matches}
+            return matches
+
+    def page(
+        self,
+        page: int = 0,
+        size: int = PAGE_SIZE,
+        descending: bool = True,
+        query: str = "",
+    ) -> ResultPage:
+        """The rows of one page, in ascending or descending value order."""
+        matches = self.matching(query)
+        total = len(matches)
+        pages = max(math.ceil(total / size), 1)
+        page = min(max(page, 0), pages - 1)
+        if descending:
+            chosen = matches[page * size : (page + 1) * size]
+        else:
+            end = total - page * size
+            chosen = matches[max(end - size, 0) : end][::-1]
+        rows = [
+            (rank, self.labels[i], value)
+            for rank, i, value in zip(
+                self.ranks[chosen].tolist(),
+                chosen.tolist(),
+                self.values[chosen].tolist(),
+            )
+        ]
+        return ResultPage(rows=rows, total=total, page=page, pages=pages)
+
+
+result_cache: LRUCache[str, ResultIndex] = LRUCache(
+    max_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", DEFAULT_RESULT_CACHE_BYTES)),
+    sizeof=lambda index: max(index.nbytes, 1),
+    name="result",
+)
+
+
+def store_result(values: dict) -> str:
+    """Indexes a per-node result and returns the id to page through it with."""
+    result_id = uuid.uuid4().hex
+    index = ResultIndex.from_values(values)
+    result_cache.put(result_id, index)
+    shared_results.put(f"result:{result_id}", index)
+    return result_id
+
+
+def get_result(result_id: str) -> ResultIndex | None:
+    """A stored result from this process or the shared store, or ``None``."""
+    index = result_cache.get(result_id)
+    if index is None:
+        index = shared_results.get(f"result:{result_id}")
+        if index is not None:
+            result_cache.put(result_id, index)
+    return index
+
+
+def result_page(
+    result_id: str,
+    page: int = 0,
+    size: int = PAGE_SIZE,
+    descending: bool = True,
+    query: str = "",
+) -> ResultPage | None:
+    """A page of a stored result, or ``None`` if it has expired."""
+    index = get_result(result_id)
+    if index is None:
+        return None
+    return index.page(page, size, descending, query)
@@ -0,0 +1,206 @@
+import os
+from dataclasses import dataclass, field
+import networkx as nx
+from app.services.graph_cache import LRUCache
+from app.services.metrics import graph_metrics
+
+DEFAULT_STATS_CACHE_BYTES = 128 * 1024 * 1024
+TRIANGLE_ENTRY_BYTES = 120
+_REMOVED = object()
+
+
+def _simple_degree(G: nx.Graph, node) -> int:
+    """Degree ignoring self-loops, as used by :func:`nx.clustering`."""
+    nbrs = G.adj[node]
+    return len(nbrs) - (node in nbrs)
+
+
+def _local_clustering(triangles: int, degree: int) -> float:
+    return 0.0 if degree < 2 else 2.0 * triangles / (degree * (degree - 1))
+
+
+def _linked_without(G: nx.Graph | nx.DiGraph, u, v) -> bool:
+    """Whether ``u`` and ``v`` are weakly connected other than by edge (u, v)."""
+    if G.is_directed():
+        if G.has_edge(v, u):
+            return True
+        G = G.to_undirected(as_view=True)
+    return nx.has_path(nx.restricted_view(G, [], [(u, v)]), u, v)
+
+
+def _pieces_without(G: nx.Graph | nx.DiGraph, node) -> int:
+    """How many weak components ``node``'s component splits into without it.
+
+    A search grows from every neighbour at once, one level per round, and
+    searches that meet are merged, so it stops as soon as the neighbours are
+    known to be linked. No other node is visited more than once.
+    """
+    if G.is_directed():
+        G = G.to_undirected(as_view=True)
+    adj = G.adj
+    starts = set(adj[node]) - {node}
+    owner = {start: start for start in starts}
+    owner[node] = _REMOVED
+    merged: dict = {}
+
+    def find(x):
+        while x in merged:
+            x = merged[x]
+        return x
+
+    frontiers = {start: [start] for start in starts}
+    pieces = 0
+    while len(frontiers) > 1:
+        for root in list(frontiers):
+            frontier = frontiers.pop(root, None)
+            if frontier is None:
+                continue
+            reached = []
+            for x in frontier:
+                for y in adj[x]:
+                    other = owner.get(y)
+                    if other is None:
+                        owner[y] = root
+                        reached.append(y)
+                    elif other is not _REMOVED:
+                        other = find(other)
+                        if other != root:
+                            merged[other] = root
+                            reached.extend(frontiers.pop(other, ()))
+            if reached:
+                frontiers[root] = reached
+            else:
+                pieces += 1
+    return pieces + len(frontiers)
+
+
+@dataclass
+class GraphStats:
+    """Summary statistics of a graph that can follow single edits cheaply.
+
+    For undirected graphs the triangle count of every node is kept so that
+    adding or removing an edge only touches the two endpoints and their
+    common neighbours, instead of recomputing clustering over the graph.
+    The component count is updated by checking whether the edge's endpoints
+    are still linked without it, or for a removed node, how many pieces its
+    component falls into.
+    """
+
+    nodes: int
+    edges: int
+    directed: bool
+    triangles: dict = field(default_factory=dict)
+    clustering_sum: float = 0.0
+    components: int = 0
+
+    @classmethod
+    def from_graph(cls, G: nx.Graph | nx.DiGraph, key: str = "") -> "GraphStats":
+        """Starts from the graph's shared :func:`graph_metrics`."""
+        metrics = graph_metrics(G, key)
+        stats = cls(
+            metrics.nodes,
+            metrics.edges,
+            metrics.directed,
+            components=metrics.components,
+        )
+        if not stats.directed:
+            stats.triangles = dict(zip(G, metrics.triangles.tolist()))
+            stats.clustering_sum = metrics.clustering_sum
+        return stats
+
+    @property
+    def density(self) -> float:
+        if self.nodes <= 1:
+            return 0.0
+        pairs = self.nodes * (self.nodes - 1)
+        return (1 if self.directed else 2) * self.edges / pairs
+
+    @property
+    def average_clustering(self) -> float | None:
+        if self.directed:
+            return None
+        return self.clustering_sum / self.nodes if self.nodes else 0.0
+
+    def summary(self) -> dict[str, str | int | float]:
+        """The statistics shown in the graph page sidebar."""
+        clustering = self.average_clustering
+        return {
+            "Nodes": self.nodes,
+            "Edges": self.edges,
+            "Density": f"{self.density:.4f}",
+            "Avg. Clustering": "N/A" if clustering is None else f"{clustering:.4f}",
+            "Components": self.components,
+        }
+
+    def _retally(self, G: nx.Graph, node, triangles: int, old_degree: int) -> None:
+        """Replaces a node's triangle count and updates the clustering sum."""
+        self.clustering_sum += _local_clustering(
+            triangles, _simple_degree(G, node)
+        ) - _local_clustering(self.triangles[node], old_degree)
+        self.triangles[node] = triangles
+
+    def add_node(self, node) -> None:
+        """Records that an isolated ``node`` was added."""
+        self.nodes += 1
+        self.components += 1
+        if not self.directed:
+            self.triangles[node] = 0
+
+    def remove_node(self, G: nx.Graph | nx.DiGraph, node) -> None:
+        """Records that ``node`` and its edges are about to be removed from ``G``.
+
+        The node's component is searched once, however many edges it has.
+        """
+        self.components += _pieces_without(G, node) - 1
+        self.nodes -= 1
+        if self.directed:
+            self.edges -= len(G.succ[node]) + len(G.pred[node]) - (node in G.succ[node])
+            return
+        nbrs = set(G.adj[node]) - {node}
+        self.edges -= len(G.adj[node])
+        self.clustering_sum -= _local_clustering(
+            self.triangles.pop(node), _simple_degree(G, node)
+        )
+        for w in nbrs:
+            degree = _simple_degree(G, w)
+            common = len(nbrs.intersection(G.adj[w])) - (w in G.adj[w])
+            triangles = self.triangles[w] - common
+            self.clustering_sum += _local_clustering(
+                triangles, degree - 1
+            ) - _local_clustering(self.triangles[w], degree)
+            self.triangles[w] = triangles
+
+    def edge_changed(self, G: nx.Graph | nx.DiGraph, u, v, added: bool) -> None:
+        """Records that edge (u, v) has just been added to or removed from ``G``."""
+        sign = 1 if added else -1
+        self.edges += sign
+        if u == v:
+            return
+        if not _linked_without(G, u, v):
+            self.components -= sign
+        if self.directed:
+            return
+        common = (set(G.adj[u]) & set(G.adj[v])) - {u, v}
+        for node in (u, v):
+            self._retally(
+                G,
+                node,
+                self.triangles[node] + sign * len(common),
+                _simple_degree(G, node) - sign,
+            )
+        for w in common:
+            self._retally(G, w, self.triangles[w] + sign, _simple_degree(G, w))
+
+
+stats_cache: LRUCache[str, GraphStats] = LRUCache(
+    max_bytes=int(os.environ.get("STATS_CACHE_MAX_BYTES", DEFAULT_STATS_CACHE_BYTES)),
+    sizeof=lambda stats: TRIANGLE_ENTRY_BYTES * max(len(stats.triangles), 1),
+    name="stats",
+)
+
+
+def graph_stats(G: nx.Graph | nx.DiGraph, key: str = "") -> GraphStats:
+    """Returns the statistics of a graph, memoized per graph key."""
+    if not key:
+        return GraphStats.from_graph(G)
+    return stats_cache.get_or_create(key, lambda: GraphStats.from_graph(G, key))
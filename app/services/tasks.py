@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+TASK_TIMEOUT_SECONDS = float(os.environ.get("GRAPH_TASK_TIMEOUT", 120))
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("GRAPH_TASK_THREADS", 4)),
+    thread_name_prefix="graph-task",
+)
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task once it has been cancelled or has timed out."""
+
+
+class ExecutorBusy(Exception):
+    """Raised when the worker queue is full and a job is turned away."""
+
+
+class TaskControl:
+    """Progress and cancellation shared between a task and its event handler.
+
+    Work is cancelled cooperatively: long-running functions call
+    :meth:`report` between chunks of work, which raises
+    :class:`TaskCancelled` once cancellation has been requested.
+    """
+
+    def __init__(self) -> None:
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def report(self, fraction: float) -> None:
+        """Records progress in [0, 1] and stops the task if it was cancelled."""
+        self.progress = fraction
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+
+_running: dict[str, TaskControl] = {}
+_running_lock = threading.Lock()
+
+
+def cancel_task(task_id: str) -> bool:
+    """Requests cancellation of a running task; returns whether one was found."""
+    with _running_lock:
+        control = _running.get(task_id)
+    if control is None:
+        return False
+    control.cancel()
+    return True
+
+
+async def run_task(
+    task_id: str,
+    fn: Callable[..., T],
+    *args: Any,
+    on_progress: Callable[[float], Awaitable[None]] | None = None,
+    timeout: float = TASK_TIMEOUT_SECONDS,
+) -> T:
+    """Runs ``fn(*args, control=...)`` on the task pool without blocking the loop.
+
+    Progress is forwarded to ``on_progress`` every
+    ``PROGRESS_INTERVAL_SECONDS``. Raises :class:`TaskCancelled` when the task
+    is cancelled and :class:`TimeoutError` after ``timeout`` seconds; in both
+    cases the worker stops at its next progress report. The worker runs in a
+    copy of the caller's context, so context variables set by the caller are
+    visible to ``fn``.
+    """
+    control = TaskControl()
+    with _running_lock:
+        _running[task_id] = control
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(
+        _executor, functools.partial(context.run, fn, *args, control=control)
+    )
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            done, _ = await asyncio.wait([future], timeout=PROGRESS_INTERVAL_SECONDS)
+            if done:
+                return future.result()
+            if control.cancelled:
+                raise TaskCancelled()
+            if loop.time() > deadline:
+                control.cancel()
+                raise TimeoutError(f"Task exceeded {timeout:g}s.")
+            if on_progress is not None:
+                await on_progress(control.progress)
+    finally:
+        if not future.done():
+            future.add_done_callback(_discard_result)
+        with _running_lock:
+            if _running.get(task_id) is control:
+                del _running[task_id]
+
+
+def _discard_result(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,59 @@
+"""Uploaded graph files kept on local disk.
+
+An upload is saved under its content digest and read again only when its
+graph has to be rebuilt, i.e. after it has left the graph store. The upload
+directory is bounded by ``GRAPH_UPLOAD_MAX_BYTES``; the least recently used
+files are deleted first, and partial uploads older than
+``STALE_PART_SECONDS`` are removed as abandoned.
+"""
+
+import os
+import time
+from pathlib import Path
+
+DEFAULT_UPLOAD_MAX_BYTES = 2 * 1024 * 1024 * 1024
+UPLOAD_MAX_BYTES = int(
+    os.environ.get("GRAPH_UPLOAD_MAX_BYTES", DEFAULT_UPLOAD_MAX_BYTES)
+)
+STALE_PART_SECONDS = 3600
+PART_SUFFIX = ".part"
+
+
+def touch_upload(path: Path) -> None:
+    """Marks an upload as used, so it is the last to be pruned."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        raise LookupError(
+            "The uploaded file is no longer available. Upload it again."
+        ) from None
+
+
+def prune_uploads(
+    directory: Path, keep: Path | None = None, max_bytes: int = UPLOAD_MAX_BYTES
+) -> None:
+    """Deletes the least recently used uploads until ``directory`` fits ``max_bytes``.
+
+    ``keep`` is never deleted, even if it alone is over the limit.
+    """
+    now = time.time()
+    files = []
+    for path in directory.iterdir():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.name.endswith(PART_SUFFIX):
+            if now - stat.st_mtime > STALE_PART_SECONDS:
+                path.unlink(missing_ok=True)
+            continue
+        if path != keep:
+            files.append((stat.st_mtime, stat.st_size, path))
+        else:
+            max_bytes -= stat.st_size
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
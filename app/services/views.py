@@ -0,0 +1,54 @@
+import hashlib
+import os
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+from app.services.graph_cache import LRUCache
+from app.services.instrumentation import graph_size, span
+from app.services.layout import compute_layout
+from app.services.lod import Region, build_lod_figure
+
+DEFAULT_FIGURE_CACHE_BYTES = 256 * 1024 * 1024
+LABEL_BYTES = 64
+
+
+def view_key(graph_key: str, engine: str, region: Region | None) -> str:
+    """Identifies one rendered view of a graph."""
+    text = f"{graph_key}:{engine}:{region}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def estimate_figure_bytes(fig: go.Figure) -> int:
+    """Rough size of a figure's trace data."""
+    total = 0
+    for trace in fig.data:
+        for values in (trace.x, trace.y):
+            if values is not None:
+                total += np.asarray(values).nbytes
+        if trace.text is not None and not isinstance(trace.text, str):
+            total += LABEL_BYTES * len(trace.text)
+    return total
+
+
+figure_cache: LRUCache[str, go.Figure] = LRUCache(
+    max_bytes=int(os.environ.get("FIGURE_CACHE_MAX_BYTES", DEFAULT_FIGURE_CACHE_BYTES)),
+    sizeof=estimate_figure_bytes,
+    name="figure",
+)
+
+
+def render_view(
+    G: nx.Graph | nx.DiGraph, key: str, engine: str, region: Region | None
+) -> go.Figure:
+    """Lays out a graph and draws the requested view, memoized per view.
+
+    Figures live here rather than in session state so that state stays small
+    when it is serialized; sessions only hold the graph key and view settings.
+    """
+
+    def build() -> go.Figure:
+        pos = compute_layout(G, key, engine)
+        with span("figure", graph_size(G)):
+            return build_lod_figure(G, pos, key, region)
+
+    return figure_cache.get_or_create(view_key(key, engine, region), build)
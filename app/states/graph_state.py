@@ -1,25 +1,74 @@
 import reflex as rx
-from typing import ClassVar, TypedDict, Literal
-import networkx as nx
-import plotly.graph_objects as go
-import random
+from types import ModuleType
+from typing import TYPE_CHECKING, ClassVar, TypedDict
 import logging
+import hashlib
+import uuid
+from pathlib import Path
+from app.services.file_formats import detect_format
+from app.services.generator_params import GENERATORS, validate_params
+from app.services.graph_spec import GraphSpec
+from app.services.instrumentation import DEBUG_PANEL, breakdown, collect, span
+from app.services.tasks import (
+    TASK_TIMEOUT_SECONDS,
+    ExecutorBusy,
+    TaskCancelled,
+    cancel_task,
+    run_task,
+)
+from app.services.uploads import PART_SUFFIX, prune_uploads
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
-class Node(TypedDict):
-    id: str
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+CENTRALITY_LABELS = {
+    "degree": "Degree Centrality",
+    "pagerank": "PageRank",
+    "eigenvector": "Eigenvector Centrality",
+}
+INDEXING_LABEL = "Indexing the nodes"
+APPROX_LABELS = {
+    "betweenness": "Betweenness Centrality",
+    "clustering": "Average Clustering",
+    "distances": "Diameter & Avg. Distance",
+}
 
 
-class Link(TypedDict):
-    source: str
-    target: str
+class ResultRow(TypedDict):
+    rank: int
+    node: str
+    value: str
 
 
-class GraphData(TypedDict):
+class ResultView(TypedDict):
+    """The page of a server-side result table that a session is looking at."""
+
+    result_id: str
+    title: str
+    page: int
+    pages: int
+    descending: bool
+    query: str
+    total: int
+    rows: list[ResultRow]
+
+
+class GraphMeta(TypedDict):
+    nodes: int
+    edges: int
     directed: bool
-    multigraph: bool
-    nodes: list[Node]
-    links: list[Link]
+
+
+def _graph_tasks() -> ModuleType:
+    """:mod:`app.services.graph_tasks`, imported on first use.
+
+    It loads NetworkX, NumPy, SciPy and Plotly's figure builders, which the
+    form page never needs, so importing the state does not.
+    """
+    from app.services import graph_tasks
+
+    return graph_tasks
 
 
 class GraphState(rx.State):
@@ -28,14 +77,37 @@ class GraphState(rx.State):
     nodes_str: str = ""
     edges_str: str = ""
     graph_type: str = "undirected"
-    graph_data: GraphData | None = None
-    graph_figure: go.Figure | None = None
+    graph_key: str = ""
+    graph_source: str = ""
+    graph_format: str = ""
+    graph_generator: str = ""
+    graph_params: dict[str, int] = {}
+    generator_name: str = "barabasi_albert"
+    graph_edited: bool = False
+    edit_source: str = ""
+    edit_target: str = ""
+    task_running: bool = False
+    task_label: str = ""
+    task_progress: int = 0
+    layout_engine: str = "auto"
+    lod_region: list[float] = []
+    figure_key: str = ""
+    graph_meta: GraphMeta | None = None
+    graph_stats: dict[str, str | int | float] | None = None
     error_message: str = ""
     shortest_path_start: str = ""
     shortest_path_end: str = ""
     shortest_path_result: list[str] = []
-    centrality_result: dict[str, float] = {}
-    clustering_result: dict[str, float] = {}
+    node_matches: dict[str, list[str]] = {}
+    centrality_measure: str = "degree"
+    approx_name: str = "betweenness"
+    approx_budget: str = "5s"
+    approx_label: str = ""
+    approx_summary: dict[str, str] = {}
+    result_views: dict[str, ResultView] = {}
+    batch_result_id: str = ""
+    debug_label: str = ""
+    debug_stages: list[dict[str, str]] = []
     PRESETS: ClassVar[dict[str, dict[str, str]]] = {
         "social_network": {
             "nodes": "Alice, Bob, Charlie, David, Eve",
@@ -74,126 +146,242 @@ Z, W""",
         },
     }
 
-    @rx.var
-    def graph_nodes(self) -> list[Node]:
-        """Returns the list of nodes from graph_data, or an empty list."""
-        if self.graph_data is None:
-            return []
-        return self.graph_data.get("nodes", [])
-
-    @rx.var
-    def graph_stats(self) -> dict[str, str | int | float] | None:
-        """Computed statistics for the current graph."""
-        if self.graph_data is None:
-            return None
-        try:
-            G = self._create_nx_graph()
-            if G is None:
-                return None
-            return {
-                "Nodes": G.number_of_nodes(),
-                "Edges": G.number_of_edges(),
-                "Density": f"{nx.density(G):.4f}",
-                "Avg. Clustering": f"{nx.average_clustering(G):.4f}"
-                if self.graph_type == "undirected"
-                else "N/A",
-            }
-        except Exception as e:
-            logging.exception(f"Error calculating graph stats: {e}")
+    SERVER_SIDE_VARS: ClassVar[tuple[str, ...]] = ("graph_figure",)
+
+    def __getstate__(self):
+        """Leaves large computed values out of the serialized session.
+
+        They are rebuilt from the graph key and view settings, through the
+        server-side graph and figure caches, the next time they are read.
+        """
+        with span("state_serialize", (self.graph_meta or {}).get("edges", 0)):
+            state = super().__getstate__()
+            for name in self.SERVER_SIDE_VARS:
+                state.pop(self.computed_vars[name]._cache_attr, None)
+        return state
+
+    @rx.var(deps=["figure_key"], auto_deps=False, return_type=object)
+    def graph_figure(self) -> "go.Figure | None":
+        """The last drawn figure, looked up in the figure cache by its view key.
+
+        Figures are drawn by background tasks (see :meth:`draw_view`), never
+        here, so reading the var does not lay out or even resolve the graph.
+
+        Reflex evaluates return annotations when the class is created, which
+        would import Plotly with this module, so the var is declared as
+        ``object`` here and cast to a figure where the chart is rendered.
+        """
+        if not self.figure_key:
             return None
+        return _graph_tasks().cached_figure(self.figure_key)
+
+    def _graph_spec(self) -> GraphSpec:
+        """Describes the current graph so worker threads can resolve it.
+
+        If the form text has been edited since the graph was generated, or the
+        graph itself has been edited on the graph page, the spec carries only
+        the key, so the graph can be found in the cache but not rebuilt from
+        the wrong input.
+        """
+        if self.graph_edited:
+            return GraphSpec(key=self.graph_key, graph_type=self.graph_type)
+        if self.graph_generator:
+            spec = GraphSpec.from_generator(
+                self.graph_generator, self.graph_params, self.graph_type
+            )
+            if spec.key == self.graph_key:
+                return spec
+            return GraphSpec(key=self.graph_key, graph_type=self.graph_type)
+        if self.graph_source:
+            return GraphSpec(
+                key=self.graph_key,
+                graph_type=self.graph_type,
+                source=self.graph_source,
+                format=self.graph_format,
+            )
+        spec = GraphSpec.from_text(self.nodes_str, self.edges_str, self.graph_type)
+        if spec.key != self.graph_key:
+            return GraphSpec(key=self.graph_key, graph_type=self.graph_type)
+        return spec
+
+    def _view_region(self) -> tuple[float, ...] | None:
+        return tuple(self.lod_region) if self.lod_region else None
+
+    async def _run_task(self, label: str, fn, *args):
+        """Runs ``fn`` on the task pool from a background event.
+
+        Progress is streamed into ``task_progress`` and the task can be stopped
+        with :meth:`cancel_current_task`. Returns ``(result, None)`` on success
+        and ``(None, toast)`` when the task was refused, cancelled, timed out
+        or failed. With the debug panel enabled, the stages the task went
+        through are kept in ``debug_stages``.
+        """
+        async with self:
+            if self.task_running:
+                return None, rx.toast.warning(
+                    f"Wait for {self.task_label.lower()} to finish or cancel it."
+                )
+            self.task_running = True
+            self.task_label = label
+            self.task_progress = 0
+            task_id = self.router.session.client_token
+
+        async def on_progress(fraction: float) -> None:
+            async with self:
+                self.task_progress = int(fraction * 100)
 
-    def _create_nx_graph(self) -> nx.Graph | nx.DiGraph | None:
-        """Helper to create a NetworkX graph from state variables."""
         try:
-            nodes = [n.strip() for n in self.nodes_str.split(",") if n.strip()]
-            edge_list = []
-            for line in self.edges_str.strip().split("""
-"""):
-                parts = [p.strip() for p in line.split(",") if p.strip()]
-                if len(parts) == 2:
-                    edge_list.append(tuple(parts))
-            G = nx.DiGraph() if self.graph_type == "directed" else nx.Graph()
-            G.add_nodes_from(nodes)
-            G.add_edges_from(edge_list)
-            return G
+            with collect() as spans:
+                result = await run_task(task_id, fn, *args, on_progress=on_progress)
+            return result, None
+        except TaskCancelled:
+            return None, rx.toast.info(f"{label} cancelled.")
+        except ExecutorBusy as e:
+            return None, rx.toast.warning(str(e))
+        except TimeoutError:
+            return None, rx.toast.error(
+                f"{label} took longer than {TASK_TIMEOUT_SECONDS:.0f}s and was stopped."
+            )
         except Exception as e:
-            logging.exception(f"Error creating networkx graph: {e}")
-            return None
+            logging.exception(f"Error running task '{label}': {e}")
+            return None, rx.toast.error(f"{label} failed: {e}")
+        finally:
+            async with self:
+                self.task_running = False
+                self.task_progress = 0
+                if DEBUG_PANEL:
+                    self.debug_label = label
+                    self.debug_stages = breakdown(spans)
 
-    def _generate_plotly_figure(self, G: nx.Graph | nx.DiGraph) -> go.Figure:
-        """Generates a Plotly figure for the graph visualization."""
-        pos = nx.spring_layout(G, seed=42)
-        edge_x, edge_y = ([], [])
-        for edge in G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        edge_trace = go.Scatter(
-            x=edge_x,
-            y=edge_y,
-            line=dict(width=1, color="#888"),
-            hoverinfo="none",
-            mode="lines",
-        )
-        node_x, node_y, node_text = ([], [], [])
-        for node in G.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-            node_text.append(node)
-        node_trace = go.Scatter(
-            x=node_x,
-            y=node_y,
-            mode="markers+text",
-            hoverinfo="text",
-            text=node_text,
-            textposition="bottom center",
-            marker=dict(showscale=False, color="#9333ea", size=15, line_width=2),
-        )
-        fig = go.Figure(
-            data=[edge_trace, node_trace],
-            layout=go.Layout(
-                showlegend=False,
-                hovermode="closest",
-                margin=dict(b=20, l=5, r=5, t=40),
-                xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="#e5e7eb"),
-            ),
+    @rx.event
+    def cancel_current_task(self):
+        """Stops this session's running task at its next progress report."""
+        if not cancel_task(self.router.session.client_token):
+            return rx.toast.info("Nothing to cancel.")
+
+    @rx.event(background=True)
+    async def handle_submit(self, form_data: dict):
+        """Handles the form submission, generates the graph, and redirects."""
+        async with self:
+            if self.task_running:
+                return rx.toast.warning("A graph is already being processed.")
+            self.nodes_str = (form_data.get("nodes_str") or "").strip()
+            self.edges_str = (form_data.get("edges_str") or "").strip()
+            self.graph_type = form_data.get("graph_type", "undirected")
+            if not self.nodes_str or not self.edges_str:
+                return rx.toast.error("Nodes and Edges cannot be empty.")
+            spec = GraphSpec.from_text(self.nodes_str, self.edges_str, self.graph_type)
+            engine = self.layout_engine
+        loaded, error = await self._run_task(
+            "Building the graph", _graph_tasks().load_graph, spec, engine
         )
-        return fig
+        if loaded is None:
+            return error
+        async with self:
+            return self._show_graph(spec, *loaded)
+
+    def _show_graph(
+        self,
+        spec: GraphSpec,
+        meta: GraphMeta,
+        stats: dict[str, str | int | float],
+        figure_key: str,
+        warning: str,
+    ):
+        """Points the session at a freshly built graph and opens the graph page."""
+        self.graph_key = spec.key
+        self.graph_source = spec.source
+        self.graph_format = spec.format
+        self.graph_generator = spec.generator
+        self.graph_params = dict(spec.params)
+        self.graph_edited = False
+        self.lod_region = []
+        self.figure_key = figure_key
+        self.graph_meta = meta
+        self.graph_stats = stats
+        self.error_message = warning
+        self.shortest_path_result = []
+        self.node_matches = {}
+        self.approx_summary = {}
+        self.result_views = {}
+        self.batch_result_id = ""
+        if self.error_message:
+            return [rx.toast.warning(self.error_message), rx.redirect("/graph")]
+        return rx.redirect("/graph")
 
     @rx.event
-    def handle_submit(self, form_data: dict):
-        """Handles the form submission, generates the graph, and redirects."""
-        self.nodes_str = (form_data.get("nodes_str") or "").strip()
-        self.edges_str = (form_data.get("edges_str") or "").strip()
-        self.graph_type = form_data.get("graph_type", "undirected")
-        if not self.nodes_str or not self.edges_str:
-            return rx.toast.error("Nodes and Edges cannot be empty.")
-        G = self._create_nx_graph()
-        if G is None:
+    async def handle_upload(self, files: list[rx.UploadFile]):
+        """Saves an uploaded graph file to disk and parses it in the background."""
+        if self.task_running:
+            return rx.toast.warning("A graph is already being processed.")
+        if not files:
+            return rx.toast.error("Select a file to upload.")
+        file = files[0]
+        name = file.name or ""
+        fmt = detect_format(name)
+        if fmt is None:
             return rx.toast.error(
-                "Failed to parse graph data. Check your input format."
+                "Unsupported file type. Use CSV, TSV, edge list, GraphML or Parquet."
+            )
+        upload_dir = rx.get_upload_dir() / "graphs"
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        part_path = upload_dir / f".{uuid.uuid4().hex}{PART_SUFFIX}"
+        digest = hashlib.sha256()
+        try:
+            with part_path.open("wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                    digest.update(chunk)
+                    out.write(chunk)
+            path = part_path.replace(
+                upload_dir / f"{digest.hexdigest()}{Path(name).suffix.lower()}"
             )
-        graph_dict = nx.node_link_data(
-            G, source="source", target="target", name="id", key="key", edges="links"
+        finally:
+            part_path.unlink(missing_ok=True)
+        prune_uploads(upload_dir, keep=path)
+        return GraphState.ingest_upload(str(path), fmt, digest.hexdigest())
+
+    @rx.event(background=True)
+    async def ingest_upload(self, source: str, fmt: str, digest: str):
+        """Parses the uploaded graph file off the event loop, streaming progress."""
+        async with self:
+            spec = GraphSpec.from_file(source, fmt, digest, self.graph_type)
+            engine = self.layout_engine
+        loaded, error = await self._run_task(
+            f"Reading the {fmt} file", _graph_tasks().load_graph, spec, engine
         )
-        self.graph_data = {
-            "directed": graph_dict.get("directed", False),
-            "multigraph": graph_dict.get("multigraph", False),
-            "nodes": graph_dict.get("nodes", []),
-            "links": graph_dict.get("links", []),
-        }
-        self.graph_figure = self._generate_plotly_figure(G)
-        self.error_message = ""
-        self.shortest_path_result = []
-        self.centrality_result = {}
-        self.clustering_result = {}
-        return rx.redirect("/graph")
+        if loaded is None:
+            return error
+        async with self:
+            self.nodes_str = ""
+            self.edges_str = ""
+            return self._show_graph(spec, *loaded)
+
+    @rx.event(background=True)
+    async def handle_generate(self, form_data: dict):
+        """Builds the selected generator's graph straight into the graph cache."""
+        async with self:
+            name = self.generator_name
+            graph_type = self.graph_type
+            engine = self.layout_engine
+        if name not in GENERATORS:
+            return rx.toast.error(f"Unknown generator '{name}'.")
+        try:
+            params = validate_params(name, form_data)
+        except ValueError as e:
+            return rx.toast.error(str(e))
+        spec = GraphSpec.from_generator(name, params, graph_type)
+        loaded, error = await self._run_task(
+            f"Generating the {GENERATORS[name].label} graph",
+            _graph_tasks().load_graph,
+            spec,
+            engine,
+        )
+        if loaded is None:
+            return error
+        async with self:
+            self.nodes_str = ""
+            self.edges_str = ""
+            return self._show_graph(spec, *loaded)
 
     @rx.event
     def load_preset(self, preset_name: str):
@@ -207,49 +395,350 @@ Z, W""",
             )
 
     @rx.event
-    def calculate_shortest_path(self):
+    def search_nodes(self, field: str, query: str):
+        """Offers the nodes whose label starts with what was typed in a node box."""
+        if field not in ("start", "end"):
+            return
+        setattr(self, f"shortest_path_{field}", query)
+        matches = []
+        if query.strip() and self.graph_key:
+            matches = _graph_tasks().search_cached_nodes(self.graph_key, query)
+            if matches is None:
+                if self.task_running and self.task_label == INDEXING_LABEL:
+                    return
+                return GraphState.index_nodes(field)
+        self.node_matches = {**self.node_matches, field: matches}
+
+    @rx.event(background=True)
+    async def index_nodes(self, field: str):
+        """Builds the node index off the event loop, then repeats the search."""
+        async with self:
+            spec = self._graph_spec()
+        _, error = await self._run_task(
+            INDEXING_LABEL, _graph_tasks().index_nodes, spec
+        )
+        if error is not None:
+            return error
+        async with self:
+            if self.graph_key == spec.key:
+                query = getattr(self, f"shortest_path_{field}")
+                return GraphState.search_nodes(field, query)
+
+    @rx.event
+    def pick_node(self, field: str, label: str):
+        """Fills a node box with one of the offered nodes."""
+        if field not in ("start", "end"):
+            return
+        setattr(self, f"shortest_path_{field}", label)
+        self.node_matches = {**self.node_matches, field: []}
+
+    @rx.event(background=True)
+    async def calculate_shortest_path(self):
         """Calculates the shortest path between two selected nodes."""
-        if not self.shortest_path_start or not self.shortest_path_end:
+        async with self:
+            source, target = self.shortest_path_start, self.shortest_path_end
+            spec = self._graph_spec()
+        if not source or not target:
             return rx.toast.warning("Please select both start and end nodes.")
-        G = self._create_nx_graph()
-        if G is None:
-            return
-        try:
-            path = nx.shortest_path(G, self.shortest_path_start, self.shortest_path_end)
+        path, error = await self._run_task(
+            "Shortest path", _graph_tasks().shortest_path, spec, source, target
+        )
+        if path is None:
+            return error
+        async with self:
             self.shortest_path_result = path
-        except (nx.NetworkXNoPath, nx.NodeNotFound) as e:
-            logging.exception(f"Shortest path not found: {e}")
-            self.shortest_path_result = []
+        if not path:
             return rx.toast.error("No path found between the selected nodes.")
 
-    @rx.event
-    def calculate_centrality(self):
-        """Calculates the degree centrality for all nodes."""
-        G = self._create_nx_graph()
-        if G is None:
-            return
-        self.centrality_result = nx.degree_centrality(G)
-        return rx.toast.success("Calculated Degree Centrality.")
+    @rx.event(background=True)
+    async def run_batch_queries(self, form_data: dict):
+        """Computes distances for pasted ``source, target`` rows for download."""
+        text = (form_data.get("pairs") or "").strip()
+        if not text:
+            return rx.toast.warning("Paste at least one 'source, target' row.")
+        async with self:
+            spec = self._graph_spec()
+        summary, error = await self._run_task(
+            "Batch distances", _graph_tasks().batch_distances, spec, text
+        )
+        if summary is None:
+            return error
+        async with self:
+            self.batch_result_id = summary.result_id
+        skipped = summary.unknown + summary.malformed
+        message = f"Computed {summary.pairs - summary.unknown:,} distances."
+        if skipped:
+            message += f" Skipped {skipped:,} rows with unknown nodes or bad format."
+        return rx.toast.success(message)
 
-    @rx.event
-    def calculate_clustering(self):
+    @rx.event(background=True)
+    async def calculate_centrality(self):
+        """Calculates the selected centrality measure for all nodes."""
+        async with self:
+            spec = self._graph_spec()
+            measure = self.centrality_measure
+        label = CENTRALITY_LABELS.get(measure)
+        if label is None:
+            return rx.toast.error(f"Unknown centrality measure '{measure}'.")
+        result, error = await self._run_task(
+            label, _graph_tasks().centrality, spec, measure
+        )
+        if result is None:
+            return error
+        async with self:
+            self._show_result("centrality", label, result)
+        return rx.toast.success(f"Calculated {label}.")
+
+    @rx.event(background=True)
+    async def calculate_clustering(self):
         """Calculates the clustering coefficient for all nodes."""
-        G = self._create_nx_graph()
-        if G is None or self.graph_type == "directed":
+        async with self:
+            spec = self._graph_spec()
+        if spec.directed:
             return rx.toast.warning(
                 "Clustering can only be calculated for undirected graphs."
             )
-        self.clustering_result = nx.clustering(G)
+        result, error = await self._run_task(
+            "Clustering", _graph_tasks().clustering, spec
+        )
+        if result is None:
+            return error
+        async with self:
+            self._show_result("clustering", "Clustering Coefficient", result)
         return rx.toast.success("Calculated Clustering Coefficient.")
 
+    @rx.event(background=True)
+    async def run_approximation(self):
+        """Runs the selected approximation within the selected time budget."""
+        async with self:
+            spec = self._graph_spec()
+            name = self.approx_name
+            budget_name = self.approx_budget
+        label = APPROX_LABELS.get(name)
+        if label is None or budget_name not in _graph_tasks().BUDGETS:
+            return rx.toast.error("Unknown approximation or budget.")
+        if name == "clustering" and spec.directed:
+            return rx.toast.warning(
+                "Clustering can only be calculated for undirected graphs."
+            )
+        result, error = await self._run_task(
+            label, _graph_tasks().approximate, spec, name, budget_name
+        )
+        if result is None:
+            return error
+        async with self:
+            self.approx_label = label
+            self.approx_summary, result_id = result
+            self.result_views.pop("approx", None)
+            if result_id:
+                self._show_result("approx", label, result_id)
+        return rx.toast.success(f"Calculated {label}.")
+
+    @rx.event(background=True)
+    async def edit_graph(self, action: str):
+        """Adds or removes the node in the edit box, or the edge to the target."""
+        async with self:
+            source = self.edit_source.strip()
+            target = self.edit_target.strip()
+            spec = self._graph_spec()
+            engine = self.layout_engine
+            region = self._view_region()
+            private = self.graph_edited
+        if not source:
+            return rx.toast.warning("Enter a node name.")
+        edited, error = await self._run_task(
+            "Editing the graph",
+            _graph_tasks().edit_graph,
+            spec,
+            action,
+            source,
+            target,
+            engine,
+            region,
+            private,
+        )
+        if edited is None:
+            return error
+        meta, stats, key, figure_key = edited
+        async with self:
+            self.graph_key = key
+            self.graph_edited = True
+            self.graph_meta = meta
+            self.graph_stats = stats
+            self.figure_key = figure_key
+            self.shortest_path_result = []
+            self.node_matches = {}
+            self.approx_summary = {}
+            self.result_views = {}
+            self.batch_result_id = ""
+
+    def _show_result(self, table: str, title: str, result_id: str) -> None:
+        """Opens a stored result in ``table`` at its highest values."""
+        self.result_views[table] = {
+            "result_id": result_id,
+            "title": title,
+            "page": 0,
+            "pages": 1,
+            "descending": True,
+            "query": "",
+            "total": 0,
+            "rows": [],
+        }
+        self._load_result_page(table)
+
+    def _load_result_page(self, table: str):
+        """Fetches the rows for a table's current page, sort and filter."""
+        view = self.result_views.get(table)
+        if view is None:
+            return
+        page = _graph_tasks().result_page(
+            view["result_id"], view["page"], view["descending"], view["query"]
+        )
+        if page is None:
+            self.result_views.pop(table)
+            return rx.toast.info(
+                f"The {view['title']} results have expired. Calculate them again."
+            )
+        self.result_views[table] = {
+            **view,
+            "page": page.page,
+            "pages": page.pages,
+            "total": page.total,
+            "rows": [
+                {"rank": rank, "node": node, "value": f"{value:.6g}"}
+                for rank, node, value in page.rows
+            ],
+        }
+
+    @rx.event
+    def turn_result_page(self, table: str, page: int):
+        """Shows another page of a result table."""
+        if table in self.result_views:
+            self.result_views[table]["page"] = page
+            return self._load_result_page(table)
+
+    @rx.event
+    def toggle_result_sort(self, table: str):
+        """Switches a result table between highest and lowest values first."""
+        if table in self.result_views:
+            view = self.result_views[table]
+            view["descending"] = not view["descending"]
+            view["page"] = 0
+            return self._load_result_page(table)
+
+    @rx.event
+    def filter_result(self, table: str, query: str):
+        """Limits a result table to nodes whose label contains ``query``."""
+        if table in self.result_views:
+            view = self.result_views[table]
+            view["query"] = query
+            view["page"] = 0
+            return self._load_result_page(table)
+
+    def _redraw(self):
+        """Shows the current view if it is already drawn, else draws it.
+
+        Only the figure cache is checked here; on a miss the graph is laid
+        out and drawn by the :meth:`draw_view` background task.
+        """
+        if not self.graph_key:
+            return None
+        figure_key = _graph_tasks().cached_view(
+            self.graph_key, self.layout_engine, self._view_region()
+        )
+        if not figure_key:
+            return GraphState.draw_view
+        self.figure_key = figure_key
+
+    @rx.event(background=True)
+    async def draw_view(self):
+        """Lays out and draws the current view off the event loop."""
+        async with self:
+            spec = self._graph_spec()
+            view = (self.layout_engine, self._view_region())
+        figure_key, error = await self._run_task(
+            "Drawing the graph", _graph_tasks().draw_view, spec, *view
+        )
+        if figure_key is None:
+            return error
+        async with self:
+            if (self.graph_key, self.layout_engine, self._view_region()) != (
+                spec.key,
+                *view,
+            ):
+                return GraphState.draw_view
+            self.figure_key = figure_key
+
+    @rx.event
+    def set_layout_engine(self, engine: str):
+        """Switches the layout engine and redraws the current graph."""
+        nodes = self.graph_meta["nodes"] if self.graph_meta else 0
+        error = _graph_tasks().layout_engine_error(engine, nodes)
+        if error:
+            return rx.toast.error(error)
+        self.layout_engine = engine
+        self.lod_region = []
+        return self._redraw()
+
+    @rx.event
+    def zoom_to_selection(self, points: list[dict]):
+        """Redraws the graph restricted to a box or lasso selection."""
+        selected = [p for p in points if p.get("curveNumber") == 1]
+        if not selected:
+            return
+        xs = [p["x"] for p in selected]
+        ys = [p["y"] for p in selected]
+        pad = 0.02 * max(max(xs) - min(xs), max(ys) - min(ys), 1e-3)
+        self.lod_region = [
+            min(xs) - pad,
+            max(xs) + pad,
+            min(ys) - pad,
+            max(ys) + pad,
+        ]
+        return self._redraw()
+
+    @rx.event(background=True)
+    async def drill_into_cell(self, points: list[dict]):
+        """Zooms into a summary cell when it is clicked."""
+        clicked = [p for p in points if p.get("curveNumber") == 1]
+        if not clicked:
+            return
+        async with self:
+            if not self.graph_key:
+                return
+            spec = self._graph_spec()
+            engine = self.layout_engine
+            region = self._view_region()
+        cell, error = await self._run_task(
+            "Zooming in",
+            _graph_tasks().cell_region,
+            spec,
+            engine,
+            region,
+            int(clicked[0].get("pointIndex", -1)),
+        )
+        if error is not None:
+            return error
+        if cell is None:
+            return
+        async with self:
+            if (self.graph_key, self.layout_engine) == (spec.key, engine):
+                self.lod_region = list(cell)
+                return self._redraw()
+
+    @rx.event
+    def reset_view(self):
+        """Returns from a zoomed region to the whole-graph view."""
+        self.lod_region = []
+        return self._redraw()
+
     @rx.event
     def on_load_graph(self):
-        """Checks if graph data exists on page load and regenerates figure if needed."""
-        if self.graph_data is None:
+        """Sends the visitor back to the form if this session has no graph.
+
+        A graph whose figure has left the cache is drawn again.
+        """
+        if self.graph_meta is None:
             return rx.redirect("/")
         if self.graph_figure is None:
-            G = nx.node_link_graph(
-                self.graph_data, directed=self.graph_type == "directed"
-            )
-            if G:
-                self.graph_figure = self._generate_plotly_figure(G)
\ No newline at end of file
+            return self._redraw()
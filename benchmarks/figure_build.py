@@ -0,0 +1,78 @@
+"""Compares the legacy list-based figure builder with the array-backed one.
+
+Run from the repository root:
+
+    python -m benchmarks.figure_build --edges 1000 10000 50000 200000
+"""
+
+import argparse
+import time
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+from plotly.io import to_json
+from app.services.figure import FIGURE_LAYOUT, build_figure
+
+
+def legacy_figure(G: nx.Graph, pos: dict) -> go.Figure:
+    """The per-edge ``list.extend`` builder the app used before."""
+    edge_x, edge_y = ([], [])
+    for edge in G.edges():
+        x0, y0 = pos[edge[0]]
+        x1, y1 = pos[edge[1]]
+        edge_x.extend([x0, x1, None])
+        edge_y.extend([y0, y1, None])
+    edge_trace = go.Scatter(
+        x=edge_x,
+        y=edge_y,
+        line=dict(width=1, color="#888"),
+        hoverinfo="none",
+        mode="lines",
+    )
+    node_x, node_y, node_text = ([], [], [])
+    for node in G.nodes():
+        x, y = pos[node]
+        node_x.append(x)
+        node_y.append(y)
+        node_text.append(node)
+    node_trace = go.Scatter(
+        x=node_x,
+        y=node_y,
+        mode="markers+text",
+        hoverinfo="text",
+        text=node_text,
+        textposition="bottom center",
+        marker=dict(showscale=False, color="#9333ea", size=15, line_width=2),
+    )
+    return go.Figure(data=[edge_trace, node_trace], layout=FIGURE_LAYOUT)
+
+
+def measure(build, *args) -> tuple[float, int]:
+    """Returns (build + serialize seconds, JSON payload bytes)."""
+    start = time.perf_counter()
+    payload = str(to_json(build(*args)))
+    return time.perf_counter() - start, len(payload.encode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--edges", type=int, nargs="+", default=[1_000, 10_000, 50_000, 200_000]
+    )
+    args = parser.parse_args()
+    print(f"{'edges':>8} {'builder':>8} {'seconds':>9} {'payload MB':>11}")
+    for m in args.edges:
+        G = nx.gnm_random_graph(max(m // 2, 2), m, seed=42)
+        G = nx.relabel_nodes(G, str)
+        coords = np.random.default_rng(42).random((G.number_of_nodes(), 2))
+        pos = dict(zip(G, coords))
+        for name, build, build_args in (
+            ("legacy", legacy_figure, (G, pos)),
+            ("array", build_figure, (G, coords)),
+        ):
+            seconds, size = measure(build, *build_args)
+            print(f"{m:>8} {name:>8} {seconds:>9.3f} {size / 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
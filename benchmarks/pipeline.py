@@ -0,0 +1,418 @@
+"""Times every stage between submitting a graph and rendering its results.
+
+Synthetic graphs from NetworkX generators are fed in as pasted text and as
+uploaded CSV files. Each stage is timed on its own from cold result caches,
+with the graph and its CSR arrays kept warm, and its peak traced memory is
+recorded in a second, traced run.
+
+Stages follow the app: ``parse`` builds the graph from text or a file,
+``arrays`` converts it to the CSR arrays the services share, ``layout`` and
+``figure`` produce the first view, ``state`` measures the serialized
+session and the first delta sent to the browser, and the rest are the
+sidebar statistics and each ``calculate_*`` algorithm. Stages run from an
+empty shared result store. The suite points the graph and result stores at
+a temporary directory, so it never touches the app's own.
+
+Results are written as JSON and can be checked against a previous run:
+
+    python -m benchmarks.pipeline --edges 1000 10000 100000 --out new.json
+    python -m benchmarks.pipeline --edges 1000 10000 100000 --baseline old.json
+
+Both exit with status 1 if a stage raises; the second also if any stage is
+slower or uses more memory than the baseline allows.
+"""
+
+import argparse
+import atexit
+import json
+import math
+import os
+import pickle
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Set before the app is imported: the stores read these at import time, and
+# the executor's worker processes inherit them.
+STORE_DIR = Path(tempfile.mkdtemp(prefix="pipeline-store-"))
+atexit.register(shutil.rmtree, STORE_DIR, ignore_errors=True)
+os.environ["GRAPH_STORE_DIR"] = str(STORE_DIR)
+os.environ["RESULT_STORE_PATH"] = str(STORE_DIR / "results.sqlite3")
+
+import networkx as nx
+import reflex as rx
+from plotly.io import to_json
+from reflex.utils.format import json_dumps
+import app.app  # noqa: F401  registers the app's states
+from app.services import algorithms, executor
+from app.services.edge_parser import describe_malformed
+from app.services.graph_arrays import (
+    adjacency_cache,
+    adjacency_matrix,
+    edge_array_cache,
+)
+from app.services.graph_cache import file_graph_key, graph_cache
+from app.services.graph_source import GraphSpec, build_graph
+from app.services.graph_tasks import graph_meta
+from app.services.layout import choose_engine, compute_layout, layout_cache
+from app.services.lod import build_lod_figure
+from app.services.metrics import metrics_cache
+from app.services.paths import path_index, path_index_cache
+from app.services.result_store import shared_results
+from app.services.stats import graph_stats, stats_cache
+from app.services.views import figure_cache, render_view, view_key
+from app.states.graph_state import GraphState
+
+GENERATORS = ("gnm", "ba", "grid")
+FORMS = ("text", "file")
+DEFAULT_EDGES = (1_000, 10_000, 100_000, 1_000_000)
+RESULT_CACHES = (
+    figure_cache,
+    layout_cache,
+    metrics_cache,
+    stats_cache,
+    path_index_cache,
+    executor.snapshot_cache,
+)
+
+
+@dataclass
+class Thresholds:
+    """How much worse than the baseline a stage may get before it fails."""
+
+    time_ratio: float = 1.25
+    time_slack_seconds: float = 0.05
+    memory_ratio: float = 1.25
+    memory_slack_bytes: int = 1024 * 1024
+
+
+@dataclass
+class StageResult:
+    case: str
+    stage: str
+    nodes: int
+    edges: int
+    seconds: float
+    peak_bytes: int | None
+    extra: dict = field(default_factory=dict)
+    error: str = ""
+
+
+@dataclass
+class Case:
+    name: str
+    spec: GraphSpec
+
+
+def generate(kind: str, edges: int) -> nx.Graph:
+    """A graph with roughly ``edges`` edges and string node labels."""
+    if kind == "gnm":
+        G = nx.gnm_random_graph(max(edges // 5, 10), edges, seed=42)
+    elif kind == "ba":
+        G = nx.barabasi_albert_graph(max(edges // 5, 10), 5, seed=42)
+    elif kind == "grid":
+        side = max(math.isqrt(edges // 2), 2)
+        G = nx.grid_2d_graph(side, side)
+    else:
+        raise ValueError(f"Unknown generator '{kind}'.")
+    return nx.relabel_nodes(
+        G,
+        lambda node: "_".join(map(str, node)) if isinstance(node, tuple) else str(node),
+    )
+
+
+def make_case(kind: str, edges: int, form: str, workdir: Path) -> Case:
+    """Describes a generated graph the way the app receives it."""
+    G = generate(kind, edges)
+    name = f"{kind}-{form}-{edges}"
+    if form == "text":
+        nodes_str = ", ".join(G)
+        edges_str = "\n".join(f"{u}, {v}" for u, v in G.edges())
+        return Case(name, GraphSpec.from_text(nodes_str, edges_str, "undirected"))
+    path = workdir / f"{name}.csv"
+    with path.open("w") as out:
+        out.write("source,target\n")
+        out.writelines(f"{u},{v}\n" for u, v in G.edges())
+    key = file_graph_key(name, "csv", "undirected")
+    return Case(name, GraphSpec(key=key, source=str(path), format="csv"))
+
+
+def _clear_results() -> None:
+    for cache in RESULT_CACHES:
+        cache.clear()
+    shared_results.clear()
+
+
+def stage_parse(case: Case, G: nx.Graph) -> dict:
+    build_graph(case.spec)
+    return {}
+
+
+def stage_arrays(case: Case, G: nx.Graph) -> dict:
+    edge_array_cache.pop(case.spec.key)
+    adjacency_cache.pop(case.spec.key)
+    A = adjacency_matrix(G, case.spec.key)
+    return {"nnz": int(A.nnz)}
+
+
+def stage_layout(case: Case, G: nx.Graph) -> dict:
+    compute_layout(G, case.spec.key, "auto")
+    return {"engine": choose_engine(G)}
+
+
+def stage_figure(case: Case, G: nx.Graph) -> dict:
+    pos = compute_layout(G, case.spec.key, "auto")
+    payload = str(to_json(build_lod_figure(G, pos, case.spec.key)))
+    return {"payload_bytes": len(payload)}
+
+
+def stage_state(case: Case, G: nx.Graph) -> dict:
+    """Pickled session size and the first delta sent to the browser."""
+    root = rx.State(_reflex_internal_init=True)
+    state = root.get_substate(GraphState.get_full_name().split(".")[1:])
+    state.graph_type = case.spec.graph_type
+    state.nodes_str, state.edges_str = case.spec.nodes_str, case.spec.edges_str
+    state._clean()  # the browser already has the text it submitted
+    stats = graph_stats(G, case.spec.key).summary()
+    figure_key = view_key(case.spec.key, "auto", None)
+    state._show_graph(
+        case.spec, graph_meta(G), stats, figure_key, describe_malformed(G)
+    )
+    delta = json_dumps(state.get_delta())
+    return {"session_bytes": len(pickle.dumps(state)), "delta_bytes": len(delta)}
+
+
+def stage_stats(case: Case, G: nx.Graph) -> dict:
+    graph_stats(G, case.spec.key)
+    return {}
+
+
+def _centrality(name: str) -> Callable[[Case, nx.Graph], dict]:
+    compute = algorithms.CENTRALITY_MEASURES[name]
+
+    def stage(case: Case, G: nx.Graph) -> dict:
+        compute(G, case.spec.key)
+        return {}
+
+    return stage
+
+
+def stage_clustering(case: Case, G: nx.Graph) -> dict:
+    algorithms.clustering(G, case.spec.key)
+    return {}
+
+
+def stage_shortest_path(case: Case, G: nx.Graph) -> dict:
+    nodes = list(G)
+    index = path_index(G, case.spec.key)
+    try:
+        hops = len(index.shortest_path(nodes[0], nodes[-1])) - 1
+    except nx.NetworkXNoPath:
+        hops = None
+    return {"hops": hops}
+
+
+def _warm_layout(case: Case, G: nx.Graph) -> None:
+    compute_layout(G, case.spec.key, "auto")
+
+
+def _warm_view(case: Case, G: nx.Graph) -> None:
+    render_view(G, case.spec.key, "auto", None)
+
+
+STAGES: dict[str, Callable[[Case, nx.Graph], dict]] = {
+    "parse": stage_parse,
+    "arrays": stage_arrays,
+    "layout": stage_layout,
+    "figure": stage_figure,
+    "state": stage_state,
+    "stats": stage_stats,
+    "degree": _centrality("degree"),
+    "pagerank": _centrality("pagerank"),
+    "eigenvector": _centrality("eigenvector"),
+    "clustering": stage_clustering,
+    "shortest_path": stage_shortest_path,
+}
+# Results of earlier stages that a stage reads, as the app would have them.
+PREPARE: dict[str, Callable[[Case, nx.Graph], None]] = {
+    "figure": _warm_layout,
+    "state": _warm_view,
+}
+
+
+def _run_once(case: Case, G: nx.Graph, stage: str) -> tuple[float, dict, str]:
+    _clear_results()
+    if stage in PREPARE:
+        PREPARE[stage](case, G)
+    start = time.perf_counter()
+    try:
+        extra, error = STAGES[stage](case, G), ""
+    except Exception as e:
+        extra, error = {}, f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, extra, error
+
+
+def run_stage(
+    case: Case, G: nx.Graph, stage: str, repeat: int, memory: bool
+) -> StageResult:
+    """Best of ``repeat`` cold runs, then one traced run for peak memory.
+
+    A stage that raises is recorded with its ``error`` rather than stopping
+    the suite; :func:`regressions` reports it as a failure.
+    """
+    best, extra, error = math.inf, {}, ""
+    for _ in range(repeat):
+        seconds, extra, failed = _run_once(case, G, stage)
+        best, error = min(best, seconds), error or failed
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            _run_once(case, G, stage)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return StageResult(
+        case.name,
+        stage,
+        G.number_of_nodes(),
+        G.number_of_edges(),
+        best,
+        peak,
+        extra,
+        error,
+    )
+
+
+def regressions(
+    results: list[dict], baseline: list[dict], limits: Thresholds
+) -> list[str]:
+    """Stages that raised, or got slower or bigger than ``limits`` allow.
+
+    A failed stage's timing means nothing, so it is never compared, and a
+    baseline stage that failed is not compared against either.
+    """
+    before = {(r["case"], r["stage"]): r for r in baseline}
+    failures = []
+    for result in results:
+        if result.get("error"):
+            failures.append(
+                f"{result['case']} {result['stage']}: failed with {result['error']}"
+            )
+            continue
+        old = before.get((result["case"], result["stage"]))
+        if old is None or old.get("error") or "error" in old.get("extra", {}):
+            continue
+        allowed = old["seconds"] * limits.time_ratio + limits.time_slack_seconds
+        if result["seconds"] > allowed:
+            failures.append(
+                f"{result['case']} {result['stage']}: "
+                f"{result['seconds']:.3f}s > {allowed:.3f}s"
+            )
+        if result["peak_bytes"] is not None and old["peak_bytes"] is not None:
+            allowed = (
+                old["peak_bytes"] * limits.memory_ratio + limits.memory_slack_bytes
+            )
+            if result["peak_bytes"] > allowed:
+                failures.append(
+                    f"{result['case']} {result['stage']}: "
+                    f"{result['peak_bytes'] / 1e6:.1f} MB > {allowed / 1e6:.1f} MB"
+                )
+    return failures
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--edges", type=int, nargs="+", default=list(DEFAULT_EDGES))
+    parser.add_argument(
+        "--generators", nargs="+", choices=GENERATORS, default=GENERATORS
+    )
+    parser.add_argument("--forms", nargs="+", choices=FORMS, default=FORMS)
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(STAGES), default=list(STAGES)
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip traced runs")
+    parser.add_argument("--out", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare with")
+    args = parser.parse_args()
+
+    limits = Thresholds()
+    if args.baseline:
+        limits = Thresholds(**json.loads(args.baseline.read_text())["thresholds"])
+    results = []
+    print(f"{'case':>22} {'stage':>14} {'seconds':>9} {'peak MB':>8}  extra")
+    with tempfile.TemporaryDirectory() as workdir:
+        for edges in args.edges:
+            for kind in args.generators:
+                for form in args.forms:
+                    case = make_case(kind, edges, form, Path(workdir))
+                    G = build_graph(case.spec)
+                    graph_cache.put(case.spec.key, G)
+                    for stage in args.stages:
+                        result = run_stage(
+                            case, G, stage, args.repeat, not args.no_memory
+                        )
+                        peak = (
+                            "-"
+                            if result.peak_bytes is None
+                            else f"{result.peak_bytes / 1e6:.1f}"
+                        )
+                        print(
+                            f"{result.case:>22} {stage:>14} "
+                            f"{result.seconds:>9.3f} {peak:>8}  "
+                            f"{result.error or result.extra or ''}"
+                        )
+                        results.append(asdict(result))
+                    for cache in (graph_cache, edge_array_cache, adjacency_cache):
+                        cache.pop(case.spec.key)
+    executor.shutdown()
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        },
+        "thresholds": asdict(limits),
+        "results": results,
+    }
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+    baseline = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+    failures = regressions(results, baseline, limits)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
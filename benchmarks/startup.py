@@ -0,0 +1,126 @@
+"""Times a worker's cold start: importing the app in a fresh interpreter.
+
+Each run starts a new Python process, imports ``app.app`` as a worker does
+and reports how long that took, then how long the deferred graph services
+(:mod:`app.services.graph_tasks`) take to import on top. The run with the
+median start-up time is kept.
+
+Starting a worker must not load NetworkX, NumPy, SciPy or the other heavy
+libraries listed in ``DEFERRED_MODULES``. Any of them showing up at start-up
+is reported as a regression, whatever the timings say.
+
+    python -m benchmarks.startup --out new.json
+    python -m benchmarks.startup --baseline old.json
+
+The second command exits with status 1 if start-up got slower than the
+baseline allows or loads a deferred module.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFERRED_MODULES = ("networkx", "numpy", "scipy", "pandas", "pyarrow")
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.app
+startup = time.perf_counter() - start
+loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+start = time.perf_counter()
+import app.services.graph_tasks
+deferred = time.perf_counter() - start
+print(json.dumps({{"startup": startup, "deferred": deferred, "loaded": loaded}}))
+"""
+
+
+@dataclass
+class Thresholds:
+    """How much slower than the baseline start-up may get before it fails."""
+
+    time_ratio: float = 1.15
+    time_slack_seconds: float = 0.05
+
+
+def probe() -> dict:
+    """Imports the app in a new interpreter and returns its timings."""
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def regressions(result: dict, baseline: dict | None, limits: Thresholds) -> list[str]:
+    failures = [f"{name} imported at start-up" for name in result["loaded"]]
+    if baseline is not None:
+        allowed = baseline["startup"] * limits.time_ratio + limits.time_slack_seconds
+        if result["startup"] > allowed:
+            failures.append(f"start-up: {result['startup']:.3f}s > {allowed:.3f}s")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare with")
+    args = parser.parse_args()
+
+    limits, baseline = Thresholds(), None
+    if args.baseline:
+        report = json.loads(args.baseline.read_text())
+        limits, baseline = Thresholds(**report["thresholds"]), report["result"]
+    runs = [probe() for _ in range(args.repeat)]
+    for run in runs:
+        print(f"start-up {run['startup']:.3f}s  deferred {run['deferred']:.3f}s")
+    result = sorted(runs, key=lambda run: run["startup"])[len(runs) // 2]
+    print(
+        f"median start-up {statistics.median(r['startup'] for r in runs):.3f}s, "
+        f"deferred imports {result['deferred']:.3f}s"
+    )
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "thresholds": asdict(limits),
+        "result": result,
+    }
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+    failures = regressions(result, baseline, limits)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
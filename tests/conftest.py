@@ -0,0 +1,15 @@
+"""Keeps the test run off the app's graph and result stores.
+
+The stores read their locations when they are imported, so the variables
+are set here, before any test module imports the app.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+STORE_DIR = tempfile.mkdtemp(prefix="graph-tests-")
+atexit.register(shutil.rmtree, STORE_DIR, ignore_errors=True)
+os.environ["GRAPH_STORE_DIR"] = STORE_DIR
+os.environ["RESULT_STORE_PATH"] = os.path.join(STORE_DIR, "results.sqlite3")
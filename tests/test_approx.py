@@ -0,0 +1,41 @@
+import random
+import networkx as nx
+import numpy as np
+import pytest
+from app.services import approx
+
+
+class _FixedSample(random.Random):
+    """Makes NetworkX sample exactly the given sources."""
+
+    def __init__(self, sources: list):
+        super().__init__(0)
+        self.sources = sources
+
+    def sample(self, population, k):
+        assert k == len(self.sources)
+        return list(self.sources)
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_sampled_betweenness_matches_networkx_k_sampling(directed: bool):
+    G = nx.relabel_nodes(nx.gnp_random_graph(80, 0.06, seed=7, directed=directed), str)
+    result = approx.betweenness(G, budget=0.0)
+    assert not result.exact
+    nodes = list(G)
+    order = np.random.default_rng(approx.SEED).permutation(len(nodes))
+    sources = [nodes[i] for i in order[: result.samples]]
+    expected = nx.betweenness_centrality(G, k=len(sources), seed=_FixedSample(sources))
+    assert list(result.per_node.values()) == pytest.approx(
+        list(expected.values()), abs=1e-12
+    )
+
+
+def test_exact_betweenness_matches_networkx():
+    G = nx.relabel_nodes(nx.barabasi_albert_graph(60, 2, seed=4), str)
+    result = approx.betweenness(G, budget=None)
+    assert result.exact
+    expected = nx.betweenness_centrality(G)
+    assert list(result.per_node.values()) == pytest.approx(
+        list(expected.values()), abs=1e-12
+    )
@@ -0,0 +1,76 @@
+import pytest
+from app.services.edge_parser import (
+    EdgeListParser,
+    build_graph_from_chunks,
+    iter_edge_batches,
+    iter_text_chunks,
+)
+
+
+def _edges(parser: EdgeListParser, text: str, chunk_chars: int = 8) -> list:
+    labels = parser.labels
+    batches = iter_edge_batches(parser, iter_text_chunks(text, chunk_chars))
+    return [
+        (labels[s], labels[d])
+        for batch in batches
+        for s, d in zip(batch.src.tolist(), batch.dst.tolist())
+    ]
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 8, 1024])
+def test_pairs_are_parsed_in_order(chunk_chars: int):
+    text = "a, b\nb,c\n c , a \nd,e"
+    assert _edges(EdgeListParser(), text, chunk_chars) == [
+        ("a", "b"),
+        ("b", "c"),
+        ("c", "a"),
+        ("d", "e"),
+    ]
+
+
+def test_labels_are_interned():
+    parser = EdgeListParser()
+    _edges(parser, "a,b\nb,a\n")
+    assert parser.labels == ["a", "b"]
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 1024])
+def test_malformed_lines_keep_their_line_numbers(chunk_chars: int):
+    parser = EdgeListParser(skip_comments=True)
+    text = "# header\na,b\nbroken\n  # note\nb,c,d\nc,d\n"
+    assert _edges(parser, text, chunk_chars) == [("a", "b"), ("c", "d")]
+    assert parser.malformed_count == 2
+    assert [(m.line_no, m.text) for m in parser.malformed] == [
+        (3, "broken"),
+        (5, "b,c,d"),
+    ]
+
+
+@pytest.mark.parametrize("delimiter", [None, "\t", ";"])
+def test_comment_lines_are_skipped(delimiter: str | None):
+    sep = delimiter or "  "
+    text = f"# source{sep}target\n1{sep}2\n\t# comment\n2{sep}3\n"
+    parser = EdgeListParser(delimiter=delimiter, skip_comments=True)
+    assert _edges(parser, text, 1024) == [("1", "2"), ("2", "3")]
+    assert parser.malformed_count == 0
+
+
+def test_comments_are_edges_unless_skipped():
+    assert _edges(EdgeListParser(), "#,x\na,b\n") == [("#", "x"), ("a", "b")]
+
+
+def test_header_and_extra_columns():
+    parser = EdgeListParser(skip_header=True, extra_columns=True)
+    assert _edges(parser, "source,target,weight\na,b,1\nb,c,2\n") == [
+        ("a", "b"),
+        ("b", "c"),
+    ]
+
+
+def test_graph_records_malformed_lines():
+    G = build_graph_from_chunks(["a,b\nnope\n", "b,c\n"], directed=True, nodes=["z"])
+    assert list(G) == ["z", "a", "b", "c"]
+    assert list(G.edges) == [("a", "b"), ("b", "c")]
+    assert G.is_directed()
+    assert G.graph["malformed_count"] == 1
+    assert G.graph["malformed_lines"] == [(2, "nope")]
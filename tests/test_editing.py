@@ -0,0 +1,37 @@
+import networkx as nx
+import pytest
+from app.services import graph_store
+from app.services.editing import GraphEdit, apply_edit
+from app.services.graph_cache import graph_cache
+from app.services.graph_source import resolve_graph
+from app.services.graph_spec import GraphSpec
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_store, "STORE_DIR", tmp_path)
+    return tmp_path
+
+
+def _edges(G: nx.Graph) -> set[frozenset]:
+    return {frozenset(edge) for edge in G.edges()}
+
+
+def test_edited_graphs_resolve_after_eviction():
+    G = nx.relabel_nodes(nx.path_graph(5), str)
+    G, key = apply_edit(G, "test-edit-parent", GraphEdit("add", "4", "new"))
+    expected = _edges(G)
+    graph_cache.pop(key)
+    resolved = resolve_graph(GraphSpec(key=key))
+    assert _edges(resolved) == expected
+    assert "new" in resolved
+    graph_cache.pop(key)
+
+
+def test_private_edits_replace_the_stored_version(store_dir):
+    G = nx.relabel_nodes(nx.cycle_graph(4), str)
+    G, first = apply_edit(G, "test-edit-private", GraphEdit("remove", "0", "1"))
+    G, second = apply_edit(G, first, GraphEdit("add", "x"), private=True)
+    assert graph_store.load_graph(first) is None
+    assert set(graph_store.load_graph(second)) == {"0", "1", "2", "3", "x"}
+    graph_cache.pop(second)
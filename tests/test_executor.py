@@ -0,0 +1,75 @@
+import time
+from multiprocessing.shared_memory import SharedMemory
+import networkx as nx
+import numpy as np
+import pytest
+from app.services import executor
+from app.services.tasks import TaskCancelled, TaskControl
+
+GRAPH = nx.relabel_nodes(nx.gnp_random_graph(300, 0.03, seed=4), str)
+GRAPH.add_node("isolated")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    """Sends every graph to a two-process pool, whatever its size."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(executor, "PARALLEL_MIN_EDGES", 0)
+        mp.setattr(executor, "WORKERS", 2)
+        yield
+        executor.shutdown()
+
+
+def _wait_for_queue() -> None:
+    deadline = time.monotonic() + 10
+    while executor._queued and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_clustering_matches_networkx():
+    values = executor.clustering_values(GRAPH, "test-executor-clustering")
+    assert values.tolist() == pytest.approx(list(nx.clustering(GRAPH).values()))
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_pair_distances_match_networkx(directed: bool):
+    G = GRAPH.to_directed() if directed else GRAPH
+    if directed:
+        G.remove_edges_from([(v, u) for u, v in list(G.edges) if u < v][::2])
+    key = f"test-executor-distances-{directed}"
+    nodes = list(G)
+    rng = np.random.default_rng(5)
+    src = rng.integers(0, len(nodes), 200)
+    dst = rng.integers(0, len(nodes), 200)
+    distances = executor.pair_distances(G, key, src, dst)
+    for s, d, distance in zip(src.tolist(), dst.tolist(), distances.tolist()):
+        try:
+            expected = nx.shortest_path_length(G, nodes[s], nodes[d])
+        except nx.NetworkXNoPath:
+            expected = np.inf
+        assert distance == expected
+
+
+def test_snapshot_is_unlinked_when_evicted():
+    key = "test-executor-evict"
+    snapshot = executor.graph_snapshot(GRAPH, key)
+    name = snapshot.ref.name
+    snapshot.acquire()
+    executor.snapshot_cache.pop(key)
+    SharedMemory(name=name).close()  # still in use
+    snapshot.release()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+
+
+def test_cancelled_jobs_release_the_snapshot():
+    key = "test-executor-cancel"
+    control = TaskControl()
+    control.cancel()
+    with pytest.raises(TaskCancelled):
+        executor.clustering_values(GRAPH, key, control)
+    snapshot = executor.snapshot_cache.pop(key)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=snapshot.ref.name)
+    _wait_for_queue()
+    assert executor._queued == 0
@@ -0,0 +1,55 @@
+import networkx as nx
+import pytest
+from app.services import batch, results
+from app.services.export import open_export
+from app.services.result_store import ResultStore
+
+
+@pytest.fixture
+def other_worker(tmp_path, monkeypatch):
+    """Saves results to a temporary store; clearing the caches plays another worker."""
+    store = ResultStore(tmp_path / "results.sqlite3")
+    monkeypatch.setattr(results, "shared_results", store)
+    monkeypatch.setattr(batch, "shared_results", store)
+
+    def switch():
+        results.result_cache.clear()
+        batch.batch_cache.clear()
+        store._memory.clear()
+
+    return switch
+
+
+def _csv(kind: str, ident: str) -> list[str]:
+    return b"".join(open_export(kind, ident, "csv")).decode().splitlines()
+
+
+def test_result_ids_resolve_in_another_worker(other_worker):
+    result_id = results.store_result({"a": 1.0, "b": 3.0, "c": 2.0})
+    other_worker()
+    assert _csv("result", result_id) == [
+        "rank,node,value",
+        "1,b,3.0",
+        "2,c,2.0",
+        "3,a,1.0",
+    ]
+    page = results.result_page(result_id, query="c")
+    assert page.rows == [(2, "c", 2.0)]
+
+
+def test_batch_ids_resolve_in_another_worker(other_worker):
+    G = nx.Graph([("a", "b"), ("b", "c")])
+    G.add_node("d")
+    summary = batch.run_batch(G, "test-export-batch", "a,c\na,d\na,x\n")
+    other_worker()
+    assert _csv("batch", summary.result_id) == [
+        "source,target,distance,status",
+        "a,c,2,ok",
+        "a,d,,no path",
+        "a,x,,unknown node",
+    ]
+
+
+def test_unknown_ids_have_expired(other_worker):
+    assert open_export("result", "0" * 32, "csv") is None
+    assert open_export("batch", "0" * 32, "csv") is None
@@ -0,0 +1,42 @@
+import networkx as nx
+import pytest
+from app.services.generator_params import GENERATORS, validate_params
+from app.services.generators import generate_graph
+
+PARAMS = {
+    "barabasi_albert": [{"n": 2, "m": 1}, {"n": 500, "m": 3}, {"n": 60, "m": 20}],
+    "grid": [{"rows": 1, "cols": 1}, {"rows": 1, "cols": 7}, {"rows": 20, "cols": 30}],
+    "gnm": [{"n": 2, "m": 0}, {"n": 10, "m": 45}, {"n": 1_000, "m": 3_000}],
+}
+CASES = [(name, params) for name, cases in PARAMS.items() for params in cases]
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize(("name", "params"), CASES)
+def test_counts_match_the_form_estimate(name: str, params: dict, directed: bool):
+    G = generate_graph(name, validate_params(name, params), directed)
+    assert G.is_directed() == directed
+    assert G.number_of_edges() == GENERATORS[name].edge_count(params)
+    nodes = params["rows"] * params["cols"] if name == "grid" else params["n"]
+    assert G.number_of_nodes() == nodes
+    assert nx.number_of_selfloops(G) == 0
+
+
+@pytest.mark.parametrize(("name", "params"), CASES)
+def test_generation_is_seeded(name: str, params: dict):
+    first = generate_graph(name, params, False)
+    second = generate_graph(name, params, False)
+    assert list(first) == list(second)
+    assert list(first.edges) == list(second.edges)
+
+
+def test_barabasi_albert_grows_from_a_star():
+    G = generate_graph("barabasi_albert", {"n": 1_000, "m": 2}, True)
+    assert all(int(u) > int(v) for u, v in G.edges)
+    assert nx.is_connected(G.to_undirected())
+
+
+def test_grid_matches_networkx():
+    G = generate_graph("grid", {"rows": 4, "cols": 5}, False)
+    expected = nx.relabel_nodes(nx.grid_2d_graph(4, 5), lambda rc: f"{rc[0]}_{rc[1]}")
+    assert nx.utils.graphs_equal(G, expected)
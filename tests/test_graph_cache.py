@@ -0,0 +1,36 @@
+from app.services.graph_cache import LRUCache, caches
+from app.services.instrumentation import render_metrics
+
+
+def test_oversized_values_are_skipped_by_default():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("small", "abc")
+    cache.put("large", "x" * 20)
+    assert cache.get("large") is None
+    assert cache.get("small") == "abc"
+    assert cache.stats()["oversized"] == 1
+
+
+def test_oversized_values_can_be_kept_alone():
+    cache = LRUCache(max_bytes=10, sizeof=len, keep_oversized=True)
+    cache.put("small", "abc")
+    cache.put("large", "x" * 20)
+    assert cache.get("large") == "x" * 20
+    assert "small" not in cache
+    cache.put("next", "abcd")
+    assert "large" not in cache
+    assert cache.get("next") == "abcd"
+
+
+def test_named_caches_are_exported_as_metrics():
+    cache = LRUCache(max_bytes=100, sizeof=len, name="test_export_metrics")
+    try:
+        cache.put("a", "abc")
+        cache.get("a")
+        cache.get("b")
+        text = render_metrics()
+        assert 'graph_cache_entries{cache="test_export_metrics"} 1' in text
+        assert 'graph_cache_hits_total{cache="test_export_metrics"} 1' in text
+        assert 'graph_cache_misses_total{cache="test_export_metrics"} 1' in text
+    finally:
+        del caches["test_export_metrics"]
@@ -0,0 +1,78 @@
+import os
+import networkx as nx
+import pytest
+from app.services import graph_store
+from app.services.graph_arrays import edge_array_cache
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_store, "STORE_DIR", tmp_path)
+    return tmp_path
+
+
+def _graph(directed: bool) -> nx.Graph | nx.DiGraph:
+    G = nx.DiGraph() if directed else nx.Graph()
+    G.add_nodes_from(["z", "lonely", "ünïcødé", "日本"])
+    G.add_edges_from([("z", "a"), ("a", "ünïcødé"), ("日本", "z"), ("a", "a")])
+    G.add_edge("b", "a", weight=3.0)
+    G.nodes["z"]["color"] = "red"
+    return G
+
+
+def _round_trip(key: str, G: nx.Graph | nx.DiGraph) -> nx.Graph | nx.DiGraph:
+    graph_store.save_graph(key, G)
+    edge_array_cache.pop(key)
+    return graph_store.load_graph(key)
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_round_trip_keeps_structure_and_order(directed: bool):
+    G = _graph(directed)
+    key = f"test-store-{directed}"
+    loaded = _round_trip(key, G)
+    assert loaded.is_directed() == directed
+    assert list(loaded) == list(G)
+    assert list(loaded.edges) == list(G.edges)
+    for node in G:
+        assert list(loaded.adj[node]) == list(G.adj[node])
+    edge_array_cache.pop(key)
+
+
+def test_attributes_are_dropped():
+    loaded = _round_trip("test-store-attributes", _graph(False))
+    assert loaded.nodes["z"] == {}
+    assert loaded.edges["a", "b"] == {}
+    edge_array_cache.pop("test-store-attributes")
+
+
+def test_arrays_load_without_building_a_graph():
+    G = _graph(True)
+    graph_store.save_graph("test-store-arrays", G)
+    directed, labels, src, dst = graph_store.load_arrays("test-store-arrays")
+    assert directed
+    assert labels == list(G)
+    assert [(labels[s], labels[d]) for s, d in zip(src, dst)] == list(G.edges)
+    edge_array_cache.pop("test-store-arrays")
+
+
+def test_missing_and_unreadable_files(store_dir):
+    assert graph_store.load_graph("test-store-missing") is None
+    (store_dir / f"test-store-bad{graph_store.SUFFIX}").write_bytes(b"not a graph")
+    assert graph_store.load_graph("test-store-bad") is None
+
+
+def test_least_recently_used_graphs_are_evicted(store_dir):
+    for i in range(3):
+        graph_store.save_graph(f"test-store-evict-{i}", nx.path_graph(50))
+        edge_array_cache.pop(f"test-store-evict-{i}")
+        path = store_dir / f"test-store-evict-{i}{graph_store.SUFFIX}"
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+    graph_store.load_graph("test-store-evict-0")
+    size = (store_dir / f"test-store-evict-0{graph_store.SUFFIX}").stat().st_size
+    graph_store.evict(2 * size)
+    kept = sorted(path.stem for path in store_dir.glob(f"*{graph_store.SUFFIX}"))
+    assert kept == ["test-store-evict-0", "test-store-evict-2"]
+    graph_store.delete_graph("test-store-evict-0")
+    assert graph_store.load_graph("test-store-evict-0") is None
+    edge_array_cache.pop("test-store-evict-0")
@@ -0,0 +1,37 @@
+import networkx as nx
+from app.services import graph_tasks
+from app.services.graph_spec import GraphSpec
+from app.services.tasks import TaskControl
+
+
+def _spec() -> GraphSpec:
+    edges = "\n".join(f"{u}, {v}" for u, v in nx.karate_club_graph().edges())
+    return GraphSpec.from_text("", edges, "undirected")
+
+
+def test_loaded_view_is_found_without_resolving_the_graph():
+    spec = _spec()
+    meta, stats, figure_key, warning = graph_tasks.load_graph(
+        spec, "circular", TaskControl()
+    )
+    assert meta == {"nodes": 34, "edges": 78, "directed": False}
+    assert stats
+    assert warning == ""
+    assert graph_tasks.cached_view(spec.key, "circular", None) == figure_key
+    assert graph_tasks.cached_figure(figure_key) is not None
+
+
+def test_other_views_are_drawn_by_draw_view():
+    spec = _spec()
+    graph_tasks.load_graph(spec, "circular", TaskControl())
+    region = (-0.5, 0.5, -0.5, 0.5)
+    assert graph_tasks.cached_view(spec.key, "random", region) == ""
+    figure_key = graph_tasks.draw_view(spec, "random", region, TaskControl())
+    assert graph_tasks.cached_view(spec.key, "random", region) == figure_key
+
+
+def test_node_search_waits_for_the_index():
+    spec = GraphSpec.from_text("", "apple, banana\napricot, cherry", "undirected")
+    assert graph_tasks.search_cached_nodes(spec.key, "ap") is None
+    graph_tasks.index_nodes(spec, TaskControl())
+    assert graph_tasks.search_cached_nodes(spec.key, "ap") == ["apple", "apricot"]
@@ -0,0 +1,38 @@
+import tracemalloc
+import pytest
+from app.services.instrumentation import collect, span
+
+BLOCK = 4 * 1024 * 1024
+
+
+@pytest.fixture
+def tracing():
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    yield
+    if started:
+        tracemalloc.stop()
+
+
+def test_nested_spans_keep_the_enclosing_peak(tracing):
+    with collect() as spans:
+        with span("outer"):
+            block = bytearray(BLOCK)
+            del block
+            with span("inner"):
+                pass
+    inner, outer = spans
+    assert inner.alloc_bytes < BLOCK
+    assert outer.alloc_bytes >= BLOCK
+
+
+def test_inner_peaks_count_for_the_enclosing_span(tracing):
+    with collect() as spans:
+        with span("outer"):
+            with span("inner"):
+                block = bytearray(BLOCK)
+                del block
+    inner, outer = spans
+    assert inner.alloc_bytes >= BLOCK
+    assert outer.alloc_bytes >= BLOCK
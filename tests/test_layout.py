@@ -0,0 +1,25 @@
+import networkx as nx
+from app.services.graph_tasks import layout_engine_error
+from app.services.layout import SPRING_LIMIT_NODES, compute_layout, resolve_engine
+
+
+def test_spring_falls_back_above_its_limit():
+    small = nx.path_graph(10)
+    large = nx.empty_graph(SPRING_LIMIT_NODES + 1)
+    assert resolve_engine(small, "spring") == "spring"
+    assert resolve_engine(large, "spring") == "force"
+    assert resolve_engine(large, "circular") == "circular"
+    assert resolve_engine(large, "unknown") == "force"
+
+
+def test_compute_layout_uses_the_fallback_engine():
+    G = nx.empty_graph(SPRING_LIMIT_NODES + 1)
+    pos = compute_layout(G, engine="spring")
+    assert pos.shape == (G.number_of_nodes(), 2)
+
+
+def test_layout_engine_errors():
+    assert layout_engine_error("spring", SPRING_LIMIT_NODES) == ""
+    assert "limited" in layout_engine_error("spring", SPRING_LIMIT_NODES + 1)
+    assert layout_engine_error("auto", 10**7) == ""
+    assert "Unknown" in layout_engine_error("bogus", 10)
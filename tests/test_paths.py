@@ -0,0 +1,48 @@
+import gc
+import weakref
+import networkx as nx
+import pytest
+from app.services.paths import HOT_AFTER_QUERIES, PathIndex
+
+GRAPHS = {
+    "undirected": nx.gnp_random_graph(120, 0.03, seed=1),
+    "directed": nx.gnp_random_graph(120, 0.03, seed=2, directed=True),
+    "grid": nx.grid_2d_graph(12, 12),
+}
+
+
+def _check_path(G: nx.Graph | nx.DiGraph, path: list, source, target) -> None:
+    assert path[0] == source and path[-1] == target
+    assert all(G.has_edge(u, v) for u, v in zip(path, path[1:]))
+    assert len(path) - 1 == nx.shortest_path_length(G, source, target)
+
+
+@pytest.mark.parametrize("name", GRAPHS)
+def test_paths_match_networkx(name: str):
+    G = GRAPHS[name]
+    index = PathIndex(G)
+    nodes = list(G)
+    for source in nodes[:: len(nodes) // 6]:
+        for _ in range(HOT_AFTER_QUERIES + 1):  # cold, then from the stored tree
+            for target in nodes[::7]:
+                if nx.has_path(G, source, target):
+                    _check_path(G, index.shortest_path(source, target), source, target)
+                else:
+                    with pytest.raises(nx.NetworkXNoPath):
+                        index.shortest_path(source, target)
+
+
+def test_unknown_nodes_raise():
+    index = PathIndex(nx.path_graph(3))
+    with pytest.raises(nx.NodeNotFound):
+        index.shortest_path(0, "missing")
+
+
+def test_index_does_not_keep_the_graph():
+    G = nx.path_graph(10)
+    ref = weakref.ref(G)
+    index = PathIndex(G)
+    del G
+    gc.collect()
+    assert ref() is None
+    assert index.shortest_path(0, 9) == list(range(10))
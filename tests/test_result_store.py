@@ -0,0 +1,32 @@
+import sqlite3
+import pytest
+from app.services.result_store import ResultStore
+
+
+def test_compute_errors_propagate_and_release_the_claim(tmp_path):
+    store = ResultStore(tmp_path / "results.sqlite3")
+
+    def broken():
+        raise sqlite3.OperationalError("raised by the computation")
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.get_or_compute("key", broken)
+    assert not store._claimed("key")
+    assert store.get_or_compute("key", lambda: 5) == 5
+
+
+def test_failed_write_still_returns_the_value(tmp_path, monkeypatch):
+    store = ResultStore(tmp_path / "results.sqlite3")
+
+    def full(key, value):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    monkeypatch.setattr(store, "_write", full)
+    assert store.get_or_compute("key", lambda: 7) == 7
+    assert not store._claimed("key")
+
+
+def test_results_are_shared_between_store_instances(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    assert ResultStore(path).get_or_compute("key", lambda: [1, 2]) == [1, 2]
+    assert ResultStore(path).get("key") == [1, 2]
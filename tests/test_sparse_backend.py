@@ -0,0 +1,83 @@
+import networkx as nx
+import pytest
+from app.services import algorithms, sparse_backend
+from app.services.metrics import compute_metrics
+
+
+def _with_extras(G: nx.Graph | nx.DiGraph) -> nx.Graph | nx.DiGraph:
+    """``G`` with string labels, a few self-loops and two isolated nodes."""
+    G = nx.relabel_nodes(G, str)
+    for node in list(G)[:: max(len(G) // 4, 1)]:
+        G.add_edge(node, node)
+    G.add_nodes_from(["isolated-1", "isolated-2"])
+    return G
+
+
+GRAPHS = {
+    "undirected": _with_extras(nx.gnp_random_graph(60, 0.1, seed=1)),
+    "directed": _with_extras(nx.gnp_random_graph(60, 0.1, seed=2, directed=True)),
+    "scale_free": _with_extras(nx.barabasi_albert_graph(80, 3, seed=3)),
+    "no_loops": nx.relabel_nodes(nx.Graph(nx.karate_club_graph().edges()), str),
+}
+UNDIRECTED = [name for name, G in GRAPHS.items() if not G.is_directed()]
+
+
+def _assert_close(actual: dict, expected: dict, tol: float = 1e-4) -> None:
+    assert list(actual) == list(expected)
+    assert list(actual.values()) == pytest.approx(list(expected.values()), abs=tol)
+
+
+@pytest.mark.parametrize("name", GRAPHS)
+def test_pagerank_matches_networkx(name: str):
+    G = GRAPHS[name]
+    _assert_close(sparse_backend.pagerank(G), nx.pagerank(G))
+
+
+@pytest.mark.parametrize("name", GRAPHS)
+def test_eigenvector_centrality_matches_networkx(name: str):
+    G = GRAPHS[name]
+    _assert_close(
+        sparse_backend.eigenvector_centrality(G),
+        nx.eigenvector_centrality(G, max_iter=1000),
+    )
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_eigenvector_centrality_converges_on_grids(directed: bool):
+    G = nx.grid_2d_graph(30, 30, create_using=nx.DiGraph if directed else nx.Graph)
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        nx.eigenvector_centrality(G)
+    _assert_close(
+        sparse_backend.eigenvector_centrality(G),
+        nx.eigenvector_centrality(G, max_iter=100_000, tol=1e-12),
+    )
+    assert algorithms.eigenvector_centrality(G) == pytest.approx(
+        sparse_backend.eigenvector_centrality(G)
+    )
+
+
+@pytest.mark.parametrize("name", GRAPHS)
+def test_degree_centrality_matches_networkx(name: str):
+    G = GRAPHS[name]
+    _assert_close(compute_metrics(G).degree_centrality(G), nx.degree_centrality(G))
+
+
+@pytest.mark.parametrize("name", UNDIRECTED)
+def test_clustering_matches_networkx(name: str):
+    G = GRAPHS[name]
+    metrics = compute_metrics(G)
+    _assert_close(metrics.clustering_by_node(G), nx.clustering(G), tol=1e-12)
+    assert metrics.triangles.tolist() == list(nx.triangles(G).values())
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_empty_graph(directed: bool):
+    G = nx.DiGraph() if directed else nx.Graph()
+    assert sparse_backend.pagerank(G) == nx.pagerank(G) == {}
+    with pytest.raises(nx.NetworkXPointlessConcept):
+        sparse_backend.eigenvector_centrality(G)
+    metrics = compute_metrics(G)
+    assert metrics.degree_centrality(G) == nx.degree_centrality(G) == {}
+    assert metrics.components == 0
+    if not directed:
+        assert metrics.clustering_by_node(G) == nx.clustering(G) == {}
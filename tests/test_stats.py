@@ -0,0 +1,43 @@
+import random
+import networkx as nx
+import pytest
+from app.services.editing import GraphEdit, _mutate
+from app.services.stats import GraphStats
+
+
+def _random_graph(seed: int, directed: bool) -> nx.Graph | nx.DiGraph:
+    G = nx.gnp_random_graph(25, 0.08, seed=seed, directed=directed)
+    G = nx.relabel_nodes(G, str)
+    for node in random.Random(seed).sample(list(G), 3):
+        G.add_edge(node, node)
+    return G
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_node_removal_matches_recomputed_stats(seed: int, directed: bool):
+    G = _random_graph(seed, directed)
+    stats = GraphStats.from_graph(G)
+    rng = random.Random(seed)
+    for _ in range(6):
+        _mutate(G, stats, GraphEdit("remove", rng.choice(list(G))))
+        fresh = GraphStats.from_graph(G)
+        assert (stats.nodes, stats.edges, stats.components) == (
+            fresh.nodes,
+            fresh.edges,
+            fresh.components,
+        )
+        if not directed:
+            assert stats.triangles == fresh.triangles
+            assert stats.clustering_sum == pytest.approx(fresh.clustering_sum)
+
+
+def test_removing_a_cut_vertex_splits_its_component():
+    G = nx.Graph()
+    for i in range(4):
+        nx.add_path(G, ["hub", f"{i}-a", f"{i}-b"])
+    G.add_edge("0-b", "1-b")
+    G.add_node("alone")
+    stats = GraphStats.from_graph(G)
+    _mutate(G, stats, GraphEdit("remove", "hub"))
+    assert stats.components == 4 == nx.number_connected_components(G)
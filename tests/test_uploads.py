@@ -0,0 +1,48 @@
+import os
+import pytest
+from app.services.graph_source import build_graph
+from app.services.graph_spec import GraphSpec
+from app.services.uploads import STALE_PART_SECONDS, prune_uploads
+
+
+def _upload(directory, name: str, size: int, age: float):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    mtime = path.stat().st_mtime - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_least_recently_used_uploads_are_pruned(tmp_path):
+    old = _upload(tmp_path, "old.csv", 40, age=30)
+    mid = _upload(tmp_path, "mid.csv", 40, age=20)
+    new = _upload(tmp_path, "new.csv", 40, age=10)
+    prune_uploads(tmp_path, keep=new, max_bytes=100)
+    assert not old.exists()
+    assert mid.exists() and new.exists()
+
+
+def test_kept_upload_survives_alone(tmp_path):
+    big = _upload(tmp_path, "big.csv", 200, age=0)
+    other = _upload(tmp_path, "other.csv", 10, age=0)
+    prune_uploads(tmp_path, keep=big, max_bytes=100)
+    assert big.exists()
+    assert not other.exists()
+
+
+def test_abandoned_partial_uploads_are_removed(tmp_path):
+    stale = _upload(tmp_path, ".a.part", 10, age=STALE_PART_SECONDS + 60)
+    fresh = _upload(tmp_path, ".b.part", 10, age=0)
+    prune_uploads(tmp_path)
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_missing_upload_has_a_clear_error(tmp_path):
+    path = tmp_path / "gone.csv"
+    path.write_text("a,b\n")
+    spec = GraphSpec.from_file(str(path), "csv", "0" * 64, "undirected")
+    assert list(build_graph(spec).edges) == [("a", "b")]
+    path.unlink()
+    with pytest.raises(LookupError, match="Upload it again"):
+        build_graph(spec)